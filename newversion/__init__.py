@@ -0,0 +1,5 @@
+"""
+Version 2 : objets, solver glouton et répartition des services.
+Se lance depuis la racine du dépôt, ex. python -m newversion.exemplesolverv2
+(les modules communs sont importés depuis projetfinal.communs).
+"""
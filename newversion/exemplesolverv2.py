@@ -3,7 +3,49 @@ Exemple d'utilisation du solver optimisé
 Démonstration avec des données de test
 """
 
-from solverv2 import optimiser_services, analyser_solution, SolverOptimise
+import random
+import time
+
+from .objetv2 import voyage, service_agent
+from .solverv2 import optimiser_services, analyser_solution, SolverOptimise
+
+
+# =============================================================================
+# DONNÉES DE TEST
+# =============================================================================
+
+ARRETS_EXEMPLE = ["JUMA1", "JUMA2", "FOMET", "CHARL", "GOSS1", "GOSS2", "MARCI"]
+
+
+def creer_donnees_exemple(nb_voyages=400, nb_services=30, graine=0):
+    """
+    Réseau aléatoire reproductible (à remplacer par tes vraies données).
+    Sert aussi de test de performance : augmenter nb_voyages / nb_services.
+    """
+    rnd = random.Random(graine)
+
+    voyages = []
+    for i in range(nb_voyages):
+        debut = rnd.randrange(5 * 60, 22 * 60)
+        fin = debut + rnd.randrange(10, 60)
+        voyages.append(voyage(
+            str(rnd.randrange(1, 6)), i,
+            rnd.choice(ARRETS_EXEMPLE), rnd.choice(ARRETS_EXEMPLE),
+            f"{debut // 60}:{debut % 60:02d}", f"{fin // 60}:{fin % 60:02d}"
+        ))
+
+    services = []
+    for k in range(nb_services):
+        service = service_agent(k + 1)
+        debut = 5 * 60 + (k * 17 * 60) // max(nb_services, 1)
+        service.set_limites(debut, min(debut + 8 * 60, 24 * 60))
+        services.append((service, []))
+
+    return voyages, services
+
+
+def hhmm(minutes):
+    return f"{int(minutes) // 60:02d}h{int(minutes) % 60:02d}"
 
 
 # =============================================================================
@@ -19,8 +61,7 @@ def exemple_simple():
     print("=" * 70)
 
     # Tes données (à remplacer par tes vraies données)
-    voyages = []  # Liste de tes objets voyage
-    services = []  # Liste de tes tuples (service, indices_assignes)
+    voyages, services = creer_donnees_exemple()
 
     # EXACTEMENT comme avant !
     solutions = optimiser_services(
@@ -47,8 +88,7 @@ def exemple_avance():
     print("=" * 70)
 
     # Tes données
-    voyages = []  # Liste de tes objets voyage
-    services = []  # Liste de tes tuples (service, indices_assignes)
+    voyages, services = creer_donnees_exemple()
 
     # Générer des solutions de haute qualité
     solutions = optimiser_services(
@@ -94,8 +134,7 @@ def exemple_solver_direct():
     print("=" * 70)
 
     # Tes données
-    voyages = []  # Liste de tes objets voyage
-    services = []  # Liste de tes tuples (service, indices_assignes)
+    voyages, services = creer_donnees_exemple()
 
     # Créer le solver
     solver = SolverOptimise(voyages, services)
@@ -135,8 +174,7 @@ def exemple_comparaison():
     print("=" * 70)
 
     # Tes données
-    voyages = []  # Liste de tes objets voyage
-    services = []  # Liste de tes tuples (service, indices_assignes)
+    voyages, services = creer_donnees_exemple()
 
     configurations = [
         {
@@ -163,7 +201,6 @@ def exemple_comparaison():
         print(f"   max_solutions={config['max_solutions']}, "
               f"amelioration_locale={config['amelioration_locale']}")
 
-        import time
         debut = time.time()
 
         solutions = optimiser_services(
@@ -270,8 +307,7 @@ def exemple_debug():
     print("=" * 70)
 
     # Tes données
-    voyages = []  # Liste de tes objets voyage
-    services = []  # Liste de tes tuples (service, indices_assignes)
+    voyages, services = creer_donnees_exemple()
 
     # Créer le solver
     solver = SolverOptimise(voyages, services)
@@ -294,11 +330,11 @@ def exemple_debug():
     heures_debut = [v.hdebut for v in voyages]
     heures_fin = [v.hfin for v in voyages]
 
-    print(f"   Voyages - Début : {min(heures_debut):.0f}h → {max(heures_debut):.0f}h")
-    print(f"   Voyages - Fin   : {min(heures_fin):.0f}h → {max(heures_fin):.0f}h")
+    print(f"   Voyages - Début : {hhmm(min(heures_debut))} → {hhmm(max(heures_debut))}")
+    print(f"   Voyages - Fin   : {hhmm(min(heures_fin))} → {hhmm(max(heures_fin))}")
 
     for idx, (service, _) in enumerate(services):
-        print(f"   Service {idx} : {service.heure_debut:.0f}h → {service.heure_fin:.0f}h")
+        print(f"   Service {idx} : {hhmm(service.heure_debut)} → {hhmm(service.heure_fin)}")
 
     # Détecter les problèmes potentiels
     print("\n⚠️  Problèmes potentiels :")
@@ -354,14 +390,14 @@ def main():
     print("EXEMPLES D'UTILISATION DU SOLVER OPTIMISÉ")
     print("🎯" * 35)
 
-    # Décommenter les exemples que tu veux tester :
+    # Commenter les exemples que tu ne veux pas lancer :
 
-    # exemple_simple()
-    # exemple_avance()
-    # exemple_solver_direct()
-    # exemple_comparaison()
+    exemple_simple()
+    exemple_avance()
+    exemple_solver_direct()
+    exemple_comparaison()
     exemple_personnalisation()
-    # exemple_debug()
+    exemple_debug()
 
     print("\n" + "=" * 70)
     print("✅ Exemples terminés !")
@@ -370,18 +406,17 @@ def main():
     print("""
     💡 Prochaines étapes :
 
-    1. Remplacer les listes vides voyages=[] et services=[] 
-       par tes vraies données
+    1. Remplacer creer_donnees_exemple() par tes vraies données
 
     2. Exécuter le script :
-       python exemple_utilisation.py
+       python -m newversion.exemplesolverv2   (depuis la racine du dépôt)
 
     3. Comparer les différentes configurations
 
     4. Ajuster les poids si nécessaire (voir exemple_personnalisation)
 
     5. Intégrer dans ton projet :
-       from solver_optimise import optimiser_services
+       from newversion.solverv2 import optimiser_services
     """)
 
 
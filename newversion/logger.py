@@ -3,7 +3,7 @@ Module de logging centralisé.
 Importer et utiliser dans tous les fichiers du projet.
 
 Usage:
-    from logger import get_logger
+    from .logger import get_logger
     logger = get_logger(__name__)
 
     logger.debug("Message détaillé")
@@ -55,7 +55,7 @@ def initialiser(
         dossier_logs: Dossier où stocker les logs
 
     Exemple:
-        from logger import initialiser
+        from .logger import initialiser
         initialiser(fichier_log="mon_app.log", niveau_console=logging.DEBUG)
     """
     global _fichier_log_actif, _initialise
@@ -104,7 +104,7 @@ def get_logger(nom=None):
         Logger configuré
 
     Exemple:
-        from logger import get_logger
+        from .logger import get_logger
         logger = get_logger(__name__)
         logger.info("Ça marche!")
     """
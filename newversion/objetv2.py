@@ -1,3 +1,7 @@
+from projetfinal.communs.heures import FIN_JOURNEE_SERVICE, heure_vers_minutes, journee_service, limites_journee_service
+from projetfinal.communs.registre_arrets import REGISTRE_ARRETS
+
+
 class hlp:
 
     def __init__(self, arret_depart, arret_arrivee, duree, heure_debut=None):
@@ -38,7 +42,7 @@ class service_agent:
 
     def ajouter_pause(self, hdebut_minutes, hfin_minutes):
         """Ajoute une pause au service"""
-        self.pauses.append((hdebut_minutes, hfin_minutes))
+        self.pauses.append(limites_journee_service(hdebut_minutes, hfin_minutes))
         # Trier les pauses par heure de début
         self.pauses.sort(key=lambda p: p[0])
 
@@ -71,10 +75,15 @@ class service_agent:
         return self.hlps
 
     def set_limites(self, heure_debut, heure_fin):
+        """Limites en minutes, ramenées en minutes de journée de service comme les voyages"""
+        if heure_debut is not None and heure_fin is not None:
+            heure_debut, heure_fin = limites_journee_service(heure_debut, heure_fin)
         self.heure_debut = heure_debut
         self.heure_fin = heure_fin
 
     def set_coupure(self, heure_debut_coupure, heure_fin_coupure):
+        if heure_debut_coupure is not None and heure_fin_coupure is not None:
+            heure_debut_coupure, heure_fin_coupure = limites_journee_service(heure_debut_coupure, heure_fin_coupure)
         self.heure_debut_coupure = heure_debut_coupure
         self.heure_fin_coupure = heure_fin_coupure
 
@@ -163,11 +172,40 @@ class voyage:
         self.num_voyage = num_voyage
         self.arret_debut = arret_debut
         self.arret_fin = arret_fin
-        self.hdebut = self.time_to_minutes(heure_debut)
-        self.hfin = self.time_to_minutes(heure_fin)
+        # Minutes de journée de service (0-2159) : un voyage de nuit reste croissant
+        self.hdebut, self.hfin = journee_service(self.time_to_minutes(heure_debut),
+                                                 self.time_to_minutes(heure_fin))
+        if self.hfin >= FIN_JOURNEE_SERVICE:
+            raise ValueError(f"Voyage hors journée de service: {heure_debut} - {heure_fin}")
         self.js_srv = js_srv
         self.distance = None
 
+    # Les codes d'arrêt et de groupe (registre_arrets) sont calculés à l'affectation,
+    # la continuité géographique se teste ensuite par comparaison d'entiers
+    @property
+    def arret_debut(self):
+        return self._arret_debut
+
+    @arret_debut.setter
+    def arret_debut(self, arret):
+        self._arret_debut = arret
+        self.arret_debut_code = REGISTRE_ARRETS.code(arret)
+        self.groupe_debut = REGISTRE_ARRETS.groupe(arret)
+
+    @property
+    def arret_fin(self):
+        return self._arret_fin
+
+    @arret_fin.setter
+    def arret_fin(self, arret):
+        self._arret_fin = arret
+        self.arret_fin_code = REGISTRE_ARRETS.code(arret)
+        self.groupe_fin = REGISTRE_ARRETS.groupe(arret)
+
+    def continuite_geo(self, suivant):
+        """Vrai si le voyage suivant part du même groupe d'arrêts que notre arrivée"""
+        return self.groupe_fin == suivant.groupe_debut
+
     def arret_debut_id(self):
         """Retourne les 3 premiers caractères de l'arrêt de début"""
         return self.arret_debut[:3]
@@ -178,8 +216,7 @@ class voyage:
 
     @staticmethod
     def time_to_minutes(time_str):
-        h, m = map(int, time_str.split(':'))
-        return h * 60 + m
+        return heure_vers_minutes(time_str)
 
     @staticmethod
     def minutes_to_time(minutes):
@@ -3,8 +3,20 @@ Module d'optimisation des services de transport.
 Utilise un algorithme glouton pour assigner des voyages à des services.
 """
 
-from objetv2 import voyage
-from logger import get_logger
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+import numpy as np
+
+from projetfinal.communs.couverture_chemins import couverture_minimale
+from projetfinal.communs.empreintes import empreinte_services
+from projetfinal.communs.graphe_succession import GrapheSuccession
+from projetfinal.communs.recherche_locale import RechercheLocale
+from projetfinal.communs.strategies_paralleles import SEUIL_PARALLELE, executer_strategies
+
+from .logger import get_logger
+from .objetv2 import voyage
 
 # Logger pour ce module
 logger = get_logger(__name__)
@@ -23,29 +35,95 @@ STRATEGIES_TRI = [
 ]
 
 
+# Budget de la recherche locale, par solution (secondes)
+TEMPS_AMELIORATION = 2.0
+
+
 # =============================================================================
 # PRÉPARATION DES DONNÉES
 # =============================================================================
 
-def preparer_services(services_list):
-    """Transforme la liste de services en structure exploitable."""
+def preparer_services(services_list, voyages_list=None):
+    """
+    Transforme la liste de services en structure exploitable.
+
+    Si voyages_list est fourni, la plage horaire et les pauses de chaque
+    service sont testées ici une seule fois pour tous les voyages
+    (matrice_compatibilites) au lieu d'un test par couple voyage/service.
+    """
     logger.debug(f"Préparation de {len(services_list)} services")
 
-    services_info = []
+    if voyages_list:
+        compatibles = matrice_compatibilites(services_list, voyages_list)
+        services_info = services_depuis_colonnes(
+            compatibles, [indices for _, indices in services_list], voyages_list
+        )
+        for service_info, (service, _) in zip(services_info, services_list):
+            service_info.update(service_original=service, debut=service.heure_debut, fin=service.heure_fin)
+        return services_info
 
+    services_info = []
     for idx, (service, indices_assignes) in enumerate(services_list):
-        services_info.append({
+        service_info = {
             'id': idx,
             'service_original': service,
             'debut': service.heure_debut,
             'fin': service.heure_fin,
             'voyages_assignes': list(indices_assignes),
             'voyages': []
-        })
+        }
+        indexer_service(service_info)
+        services_info.append(service_info)
 
     return services_info
 
 
+def matrice_compatibilites(services_list, voyages_list):
+    """Matrice voyages x services : voyage dans la plage horaire du service et hors de ses pauses"""
+    hdebuts = np.fromiter((v.hdebut for v in voyages_list), dtype=np.int32, count=len(voyages_list))
+    hfins = np.fromiter((v.hfin for v in voyages_list), dtype=np.int32, count=len(voyages_list))
+    compatibles = np.zeros((len(voyages_list), len(services_list)), dtype=bool)
+    for s, (service, _) in enumerate(services_list):
+        colonne = (hdebuts >= service.heure_debut) & (hfins <= service.heure_fin)
+        if hasattr(service, 'masque_compatible'):
+            colonne &= service.masque_compatible(hdebuts, hfins)
+        elif getattr(service, 'pauses', None):
+            colonne &= ~np.fromiter((service.est_dans_pause(d, f) for d, f in zip(hdebuts.tolist(), hfins.tolist())),
+                                    dtype=bool, count=len(voyages_list))
+        compatibles[:, s] = colonne
+    return compatibles
+
+
+def services_depuis_colonnes(compatibles, fixes, voyages_list):
+    """Services depuis la matrice de compatibilité et les voyages fixés de chaque service"""
+    index_par_id = {id(voy): idx for idx, voy in enumerate(voyages_list)}
+    services_info = []
+    for idx, indices_assignes in enumerate(fixes):
+        service_info = {
+            'id': idx,
+            'compatible': compatibles[:, idx].tolist(),
+            'index_par_id': index_par_id,
+            'voyages_assignes': list(indices_assignes),
+            'voyages': []
+        }
+        indexer_service(service_info)
+        services_info.append(service_info)
+    return services_info
+
+
+class VoyageColonnes:
+    """Voyage reconstruit dans un processus depuis les colonnes envoyées (sans l'objet d'origine)"""
+
+    __slots__ = ('hdebut', 'hfin', 'num_ligne', 'groupe_debut', 'groupe_fin')
+
+    def __init__(self, hdebut, hfin, num_ligne, groupe_debut, groupe_fin):
+        self.hdebut = hdebut
+        self.hfin = hfin
+        self.num_ligne = num_ligne
+        self.groupe_debut = groupe_debut
+        self.groupe_fin = groupe_fin
+
+
 def preparer_voyages(voyages_list):
     """Transforme la liste de voyages en structure exploitable."""
     logger.debug(f"Préparation de {len(voyages_list)} voyages")
@@ -64,7 +142,7 @@ def preassigner_voyages_fixes(services_info, voyages_info):
         for v_idx in serv['voyages_assignes']:
             if v_idx < len(voyages_info):
                 voy_info = voyages_info[v_idx]
-                serv['voyages'].append({
+                ajouter_au_service(serv, {
                     'index': v_idx,
                     'voyage_obj': voy_info['voyage'],
                     'fixe': True
@@ -91,6 +169,37 @@ def trier_voyages_non_assignes(voyages_info, tri_func):
     return voyages_non_assignes
 
 
+# =============================================================================
+# ÉTAT TRIÉ DES SERVICES
+# =============================================================================
+
+def indexer_service(service_info):
+    """
+    (Re)construit l'état trié d'un service à partir de service_info['voyages'] :
+    heures de début et de fin triées ('debuts', 'fins') et voyages dans le
+    même ordre ('par_debut', 'par_fin'), à égalité dans l'ordre d'ajout.
+    """
+    voyages = service_info['voyages']
+    service_info['par_debut'] = sorted(voyages, key=lambda v: v['voyage_obj'].hdebut)
+    service_info['debuts'] = [v['voyage_obj'].hdebut for v in service_info['par_debut']]
+    service_info['par_fin'] = sorted(voyages, key=lambda v: v['voyage_obj'].hfin)
+    service_info['fins'] = [v['voyage_obj'].hfin for v in service_info['par_fin']]
+
+
+def ajouter_au_service(service_info, entree):
+    """Ajoute un voyage au service en gardant l'état trié (O(log k) + insertion)"""
+    service_info['voyages'].append(entree)
+    voy = entree['voyage_obj']
+
+    p = bisect_right(service_info['debuts'], voy.hdebut)
+    service_info['debuts'].insert(p, voy.hdebut)
+    service_info['par_debut'].insert(p, entree)
+
+    p = bisect_right(service_info['fins'], voy.hfin)
+    service_info['fins'].insert(p, voy.hfin)
+    service_info['par_fin'].insert(p, entree)
+
+
 # =============================================================================
 # VÉRIFICATIONS DE COMPATIBILITÉ
 # =============================================================================
@@ -114,32 +223,33 @@ def est_pendant_pause(voyage_obj, service_info):
     return False
 
 
-def a_chevauchement(voyage_obj, voyages_existants, pause_min):
-    """Vérifie si un voyage chevauche des voyages existants."""
-    for v_existant in voyages_existants:
-        v_exist = v_existant['voyage_obj']
-
-        fin_nouveau_avec_pause = voyage_obj.hfin + pause_min
-        fin_existant_avec_pause = v_exist.hfin + pause_min
+def est_autorise(voyage_obj, service_info):
+    """Plage horaire et pauses : lues dans la matrice de compatibilité si le service en a une."""
+    compatible = service_info.get('compatible')
+    if compatible is not None:
+        idx = service_info['index_par_id'].get(id(voyage_obj))
+        if idx is not None:
+            return compatible[idx]
+    return est_dans_plage_horaire(voyage_obj, service_info) and not est_pendant_pause(voyage_obj, service_info)
 
-        pas_de_chevauchement = (fin_nouveau_avec_pause <= v_exist.hdebut or
-                                voyage_obj.hdebut >= fin_existant_avec_pause)
 
-        if not pas_de_chevauchement:
-            return True
-
-    return False
+def a_chevauchement(voyage_obj, service_info, pause_min):
+    """
+    Vérifie si un voyage chevauche un voyage du service (pause comprise).
+    Les voyages qui finissent avant lui (fin + pause <= début) commencent tous
+    avant sa fin + pause : il y a chevauchement si les deux comptes diffèrent.
+    """
+    commencent_avant = bisect_left(service_info['debuts'], voyage_obj.hfin + pause_min)
+    finissent_avant = bisect_right(service_info['fins'], voyage_obj.hdebut - pause_min)
+    return commencent_avant != finissent_avant
 
 
-def est_service_compatible(voyage_obj, service_info, pause_min):
+def est_service_compatible(voyage_obj, service_info, pause_min, graphe=None):
     """Vérifie toutes les conditions de compatibilité."""
-    if not est_dans_plage_horaire(voyage_obj, service_info):
+    if not est_autorise(voyage_obj, service_info):
         return False
 
-    if est_pendant_pause(voyage_obj, service_info):
-        return False
-
-    if a_chevauchement(voyage_obj, service_info['voyages'], pause_min):
+    if a_chevauchement(voyage_obj, service_info, pause_min):
         return False
 
     return True
@@ -149,24 +259,36 @@ def est_service_compatible(voyage_obj, service_info, pause_min):
 # CALCUL DU SCORE D'ASSIGNATION
 # =============================================================================
 
-def calculer_bonus_continuite_avant(voyage_obj, voyages_service, pause_min):
-    """Calcule le bonus de continuité avec le voyage précédent."""
-    voyages_avant = [
-        v for v in voyages_service
-        if v['voyage_obj'].hfin + pause_min <= voyage_obj.hdebut
-    ]
+def continuite_geo(voyage_avant, voyage_apres):
+    """Vrai si voyage_apres part du même groupe d'arrêts que l'arrivée de voyage_avant."""
+    groupe_fin = getattr(voyage_avant, 'groupe_fin', None)
+    groupe_debut = getattr(voyage_apres, 'groupe_debut', None)
+    if groupe_fin is not None and groupe_debut is not None:
+        return groupe_fin == groupe_debut
+
+    # Objets sans codes du registre : comparer les 3 premiers caractères des arrêts
+    return str(voyage_avant.arret_fin_id())[:3] == str(voyage_apres.arret_debut_id())[:3]
 
-    if not voyages_avant:
+
+def calculer_bonus_continuite_avant(voyage_obj, service_info, pause_min, graphe=None):
+    """Calcule le bonus de continuité avec le voyage précédent (recherche dichotomique)."""
+    fins = service_info['fins']
+    k = bisect_right(fins, voyage_obj.hdebut - pause_min)
+
+    if k == 0:
         return 10
 
-    score = 0
-    dernier = max(voyages_avant, key=lambda v: v['voyage_obj'].hfin)
+    # Premier ajouté parmi les voyages qui finissent le plus tard
+    dernier = service_info['par_fin'][bisect_left(fins, fins[k - 1])]
+    idx = graphe.index_de(voyage_obj) if graphe is not None else None
 
+    score = 0
     try:
-        # Comparer les 3 premiers caractères des arrêts
-        arret_fin = str(dernier['voyage_obj'].arret_fin_id())[:3]
-        arret_debut = str(voyage_obj.arret_debut_id())[:3]
-        if arret_fin == arret_debut:
+        if idx is not None:
+            geo = graphe.continuite_geo(dernier['index'], idx)
+        else:
+            geo = continuite_geo(dernier['voyage_obj'], voyage_obj)
+        if geo:
             score += 100
     except Exception as e:
         logger.debug(f"Impossible de vérifier continuité avant: {e}")
@@ -177,23 +299,22 @@ def calculer_bonus_continuite_avant(voyage_obj, voyages_service, pause_min):
     return score
 
 
-def calculer_bonus_continuite_apres(voyage_obj, voyages_service, pause_min):
-    """Calcule le bonus de continuité avec le voyage suivant."""
-    voyages_apres = [
-        v for v in voyages_service
-        if voyage_obj.hfin + pause_min <= v['voyage_obj'].hdebut
-    ]
+def calculer_bonus_continuite_apres(voyage_obj, service_info, pause_min, graphe=None):
+    """Calcule le bonus de continuité avec le voyage suivant (recherche dichotomique)."""
+    k = bisect_left(service_info['debuts'], voyage_obj.hfin + pause_min)
 
-    if not voyages_apres:
+    if k == len(service_info['debuts']):
         return 0
 
-    prochain = min(voyages_apres, key=lambda v: v['voyage_obj'].hdebut)
+    prochain = service_info['par_debut'][k]
+    idx = graphe.index_de(voyage_obj) if graphe is not None else None
 
     try:
-        # Comparer les 3 premiers caractères des arrêts
-        arret_fin = str(voyage_obj.arret_fin_id())[:3]
-        arret_debut = str(prochain['voyage_obj'].arret_debut_id())[:3]
-        if arret_fin == arret_debut:
+        if idx is not None:
+            geo = graphe.continuite_geo(idx, prochain['index'])
+        else:
+            geo = continuite_geo(voyage_obj, prochain['voyage_obj'])
+        if geo:
             return 100
     except Exception as e:
         logger.debug(f"Impossible de vérifier continuité après: {e}")
@@ -201,14 +322,12 @@ def calculer_bonus_continuite_apres(voyage_obj, voyages_service, pause_min):
     return 0
 
 
-def calculer_score_assignation(voyage_obj, service_info, pause_min):
+def calculer_score_assignation(voyage_obj, service_info, pause_min, graphe=None):
     """Calcule le score total pour assigner un voyage à un service."""
-    voyages_service = service_info['voyages']
-
     score = 0
-    score += calculer_bonus_continuite_avant(voyage_obj, voyages_service, pause_min)
-    score += calculer_bonus_continuite_apres(voyage_obj, voyages_service, pause_min)
-    score -= len(voyages_service) * 5
+    score += calculer_bonus_continuite_avant(voyage_obj, service_info, pause_min, graphe)
+    score += calculer_bonus_continuite_apres(voyage_obj, service_info, pause_min, graphe)
+    score -= len(service_info['voyages']) * 5
 
     return score
 
@@ -217,16 +336,21 @@ def calculer_score_assignation(voyage_obj, service_info, pause_min):
 # ALGORITHME GLOUTON
 # =============================================================================
 
-def trouver_meilleur_service(voyage_obj, services_info, pause_min):
-    """Trouve le meilleur service pour un voyage donné."""
+def trouver_meilleur_service(voyage_obj, services_info, pause_min, graphe=None, stats=None):
+    """
+    Trouve le meilleur service pour un voyage donné.
+    stats : dictionnaire de compteurs (evaluations_score incrémenté à chaque score calculé).
+    """
     meilleur_service = None
     meilleur_score = -1
 
     for service_info in services_info:
-        if not est_service_compatible(voyage_obj, service_info, pause_min):
+        if not est_service_compatible(voyage_obj, service_info, pause_min, graphe):
             continue
 
-        score = calculer_score_assignation(voyage_obj, service_info, pause_min)
+        score = calculer_score_assignation(voyage_obj, service_info, pause_min, graphe)
+        if stats is not None:
+            stats['evaluations_score'] += 1
 
         if score > meilleur_score:
             meilleur_score = score
@@ -237,7 +361,7 @@ def trouver_meilleur_service(voyage_obj, services_info, pause_min):
 
 def assigner_voyage(voy_info, service_info):
     """Assigne un voyage à un service."""
-    service_info['voyages'].append({
+    ajouter_au_service(service_info, {
         'index': voy_info['index'],
         'voyage_obj': voy_info['voyage'],
         'fixe': False
@@ -247,7 +371,7 @@ def assigner_voyage(voy_info, service_info):
     logger.debug(f"Voyage {voy_info['index']} → service {service_info['id']}")
 
 
-def executer_algorithme_glouton(voyages_non_assignes, services_info, pause_min):
+def executer_algorithme_glouton(voyages_non_assignes, services_info, pause_min, graphe=None, stats=None):
     """Exécute l'algorithme glouton pour assigner les voyages."""
     nb_non_assignes = 0
 
@@ -255,7 +379,7 @@ def executer_algorithme_glouton(voyages_non_assignes, services_info, pause_min):
         voyage_obj = voy_info['voyage']
 
         try:
-            meilleur_service = trouver_meilleur_service(voyage_obj, services_info, pause_min)
+            meilleur_service = trouver_meilleur_service(voyage_obj, services_info, pause_min, graphe, stats)
 
             if meilleur_service:
                 assigner_voyage(voy_info, meilleur_service)
@@ -270,6 +394,38 @@ def executer_algorithme_glouton(voyages_non_assignes, services_info, pause_min):
     return nb_non_assignes
 
 
+# =============================================================================
+# AMÉLIORATION LOCALE
+# =============================================================================
+
+def ameliorer_services(services_info, voyages_list, graphe, temps_max=TEMPS_AMELIORATION, mode='premier'):
+    """
+    Recherche locale après le glouton (relocation, échange, échange de fins de
+    service, chaînes d'éjection). Les voyages fixés ne bougent pas.
+    Met à jour services_info ; retourne (nb_non_assignes, statistiques).
+    """
+    def autorise(s, i):
+        return est_autorise(voyages_list[i], services_info[s])
+
+    fixes = {v['index'] for serv in services_info for v in serv['voyages'] if v['fixe']}
+    recherche = RechercheLocale.depuis_graphe(graphe, autorise, fixes)
+    services, libres = recherche.ameliorer(
+        [[v['index'] for v in serv['voyages']] for serv in services_info], temps_max, mode
+    )
+
+    for serv, indices in zip(services_info, services):
+        serv['voyages'] = [
+            {'index': i, 'voyage_obj': voyages_list[i], 'fixe': i in fixes}
+            for i in indices
+        ]
+        indexer_service(serv)
+
+    stats = recherche.stats
+    logger.info(f"Amélioration locale: score {stats['score_initial']} → {stats['score_final']} "
+                f"en {stats['temps']:.2f}s {stats['mouvements']}")
+    return len(libres), stats
+
+
 # =============================================================================
 # CONSTRUCTION DE LA SOLUTION
 # =============================================================================
@@ -298,22 +454,56 @@ def construire_solution(services_info, nom_strategie, nb_non_assignes):
 # FONCTIONS PRINCIPALES
 # =============================================================================
 
-def generer_solution_gloutonne(voyages_list, services_list, tri_func, nom_strategie, pause_min=5):
-    """Génère UNE solution avec une stratégie de tri donnée."""
+def construire_graphe(voyages_list, pause_min):
+    """Graphe de succession des voyages, construit une fois pour toutes les stratégies."""
+    graphe = GrapheSuccession.depuis_voyages(voyages_list, pause_min)
+    logger.debug(f"Graphe de succession: {len(graphe)} voyages (sans arcs, tests sur les colonnes)")
+    return graphe
+
+
+def generer_solution_gloutonne(voyages_list, services_list, tri_func, nom_strategie, pause_min=5, graphe=None,
+                               stats=None, amelioration_locale=False, temps_amelioration=TEMPS_AMELIORATION,
+                               mode_amelioration='premier'):
+    """
+    Génère UNE solution avec une stratégie de tri donnée.
+    services_list : [(service, indices pré-assignés)] ou services déjà préparés (services_depuis_colonnes).
+    graphe : graphe de succession partagé (construit ici s'il manque ou si pause_min diffère).
+    stats  : compteurs mis à jour pendant la génération (voir SolverOptimise).
+    amelioration_locale : recherche locale après le glouton (voir ameliorer_services).
+    """
     logger.info(f"Génération solution: {nom_strategie}")
+    debut = time.perf_counter()
 
     try:
-        services_info = preparer_services(services_list)
+        if graphe is None or graphe.pause_min != pause_min or len(graphe) != len(voyages_list):
+            graphe = construire_graphe(voyages_list, pause_min)
+
+        if services_list and isinstance(services_list[0], dict):
+            services_info = services_list   # déjà préparés (services_depuis_colonnes)
+        else:
+            services_info = preparer_services(services_list, voyages_list)
         voyages_info = preparer_voyages(voyages_list)
         preassigner_voyages_fixes(services_info, voyages_info)
         voyages_non_assignes = trier_voyages_non_assignes(voyages_info, tri_func)
 
         nb_non_assignes = executer_algorithme_glouton(
-            voyages_non_assignes, services_info, pause_min
+            voyages_non_assignes, services_info, pause_min, graphe, stats
         )
 
+        stats_amelioration = None
+        if amelioration_locale:
+            nb_non_assignes, stats_amelioration = ameliorer_services(
+                services_info, voyages_list, graphe, temps_amelioration, mode_amelioration
+            )
+
         trier_voyages_par_service(services_info)
         solution = construire_solution(services_info, nom_strategie, nb_non_assignes)
+        solution["empreinte"] = empreinte_services(
+            [[v['index'] for v in serv['voyages']] for serv in services_info], len(voyages_list)
+        )
+        solution["temps_generation"] = time.perf_counter() - debut
+        if stats_amelioration is not None:
+            solution["amelioration"] = stats_amelioration
 
         total_assignes = sum(len(serv['voyages']) for serv in services_info)
         logger.info(f"Résultat: {total_assignes}/{len(voyages_list)} assignés ({nb_non_assignes} échecs)")
@@ -325,18 +515,53 @@ def generer_solution_gloutonne(voyages_list, services_list, tri_func, nom_strate
         return None
 
 
-def optimiser_services(voyages_list, services_list, max_solutions=5, pause_min=5):
+def _executer_strategie(contexte, strat_idx):
+    """
+    Une stratégie dans un processus. Le contexte n'a que des colonnes : heures,
+    groupes d'arrêts et lignes des voyages, matrice voyages x services et
+    voyages fixés ; voyages, graphe et services sont reconstruits ici.
+    Les objets voyage sont retirés du résultat.
+    """
+    colonnes, bits_compatibles, fixes, pause_min, amelioration = contexte
+    colonnes = [np.asarray(c).tolist() for c in colonnes]
+    voyages_list = [VoyageColonnes(*valeurs) for valeurs in zip(*colonnes)]
+    compatibles = np.unpackbits(bits_compatibles, axis=0, count=len(voyages_list)).astype(bool)
+    services_info = services_depuis_colonnes(compatibles, fixes, voyages_list)
+    strat_nom, strat_tri = STRATEGIES_TRI[strat_idx]
+    solution = generer_solution_gloutonne(
+        voyages_list, services_info, strat_tri, strat_nom, pause_min, None, None, *amelioration
+    )
+    if solution:
+        for voyages in solution["services"].values():
+            for v in voyages:
+                v['voyage_obj'] = None
+    return solution
+
+
+def cle_solution(solution):
+    """Clé de déduplication : empreinte 64 bits de l'affectation voyage -> service."""
+    return solution["empreinte"]
+
+
+def optimiser_services(voyages_list, services_list, max_solutions=5, pause_min=5,
+                       parallele=True, max_workers=None, amelioration_locale=False,
+                       temps_amelioration=TEMPS_AMELIORATION, mode_amelioration='premier'):
     """
     Algorithme glouton générant plusieurs solutions.
 
     Args:
         voyages_list: Liste des voyages à optimiser
         services_list: Liste des services disponibles
-        max_solutions: Nombre maximum de solutions à générer
+        max_solutions: Nombre maximum de solutions distinctes à générer
         pause_min: Temps minimum entre deux voyages (en minutes)
+        parallele: Répartir les stratégies sur plusieurs processus (grands réseaux)
+        max_workers: Nombre maximum de processus (défaut : nombre de cœurs)
+        amelioration_locale: Recherche locale sur chaque solution gloutonne
+        temps_amelioration: Budget de la recherche locale par solution (secondes)
+        mode_amelioration: 'premier' (premier mouvement améliorant) ou 'meilleur'
 
     Returns:
-        Liste des solutions générées
+        Liste des solutions générées, dans l'ordre des stratégies
     """
     logger.info("=" * 60)
     logger.info("DÉBUT OPTIMISATION")
@@ -347,21 +572,263 @@ def optimiser_services(voyages_list, services_list, max_solutions=5, pause_min=5
         logger.error("Données manquantes: pas de voyages ou services")
         return []
 
-    solutions = []
+    graphe = construire_graphe(voyages_list, pause_min)
+    nb_minimum, _ = couverture_minimale(graphe)
+    logger.info(f"Minimum théorique: {nb_minimum} services (couverture par chemins)")
+    if nb_minimum > len(services_list):
+        logger.warning(f"{len(services_list)} services < {nb_minimum}: des voyages resteront non assignés")
+    parallele = parallele and len(voyages_list) * len(services_list) >= SEUIL_PARALLELE
+
+    # Contexte des processus : colonnes et matrice de compatibilité (8 voyages par octet)
+    colonnes = (graphe.hdebut, graphe.hfin, [v.num_ligne for v in voyages_list],
+                graphe.groupe_debut, graphe.groupe_fin)
+    fixes = [list(indices) for _, indices in services_list]
+    solutions = executer_strategies(
+        _executer_strategie,
+        (colonnes, np.packbits(matrice_compatibilites(services_list, voyages_list), axis=0), fixes, pause_min,
+         (amelioration_locale, temps_amelioration, mode_amelioration)),
+        [(strat_idx,) for strat_idx in range(len(STRATEGIES_TRI))],
+        max_solutions=max_solutions,
+        cle=cle_solution,
+        parallele=parallele,
+        max_workers=max_workers
+    )
+
+    for solution in solutions:
+        for voyages in solution["services"].values():
+            for v in voyages:
+                v['voyage_obj'] = voyages_list[v['index']]
+
+    logger.info("=" * 60)
+    logger.info(f"FIN OPTIMISATION: {len(solutions)} solution(s) générée(s)")
+
+    return solutions
 
-    for strat_idx, (strat_nom, strat_tri) in enumerate(STRATEGIES_TRI[:max_solutions]):
-        logger.info(f"--- Solution {strat_idx + 1}/{max_solutions} ---")
 
-        solution = generer_solution_gloutonne(
-            voyages_list, services_list, strat_tri, strat_nom, pause_min
+# =============================================================================
+# CACHE DE CONTINUITÉ GÉOGRAPHIQUE
+# =============================================================================
+
+class CacheGeo:
+    """
+    Cache LRU borné : (arrêt d'arrivée, arrêt de départ) -> continuité géographique.
+    Le résultat ne dépend que du couple d'arrêts ; au-delà de taille_max
+    couples, le moins récemment utilisé est oublié.
+    """
+
+    def __init__(self, taille_max=4096):
+        self.taille_max = taille_max
+        self.hits = 0
+        self.misses = 0
+        self._valeurs = OrderedDict()
+
+    def __len__(self):
+        return len(self._valeurs)
+
+    def obtenir(self, cle, calculer):
+        """Valeur en cache pour cle, sinon calculer() mémorisé"""
+        try:
+            valeur = self._valeurs[cle]
+        except KeyError:
+            self.misses += 1
+            valeur = self._valeurs[cle] = calculer()
+            if len(self._valeurs) > self.taille_max:
+                self._valeurs.popitem(last=False)
+            return valeur
+
+        self.hits += 1
+        self._valeurs.move_to_end(cle)
+        return valeur
+
+    def vider(self):
+        self._valeurs.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_stats(self):
+        """Compteurs du cache ; hit_rate en pourcentage"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': 100.0 * self.hits / total if total else 0.0,
+            'taille': len(self._valeurs),
+            'taille_max': self.taille_max,
+        }
+
+
+class GrapheCacheGeo:
+    """
+    Graphe de succession dont continuite_geo() passe par un CacheGeo.
+    Toutes les autres requêtes sont déléguées au graphe.
+    """
+
+    def __init__(self, graphe, cache):
+        self.graphe = graphe
+        self.cache = cache
+        self._arrets_fin = [v.arret_fin for v in graphe.objets]
+        self._arrets_debut = [v.arret_debut for v in graphe.objets]
+
+    def __getattr__(self, nom):
+        return getattr(self.graphe, nom)
+
+    def __len__(self):
+        return len(self.graphe)
+
+    def continuite_geo(self, i, j):
+        return self.cache.obtenir(
+            (self._arrets_fin[i], self._arrets_debut[j]),
+            lambda: self.graphe.continuite_geo(i, j)
+        )
+
+
+# =============================================================================
+# SOLVER AVEC ÉTAT
+# =============================================================================
+
+class SolverOptimise:
+    """
+    Même algorithme glouton multi-stratégies qu'optimiser_services, mais le
+    graphe et le cache géographique sont gardés d'un appel à l'autre et
+    l'exécution est mesurée dans stats :
+        temps_total        : secondes passées dans optimiser()
+        solutions_generees : solutions retournées
+        evaluations_score  : scores d'assignation calculés
+
+    Les stratégies tournent dans ce processus (les compteurs et le cache
+    ne traversent pas les processus).
+    """
+
+    def __init__(self, voyages_list, services_list, pause_min=5, taille_cache=4096):
+        self.voyages_list = voyages_list
+        self.services_list = services_list
+        self.pause_min = pause_min
+        self.cache_geo = CacheGeo(taille_cache)
+        self.stats = {
+            'temps_total': 0.0,
+            'solutions_generees': 0,
+            'evaluations_score': 0,
+        }
+        self._graphe = None
+
+    @property
+    def graphe(self):
+        if self._graphe is None or self._graphe.pause_min != self.pause_min:
+            self._graphe = GrapheCacheGeo(construire_graphe(self.voyages_list, self.pause_min), self.cache_geo)
+        return self._graphe
+
+    def generer_solution(self, strat_idx, amelioration_locale=False, temps_amelioration=TEMPS_AMELIORATION,
+                         mode_amelioration='premier'):
+        """Une solution avec la stratégie STRATEGIES_TRI[strat_idx]"""
+        strat_nom, strat_tri = STRATEGIES_TRI[strat_idx]
+        return generer_solution_gloutonne(
+            self.voyages_list, self.services_list, strat_tri, strat_nom,
+            self.pause_min, self.graphe, self.stats,
+            amelioration_locale, temps_amelioration, mode_amelioration
         )
 
-        if solution:
-            solutions.append(solution)
+    def optimiser(self, max_solutions=5, amelioration_locale=False, temps_amelioration=TEMPS_AMELIORATION,
+                  mode_amelioration='premier'):
+        """Solutions distinctes dans l'ordre des stratégies (max_solutions au plus)"""
+        debut = time.perf_counter()
+        solutions = []
+
+        if not self.voyages_list or not self.services_list:
+            logger.error("Données manquantes: pas de voyages ou services")
+            return solutions
+
+        deja_vues = set()
+        for strat_idx in range(len(STRATEGIES_TRI)):
+            if len(solutions) >= max_solutions:
+                break
+            solution = self.generer_solution(strat_idx, amelioration_locale, temps_amelioration,
+                                             mode_amelioration)
+            if solution is None:
+                continue
+            cle = cle_solution(solution)
+            if cle not in deja_vues:
+                deja_vues.add(cle)
+                solutions.append(solution)
+
+        self.stats['solutions_generees'] += len(solutions)
+        self.stats['temps_total'] += time.perf_counter() - debut
+
+        cache = self.cache_geo.get_stats()
+        logger.info(f"{len(solutions)} solution(s), {self.stats['evaluations_score']} évaluations, "
+                    f"cache géo {cache['hit_rate']:.1f}% ({cache['taille']} couples)")
+        return solutions
+
+
+# =============================================================================
+# ANALYSE DES SOLUTIONS
+# =============================================================================
+
+def _codes_groupes(voyages):
+    """
+    Codes entiers des groupes de départ et d'arrivée de chaque voyage, tels que
+    codes_fin[i] == codes_debut[j] <=> continuite_geo(voyages[i], voyages[j]).
+    """
+    codes = {}
+
+    def code(voy, cote):
+        groupe = getattr(voy, 'groupe_' + cote, None)
+        if groupe is not None:
+            cle = ('groupe', groupe)
         else:
-            logger.warning(f"Solution {strat_idx + 1} non générée")
+            arret = voy.arret_debut_id() if cote == 'debut' else voy.arret_fin_id()
+            cle = ('arret', str(arret)[:3])
+        return codes.setdefault(cle, len(codes))
+
+    n = len(voyages)
+    codes_debut = np.fromiter((code(v, 'debut') for v in voyages), dtype=np.int64, count=n)
+    codes_fin = np.fromiter((code(v, 'fin') for v in voyages), dtype=np.int64, count=n)
+    return codes_debut, codes_fin
 
-    logger.info("=" * 60)
-    logger.info(f"FIN OPTIMISATION: {len(solutions)} solution(s) générée(s)")
 
-    return solutions
\ No newline at end of file
+def analyser_solution(solution, voyages):
+    """
+    Indicateurs d'une solution, calculés en une passe vectorisée :
+    taux d'assignation, taux de continuité géographique entre voyages
+    consécutifs d'un service, équilibrage (écart max - min de voyages par
+    service) et nombre de services mêlant plusieurs lignes.
+    """
+    services = list(solution["services"].values())
+    nb_total = len(voyages)
+
+    tailles = np.fromiter((len(vs) for vs in services), dtype=np.int64, count=len(services))
+    indices = np.fromiter((v['index'] for vs in services for v in vs), dtype=np.int64, count=int(tailles.sum()))
+    ids_service = np.repeat(np.arange(len(services), dtype=np.int64), tailles)
+
+    # Transitions : voyages consécutifs (par heure de début) d'un même service
+    hdebuts = np.fromiter((v.hdebut for v in voyages), dtype=np.float64, count=nb_total)
+    ordre = np.lexsort((hdebuts[indices], ids_service))
+    indices, ids_service = indices[ordre], ids_service[ordre]
+    meme_service = ids_service[1:] == ids_service[:-1]
+    avant, apres = indices[:-1][meme_service], indices[1:][meme_service]
+
+    codes_debut, codes_fin = _codes_groupes(voyages)
+    nb_transitions = len(avant)
+    nb_continuite = int(np.count_nonzero(codes_fin[avant] == codes_debut[apres]))
+
+    # Lignes distinctes par service
+    lignes, codes_ligne = np.unique([str(v.num_ligne) for v in voyages], return_inverse=True)
+    paires = np.unique(ids_service * max(len(lignes), 1) + codes_ligne[indices])
+    nb_lignes = np.bincount(paires // max(len(lignes), 1), minlength=len(services))
+    nb_services_multi_lignes = int(np.count_nonzero(nb_lignes > 1))
+
+    nb_assignes = len(np.unique(indices))
+
+    return {
+        'strategie': solution.get("strategie"),
+        'nb_total': nb_total,
+        'nb_assignes': nb_assignes,
+        'nb_non_assignes': nb_total - nb_assignes,
+        'taux_assignation': 100.0 * nb_assignes / nb_total if nb_total else 0.0,
+        'nb_transitions': nb_transitions,
+        'nb_continuite': nb_continuite,
+        'taux_continuite': 100.0 * nb_continuite / nb_transitions if nb_transitions else 0.0,
+        'equilibrage': int(tailles.max() - tailles.min()) if len(tailles) else 0,
+        'nb_services_utilises': int(np.count_nonzero(tailles)),
+        'nb_services_multi_lignes': nb_services_multi_lignes,
+        'respect_ligne_unique': nb_services_multi_lignes == 0,
+    }
@@ -22,6 +22,8 @@ Structure des données d'entrée :
 =============================================================================
 """
 
+import os
+
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
@@ -30,6 +32,8 @@ from sklearn.metrics import classification_report, confusion_matrix
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime, timedelta
+
+from projetfinal.communs.heures import heure_vers_minutes, parse_heures
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -45,38 +49,34 @@ print("=" * 100)
 def heure_to_minutes(heure_str):
     """
     Convertit une heure au format HH:MM ou H:MM en minutes depuis minuit.
+    Un nombre seul est considéré comme déjà en minutes.
     
     Exemples:
         "6:00"  → 360
         "13:45" → 825
         "21:30" → 1290
     """
+    if pd.isna(heure_str):
+        return None
     try:
-        if pd.isna(heure_str):
-            return None
-        
-        # Si c'est déjà un nombre
-        if isinstance(heure_str, (int, float)):
-            return int(heure_str)
-        
-        # Si c'est une chaîne
-        heure_str = str(heure_str).strip()
-        
-        # Gérer le format HH:MM
-        if ':' in heure_str:
-            parts = heure_str.split(':')
-            heures = int(parts[0])
-            minutes = int(parts[1]) if len(parts) > 1 else 0
-            return heures * 60 + minutes
-        
-        # Si c'est juste un nombre
-        return int(float(heure_str))
-    
-    except Exception as e:
+        return heure_vers_minutes(heure_str, unite_nombres='minutes')
+    except ValueError as e:
         print(f"⚠️  Erreur conversion heure '{heure_str}': {e}")
         return None
 
 
+def colonne_heures_to_minutes(colonne):
+    """
+    Convertit toute une colonne d'heures en minutes (vectorisé).
+    Les valeurs invalides deviennent NaN, comme None avec heure_to_minutes.
+    """
+    minutes, valide = parse_heures(colonne.to_numpy(), unite_nombres='minutes')
+    nb_invalides = int((~valide & colonne.notna().to_numpy()).sum())
+    if nb_invalides:
+        print(f"⚠️  {nb_invalides} heure(s) non reconnue(s) dans '{colonne.name}'")
+    return pd.Series(np.where(valide, minutes, np.nan), index=colonne.index)
+
+
 def minutes_to_heure(minutes):
     """Convertit des minutes en format HH:MM"""
     if pd.isna(minutes):
@@ -210,8 +210,8 @@ def charger_donnees_voyages(fichier_excel, nom_feuille=0):
         print(f"Colonnes détectées : {list(df.columns)}")
     
     # Convertir les heures en minutes
-    df['heure_debut_min'] = df['heure_debut'].apply(heure_to_minutes)
-    df['heure_fin_min'] = df['heure_fin'].apply(heure_to_minutes)
+    df['heure_debut_min'] = colonne_heures_to_minutes(df['heure_debut'])
+    df['heure_fin_min'] = colonne_heures_to_minutes(df['heure_fin'])
     
     # Nettoyer les données
     df = df.dropna(subset=['num_service', 'heure_debut_min', 'heure_fin_min'])
@@ -387,14 +387,16 @@ def generer_donnees_exemple():
 
 
 # Option 2 : Charger vos vraies données (décommentez et modifiez)
-df_voyages = charger_donnees_voyages("template_donnees_voyages_v2.xlsx", nom_feuille=0)
+df_voyages = charger_donnees_voyages(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "template_donnees_voyages_v2.xlsx"), nom_feuille=0
+)
 
 # Pour l'exemple, on génère des données
 #df_voyages = generer_donnees_exemple()
 
 # IMPORTANT : Convertir les heures en minutes pour les données d'exemple
-df_voyages['heure_debut_min'] = df_voyages['heure_debut'].apply(heure_to_minutes)
-df_voyages['heure_fin_min'] = df_voyages['heure_fin'].apply(heure_to_minutes)
+df_voyages['heure_debut_min'] = colonne_heures_to_minutes(df_voyages['heure_debut'])
+df_voyages['heure_fin_min'] = colonne_heures_to_minutes(df_voyages['heure_fin'])
 
 # Nettoyer les données (supprimer les lignes avec heures invalides)
 df_voyages = df_voyages.dropna(subset=['num_service', 'heure_debut_min', 'heure_fin_min'])
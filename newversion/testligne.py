@@ -89,7 +89,7 @@ def afficher_comparaison():
 
     # Importer le solver
     try:
-        from solverv2 import optimiser_services, analyser_solution
+        from .solverv2 import optimiser_services, analyser_solution
     except ImportError:
         print("\n❌ Erreur : solver_optimise.py non trouvé")
         print("   Assurez-vous que le fichier est dans le même dossier")
@@ -5,8 +5,14 @@ Avec panneau de détails à droite et import CSV
 Optimisation avec algorithme glouton
 """
 
+import os
 import sys
 import csv
+import math
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QGraphicsView, QGraphicsScene, QGraphicsRectItem, QGraphicsTextItem,
@@ -19,16 +25,62 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, QRectF, QTime, pyqtSignal
 from PyQt6.QtGui import QBrush, QPen, QColor, QFont, QPainter
 
+from projetfinal.communs.empreintes import empreinte_services
+from projetfinal.communs.heures import heure_vers_minutes, journee_service_colonnes, parse_heures
+from projetfinal.communs.recherche_locale import RechercheLocale
+
 
 # Configuration de la timeline
 HEURE_DEBUT = 4
 HEURE_FIN = 24
+HEURE_FIN_MAX = 36  # Journée de service : les voyages après minuit vont jusqu'à 36h
 HAUTEUR_SERVICE = 50
 MARGE_GAUCHE = 80
 MARGE_HAUT = 40
 
 # Configuration de l'optimisation
 PAUSE_MIN = 5  # Minutes de pause minimum entre deux voyages
+SEUIL_PARALLELE = 20000  # voyages x services à partir duquel les tris tournent sur plusieurs processus
+NB_ORDRES_SERVICES = 20  # Ordres de services distincts essayés au plus (tirés au hasard)
+ORDRES_PAR_LOT = 4  # Ordres tirés ensemble entre deux vérifications du budget temps
+
+# Amélioration locale des solutions gloutonnes
+TEMPS_AMELIORATION = 1.0  # Budget par solution (secondes)
+
+
+def vers_journee_service(heure_debut, heure_fin):
+    """
+    Heures décimales en heures de journée de service (croissantes jusqu'à 36h) :
+    un début avant HEURE_DEBUT appartient à la nuit (+24h), une fin avant le début passe minuit.
+    """
+    if heure_debut < HEURE_DEBUT:
+        heure_debut += 24
+    if heure_fin < heure_debut:
+        heure_fin += 24
+    return heure_debut, heure_fin
+
+
+# ==================== REGISTRE DES ARRÊTS ====================
+
+# Groupe géographique d'un arrêt (3 premiers caractères, sans espaces ni casse) -> code entier.
+# Chaque nom est normalisé une seule fois ; la continuité devient une comparaison d'entiers.
+# Un arrêt vide (GROUPE_INCONNU) ne suit qu'un arrêt vide, comme dans projetfinal.
+GROUPE_INCONNU = -1
+_codes_arrets = {}
+_codes_groupes = {}
+
+
+def code_groupe_arret(arret):
+    """Retourne le code du groupe géographique d'un arrêt (GROUPE_INCONNU si vide)"""
+    code = _codes_arrets.get(arret)
+    if code is None:
+        cle = str(arret or '').strip().upper()[:3]
+        if cle:
+            code = _codes_groupes.setdefault(cle, len(_codes_groupes))
+        else:
+            code = GROUPE_INCONNU
+        _codes_arrets[arret] = code
+    return code
 
 
 # ==================== CLASSES D'OPTIMISATION ====================
@@ -41,17 +93,15 @@ class VoyageOpt:
         self.num = num
         self.depart = depart  # Arrêt de départ
         self.arrivee = arrivee  # Arrêt d'arrivée
-        self.h_debut = self.time_to_minutes(h_debut) if isinstance(h_debut, str) else int(h_debut * 60)
-        self.h_fin = self.time_to_minutes(h_fin) if isinstance(h_fin, str) else int(h_fin * 60)
+        self.groupe_depart = code_groupe_arret(depart)
+        self.groupe_arrivee = code_groupe_arret(arrivee)
+        self.h_debut = self.time_to_minutes(h_debut)
+        self.h_fin = self.time_to_minutes(h_fin)
         self.js_srv = js_srv
 
-    def time_to_minutes(self, heure_str):
-        """Convertit une heure HH:MM en minutes"""
-        try:
-            h, m = heure_str.split(':')
-            return int(h) * 60 + int(m)
-        except:
-            return 0
+    def time_to_minutes(self, heure):
+        """Convertit une heure HH:MM ou décimale en minutes (ValueError si invalide)"""
+        return heure_vers_minutes(heure)
 
     def minutes_to_time(self, minutes):
         """Convertit des minutes en HH:MM"""
@@ -62,20 +112,26 @@ class VoyageOpt:
 
 class ServiceOpt:
     """Classe Service pour l'optimisation"""
-    def __init__(self, id, nom, debut, fin):
+    def __init__(self, id, nom, debut, fin, pauses=(), coupure=None):
         self.id = id
         self.nom = nom
-        self.debut = self.time_to_minutes(debut) if isinstance(debut, str) else int(debut * 60)
-        self.fin = self.time_to_minutes(fin) if isinstance(fin, str) else int(fin * 60)
+        self.debut = self.time_to_minutes(debut)
+        self.fin = self.time_to_minutes(fin)
+        # Pauses et coupure : créneaux (début, fin) où le service ne prend aucun voyage
+        self.interdits = [(self.time_to_minutes(d), self.time_to_minutes(f)) for d, f in pauses]
+        if coupure is not None:
+            self.interdits.append((self.time_to_minutes(coupure[0]), self.time_to_minutes(coupure[1])))
         self.voyages_assignes = []  # Indices des voyages déjà assignés
 
-    def time_to_minutes(self, heure_str):
-        """Convertit une heure HH:MM en minutes"""
-        try:
-            h, m = heure_str.split(':')
-            return int(h) * 60 + int(m)
-        except:
-            return 0
+    def accepte(self, voy):
+        """Le voyage tient dans les limites du service sans chevaucher une pause ou la coupure"""
+        if voy.h_debut < self.debut or voy.h_fin > self.fin:
+            return False
+        return all(voy.h_fin <= d or voy.h_debut >= f for d, f in self.interdits)
+
+    def time_to_minutes(self, heure):
+        """Convertit une heure HH:MM ou décimale en minutes (ValueError si invalide)"""
+        return heure_vers_minutes(heure)
 
     def minutes_to_time(self, minutes):
         """Convertit des minutes en HH:MM"""
@@ -84,6 +140,81 @@ class ServiceOpt:
         return f"{h:02d}:{m:02d}"
 
 
+class GrapheSuccession:
+    """
+    Successions possibles entre voyages, calculées une fois pour toutes les stratégies.
+
+    Les ensembles de voyages sont des bitsets (entiers Python) : le bit d'un
+    voyage est son rang par heure de fin, donc le bit le plus haut d'un
+    ensemble de prédécesseurs est celui qui finit le plus tard.
+      - succ_temps[i] : voyages qui peuvent suivre i (pause comprise)
+      - succ_geo[i]   : parmi eux, ceux qui partent du groupe où i arrive
+      - pred_geo[i]   : prédécesseurs possibles de i qui arrivent où i part
+    Les prédécesseurs possibles de i sont les nb_pred[i] premiers rangs.
+    """
+
+    def __init__(self, voyages, pause_min):
+        n = len(voyages)
+        ordre_fin = sorted(range(n), key=lambda i: (voyages[i].h_fin, i))
+        self.rang = [0] * n
+        for r, i in enumerate(ordre_fin):
+            self.rang[i] = r
+        self.par_rang = ordre_fin
+
+        fins_triees = [voyages[i].h_fin + pause_min for i in ordre_fin]
+        self.nb_pred = [bisect_right(fins_triees, v.h_debut) for v in voyages]
+
+        # Suffixes par heure de début : voyages qui commencent à partir de la k-ième heure
+        ordre_debut = sorted(range(n), key=lambda i: voyages[i].h_debut)
+        debuts_tries = [voyages[i].h_debut for i in ordre_debut]
+        suffixes = [0] * (n + 1)
+        for k in range(n - 1, -1, -1):
+            suffixes[k] = suffixes[k + 1] | (1 << self.rang[ordre_debut[k]])
+
+        # Voyages par groupe de départ / d'arrivée (un arrêt inconnu ne suit qu'un arrêt inconnu)
+        par_depart, par_arrivee = {}, {}
+        for i, v in enumerate(voyages):
+            bit = 1 << self.rang[i]
+            par_depart[v.groupe_depart] = par_depart.get(v.groupe_depart, 0) | bit
+            par_arrivee[v.groupe_arrivee] = par_arrivee.get(v.groupe_arrivee, 0) | bit
+
+        self.succ_temps, self.succ_geo, self.pred_geo = [], [], []
+        for i, v in enumerate(voyages):
+            succ = suffixes[bisect_left(debuts_tries, v.h_fin + pause_min)]
+            self.succ_temps.append(succ)
+            self.succ_geo.append(succ & par_depart.get(v.groupe_arrivee, 0))
+            self.pred_geo.append(self.pred_temps(i) & par_arrivee.get(v.groupe_depart, 0))
+
+    def masque(self, indices):
+        """Bitset d'une liste d'indices de voyages"""
+        m = 0
+        for i in indices:
+            m |= 1 << self.rang[i]
+        return m
+
+    def bit(self, i):
+        return 1 << self.rang[i]
+
+    def pred_temps(self, i):
+        return (1 << self.nb_pred[i]) - 1
+
+
+# ==================== EXÉCUTION PARALLÈLE ====================
+
+# Chaque processus reçoit une seule fois l'optimiseur préparé (voyages, services, graphe) ;
+# une tâche n'envoie que le nom de la méthode et ses paramètres de tri.
+_optimiseur_processus = None
+
+
+def _initialiser_processus(optimiseur):
+    global _optimiseur_processus
+    _optimiseur_processus = optimiseur
+
+
+def _executer_tache(methode, args):
+    return getattr(_optimiseur_processus, methode)(*args)
+
+
 class Optimiseur:
     """Classe pour gérer l'optimisation des voyages - Version Glouton avec continuité géographique"""
 
@@ -93,6 +224,7 @@ class Optimiseur:
         self.pause_min = pause_min
         self.voyages_objets = []
         self.services_objets = []
+        self.graphe = None
 
     def preparer_donnees(self):
         """Prépare les données pour l'optimisation"""
@@ -122,7 +254,9 @@ class Optimiseur:
                 id=i,
                 nom=s.get('nom', f'Service {i+1}'),
                 debut=s.get('heure_debut', HEURE_DEBUT),
-                fin=s.get('heure_fin', HEURE_FIN)
+                fin=s.get('heure_fin', HEURE_FIN),
+                pauses=s.get('pauses', ()),
+                coupure=s.get('coupure')
             )
 
             # Identifier les voyages déjà assignés à ce service
@@ -132,19 +266,17 @@ class Optimiseur:
 
             self.services_objets.append(serv)
 
+        # Successions calculées une fois, partagées par toutes les stratégies
+        self.graphe = GrapheSuccession(self.voyages_objets, self.pause_min)
+
     def chevauchement(self, voy1, voy2):
         """Vérifie si deux voyages se chevauchent (avec pause)"""
         return (voy1.h_fin + self.pause_min > voy2.h_debut and
                 voy2.h_fin + self.pause_min > voy1.h_debut)
 
-    def continuite_geo(self, arrivee, depart):
-        """Vérifie la continuité géographique entre deux arrêts (3 premiers caractères)"""
-        if not arrivee or not depart:
-            return True  # Si pas d'info, on autorise
-        # Comparer les 3 premiers caractères (en ignorant la casse et les espaces)
-        arr_clean = arrivee.strip().upper()[:3]
-        dep_clean = depart.strip().upper()[:3]
-        return arr_clean == dep_clean
+    def continuite_geo(self, voy_avant, voy_apres):
+        """Vérifie la continuité géographique entre deux voyages (codes de groupe d'arrêts)"""
+        return voy_avant.groupe_arrivee == voy_apres.groupe_depart
 
     def trouver_dernier_voyage(self, voyages_indices):
         """Trouve le dernier voyage (par heure de fin) dans une liste d'indices"""
@@ -153,14 +285,38 @@ class Optimiseur:
         dernier_idx = max(voyages_indices, key=lambda i: self.voyages_objets[i].h_fin)
         return self.voyages_objets[dernier_idx]
 
-    def voyage_compatible_service(self, voy, service_idx, voyages_assignes, verifier_geo=True):
-        """Vérifie si un voyage peut être ajouté à un service"""
+    def voyage_compatible_service(self, voy, service_idx, voyages_assignes, verifier_geo=True, masque=None):
+        """
+        Vérifie si un voyage peut être ajouté à un service.
+        masque : bitset des voyages du service (graphe de succession), sinon parcours de la liste.
+        """
         serv = self.services_objets[service_idx]
 
-        # Vérifier les limites horaires
-        if voy.h_debut < serv.debut or voy.h_fin > serv.fin:
+        # Vérifier les limites horaires, les pauses et la coupure
+        if not serv.accepte(voy):
             return False
 
+        if self.graphe is not None:
+            if masque is None:
+                masque = self.graphe.masque(voyages_assignes)
+            i = voy.index
+            pred = masque & self.graphe.pred_temps(i)
+            succ = masque & self.graphe.succ_temps[i]
+
+            # Chevauchement : un voyage du service n'est ni avant ni après
+            if masque & ~(pred | succ):
+                return False
+
+            if verifier_geo and masque:
+                # Prédécesseur direct = celui qui finit le plus tard (bit le plus haut)
+                if pred and not (self.graphe.pred_geo[i] >> (pred.bit_length() - 1)) & 1:
+                    return False
+                # Tous les voyages après doivent partir de l'arrivée
+                if succ & ~self.graphe.succ_geo[i]:
+                    return False
+
+            return True
+
         # Vérifier les chevauchements
         for v_idx in voyages_assignes:
             if self.chevauchement(voy, self.voyages_objets[v_idx]):
@@ -178,7 +334,7 @@ class Optimiseur:
 
             # Si on a un prédécesseur, vérifier la continuité géographique
             if predecesseur:
-                if not self.continuite_geo(predecesseur.arrivee, voy.depart):
+                if not self.continuite_geo(predecesseur, voy):
                     return False
 
             # Vérifier aussi si le nouveau voyage peut précéder un existant
@@ -186,18 +342,27 @@ class Optimiseur:
                 v = self.voyages_objets[v_idx]
                 if voy.h_fin + self.pause_min <= v.h_debut:
                     # Le nouveau voyage précède v, vérifier la continuité
-                    if not self.continuite_geo(voy.arrivee, v.depart):
+                    if not self.continuite_geo(voy, v):
                         return False
 
         return True
 
     def optimiser_glouton(self, tri_voyages, tri_services, verifier_geo=True):
         """Algorithme glouton avec paramètres de tri"""
+        assignations, voyage_assigne = self.assigner_glouton(tri_voyages, tri_services, verifier_geo)
+        solution = self._construire_solution(assignations)
+        non_assignes = sum(1 for a in voyage_assigne if not a)
+
+        return solution, non_assignes, voyage_assigne
+
+    def assigner_glouton(self, tri_voyages, tri_services, verifier_geo=True):
+        """Glouton sans construire la solution : (assignations par service, voyage_assigne)"""
         n_voyages = len(self.voyages_objets)
         n_services = len(self.services_objets)
 
         # Initialiser les assignations avec les voyages pré-assignés
         assignations = [list(serv.voyages_assignes) for serv in self.services_objets]
+        masques = [self.graphe.masque(a) for a in assignations]
         voyage_assigne = [False] * n_voyages
 
         # Marquer les voyages pré-assignés
@@ -244,23 +409,13 @@ class Optimiseur:
             meilleur_score = -1
 
             for s_idx in services_ordre:
-                if self.voyage_compatible_service(voy, s_idx, assignations[s_idx], verifier_geo):
+                if self.voyage_compatible_service(voy, s_idx, assignations[s_idx], verifier_geo, masques[s_idx]):
                     # Calculer un score de compatibilité géographique
                     score = 0
 
-                    # Bonus si continuité avec le prédécesseur
-                    for v_exist_idx in assignations[s_idx]:
-                        v_exist = self.voyages_objets[v_exist_idx]
-                        if v_exist.h_fin + self.pause_min <= voy.h_debut:
-                            if self.continuite_geo(v_exist.arrivee, voy.depart):
-                                score += 10
-
-                    # Bonus si continuité avec le successeur
-                    for v_exist_idx in assignations[s_idx]:
-                        v_exist = self.voyages_objets[v_exist_idx]
-                        if voy.h_fin + self.pause_min <= v_exist.h_debut:
-                            if self.continuite_geo(voy.arrivee, v_exist.depart):
-                                score += 10
+                    # Bonus si continuité avec les prédécesseurs et les successeurs
+                    score += 10 * (masques[s_idx] & self.graphe.pred_geo[v_idx]).bit_count()
+                    score += 10 * (masques[s_idx] & self.graphe.succ_geo[v_idx]).bit_count()
 
                     # Bonus si le service a moins de voyages (équilibrage)
                     score += (10 - len(assignations[s_idx]))
@@ -271,13 +426,34 @@ class Optimiseur:
 
             if meilleur_service is not None:
                 assignations[meilleur_service].append(v_idx)
+                masques[meilleur_service] |= self.graphe.bit(v_idx)
                 voyage_assigne[v_idx] = True
 
-        # Construire la solution
-        solution = self._construire_solution(assignations)
-        non_assignes = sum(1 for a in voyage_assigne if not a)
-
-        return solution, non_assignes, voyage_assigne
+        return assignations, voyage_assigne
+
+    def ameliorer_solution(self, assignations, verifier_geo=True, temps_max=TEMPS_AMELIORATION, mode='premier'):
+        """
+        Recherche locale sur des assignations gloutonnes. Les voyages pré-assignés
+        ne bougent pas ; avec verifier_geo, toute transition garde la continuité géo.
+        Retourne (solution, non_assignes, statistiques).
+        """
+        assignations, non_assignes, stats = self.ameliorer_assignations(assignations, verifier_geo, temps_max, mode)
+        return self._construire_solution(assignations), non_assignes, stats
+
+    def ameliorer_assignations(self, assignations, verifier_geo=True, temps_max=TEMPS_AMELIORATION, mode='premier'):
+        """Comme ameliorer_solution, sans construire la solution : (assignations, non_assignes, statistiques)"""
+        voyages = self.voyages_objets
+        services = self.services_objets
+        fixes = {v for serv in services for v in serv.voyages_assignes}
+
+        # Mêmes règles que le glouton : service (limites, pauses, coupure) et continuité géo
+        recherche = RechercheLocale(
+            [v.h_debut for v in voyages], [v.h_fin for v in voyages],
+            [v.groupe_depart for v in voyages], [v.groupe_arrivee for v in voyages],
+            lambda s, i: services[s].accepte(voyages[i]), self.pause_min, fixes, geo_stricte=verifier_geo
+        )
+        assignations, libres = recherche.ameliorer(assignations, temps_max, mode)
+        return assignations, len(libres), recherche.stats
 
     def _construire_solution(self, assignations):
         """Construit l'objet solution à partir des assignations"""
@@ -312,17 +488,58 @@ class Optimiseur:
 
         return solution
 
-    def _solution_hash(self, solution):
-        """Génère un hash pour identifier une solution unique"""
-        hash_parts = []
-        for s_id in sorted(solution["services"].keys()):
-            service = solution["services"][s_id]
-            indices = tuple(v["index"] for v in service["voyages"])
-            hash_parts.append((s_id, indices))
-        return str(hash_parts)
-
-    def optimiser(self, max_solutions=10, timeout_seconds=30):
-        """Lance l'optimisation et retourne plusieurs solutions"""
+    def _empreinte(self, assignations):
+        """Empreinte 64 bits des assignations (identifie une solution unique)"""
+        return empreinte_services(assignations, len(self.voyages_objets))
+
+    def _creer_executor(self, parallele, max_workers):
+        """Pool de processus pour les tris, ou None si le séquentiel suffit"""
+        workers = max_workers or os.cpu_count() or 1
+        charge = len(self.voyages_objets) * len(self.services_objets)
+        if not parallele or workers <= 1 or charge < SEUIL_PARALLELE:
+            return None
+        try:
+            return ProcessPoolExecutor(max_workers=workers, initializer=_initialiser_processus,
+                                       initargs=(self,))
+        except (OSError, NotImplementedError):
+            return None
+
+    def _resultats(self, taches, executor):
+        """
+        Résultats des tâches (méthode, args) dans l'ordre des tâches, quel que soit
+        l'ordre de fin des processus. Arrêter l'itération annule les tâches restantes.
+        """
+        if executor is None:
+            for methode, args in taches:
+                yield getattr(self, methode)(*args)
+            return
+
+        futures = [executor.submit(_executer_tache, methode, args) for methode, args in taches]
+        try:
+            for i, future in enumerate(futures):
+                try:
+                    yield future.result()
+                except BrokenProcessPool:
+                    for methode, args in taches[i:]:
+                        yield getattr(self, methode)(*args)
+                    return
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def optimiser(self, max_solutions=10, timeout_seconds=30, parallele=True, max_workers=None,
+                  amelioration_locale=False, temps_amelioration=TEMPS_AMELIORATION, mode_amelioration='premier',
+                  graine=None):
+        """
+        Lance l'optimisation et retourne plusieurs solutions.
+        Sur un grand réseau, les tris tournent en parallèle ; les solutions sont
+        fusionnées dans l'ordre des tris, donc identiques au séquentiel.
+        timeout_seconds : plus de nouvel ordre de services tiré passé ce délai.
+        graine : tirage des ordres de services reproductible (None : module random).
+        amelioration_locale : recherche locale sur chaque solution retenue
+        (temps_amelioration secondes chacune, mode 'premier' ou 'meilleur').
+        """
+        limite = time.perf_counter() + timeout_seconds
         self.preparer_donnees()
 
         if not self.voyages_objets:
@@ -331,89 +548,93 @@ class Optimiseur:
         if not self.services_objets:
             return None, "Aucun service créé"
 
+        executor = None
         try:
             import random
 
             solutions = []
-            solutions_hashes = set()
+            empreintes = set()
             meilleur_non_assignes = len(self.voyages_objets)
 
             n_services = len(self.services_objets)
-            n_voyages = len(self.voyages_objets)
-
-            # Essayer différentes combinaisons de tri
-            tris_voyages = ['debut', 'fin', 'duree', 'duree_desc', 'ligne', 'depart']
-            tris_services = ['normal', 'debut', 'fin', 'inverse']
-
-            # D'abord essayer AVEC contrainte géo (prioritaire)
-            for tri_v in tris_voyages:
-                for tri_s in tris_services:
-                    solution, non_assignes, _ = self.optimiser_glouton(tri_v, tri_s, verifier_geo=True)
-
-                    sol_hash = self._solution_hash(solution)
-                    if sol_hash not in solutions_hashes:
-                        solutions_hashes.add(sol_hash)
-                        solution["methode"] = f"Tri: {tri_v}/{tri_s} (avec continuité géo)"
+            executor = self._creer_executor(parallele, max_workers)
+
+            def collecter(taches, methodes, avec_geo):
+                """Ajoute les solutions nouvelles dans l'ordre des tâches ; vrai quand il y en a assez"""
+                nonlocal meilleur_non_assignes
+                for (assignations, voyage_assigne), methode in zip(self._resultats(taches, executor), methodes):
+                    empreinte = self._empreinte(assignations)
+                    if empreinte not in empreintes:
+                        empreintes.add(empreinte)
+                        non_assignes = sum(1 for a in voyage_assigne if not a)
+                        solution = self._construire_solution(assignations)
+                        solution["methode"] = methode
                         solution["non_assignes"] = non_assignes
-                        solution["avec_geo"] = True
+                        solution["avec_geo"] = avec_geo
                         solutions.append(solution)
 
                         if non_assignes < meilleur_non_assignes:
                             meilleur_non_assignes = non_assignes
 
                     if len(solutions) >= max_solutions:
-                        break
-                if len(solutions) >= max_solutions:
-                    break
+                        return True
+                return False
+
+            # Essayer différentes combinaisons de tri
+            tris_voyages = ['debut', 'fin', 'duree', 'duree_desc', 'ligne', 'depart']
+            tris_services = ['normal', 'debut', 'fin', 'inverse']
+            combinaisons = [(tri_v, tri_s) for tri_v in tris_voyages for tri_s in tris_services]
+
+            # D'abord essayer AVEC contrainte géo (prioritaire)
+            assez = collecter(
+                [('assigner_glouton', (tri_v, tri_s, True)) for tri_v, tri_s in combinaisons],
+                [f"Tri: {tri_v}/{tri_s} (avec continuité géo)" for tri_v, tri_s in combinaisons],
+                True
+            )
 
-            # Si pas assez de solutions, essayer avec permutations de services
-            if len(solutions) < max_solutions and n_services <= 8:
+            # Si pas assez de solutions, essayer des ordres de services tirés au hasard,
+            # par lots, tant qu'il reste du temps (timeout_seconds depuis le début)
+            if not assez:
                 import itertools
-                perms = list(itertools.permutations(range(n_services)))
-                random.shuffle(perms)  # Mélanger pour avoir de la variété
-
-                for perm in perms[:20]:  # Limiter à 20 permutations
-                    for tri_v in ['debut', 'fin', 'ligne']:
-                        # Créer un ordre de services basé sur la permutation
-                        solution, non_assignes, _ = self.optimiser_avec_ordre(tri_v, list(perm), verifier_geo=True)
-
-                        sol_hash = self._solution_hash(solution)
-                        if sol_hash not in solutions_hashes:
-                            solutions_hashes.add(sol_hash)
-                            solution["methode"] = f"Permutation services (avec géo)"
-                            solution["non_assignes"] = non_assignes
-                            solution["avec_geo"] = True
-                            solutions.append(solution)
-
-                            if non_assignes < meilleur_non_assignes:
-                                meilleur_non_assignes = non_assignes
-
-                        if len(solutions) >= max_solutions:
-                            break
-                    if len(solutions) >= max_solutions:
-                        break
+                ordres = self.ordres_services(random.Random(graine) if graine is not None else random)
+                nb_ordres = 0
+                while not assez and nb_ordres < NB_ORDRES_SERVICES and time.perf_counter() < limite:
+                    lot = list(itertools.islice(ordres, min(ORDRES_PAR_LOT, NB_ORDRES_SERVICES - nb_ordres)))
+                    if not lot:
+                        break  # Tous les ordres distincts ont été essayés
+                    nb_ordres += len(lot)
+                    taches = [('assigner_avec_ordre', (tri_v, ordre, True))
+                              for ordre in lot for tri_v in ['debut', 'fin', 'ligne']]
+                    assez = collecter(taches, ["Permutation services (avec géo)"] * len(taches), True)
 
             # Ensuite essayer SANS contrainte géo (pour comparer)
-            if len(solutions) < max_solutions:
-                for tri_v in tris_voyages:
-                    for tri_s in tris_services:
-                        solution, non_assignes, _ = self.optimiser_glouton(tri_v, tri_s, verifier_geo=False)
-
-                        sol_hash = self._solution_hash(solution)
-                        if sol_hash not in solutions_hashes:
-                            solutions_hashes.add(sol_hash)
-                            solution["methode"] = f"Tri: {tri_v}/{tri_s} (SANS contrainte géo)"
-                            solution["non_assignes"] = non_assignes
-                            solution["avec_geo"] = False
-                            solutions.append(solution)
-
-                            if non_assignes < meilleur_non_assignes:
-                                meilleur_non_assignes = non_assignes
-
-                        if len(solutions) >= max_solutions:
-                            break
-                    if len(solutions) >= max_solutions:
-                        break
+            if not assez:
+                collecter(
+                    [('assigner_glouton', (tri_v, tri_s, False)) for tri_v, tri_s in combinaisons],
+                    [f"Tri: {tri_v}/{tri_s} (SANS contrainte géo)" for tri_v, tri_s in combinaisons],
+                    False
+                )
+
+            if amelioration_locale and solutions:
+                taches = [('ameliorer_assignations',
+                           ([[v["index"] for v in service["voyages"]] for service in sol["services"].values()],
+                            sol["avec_geo"], temps_amelioration, mode_amelioration))
+                          for sol in solutions]
+                ameliorees = []
+                empreintes = set()
+                for sol, (assignations, non_assignes, stats) in zip(solutions, self._resultats(taches, executor)):
+                    empreinte = self._empreinte(assignations)
+                    if empreinte in empreintes:
+                        continue
+                    empreintes.add(empreinte)
+                    solution = self._construire_solution(assignations)
+                    solution["methode"] = sol["methode"] + " + amélioration locale"
+                    solution["non_assignes"] = non_assignes
+                    solution["avec_geo"] = sol["avec_geo"]
+                    solution["amelioration"] = stats
+                    ameliorees.append(solution)
+                solutions = ameliorees
+                meilleur_non_assignes = min(s["non_assignes"] for s in solutions)
 
             # Trier: d'abord celles avec géo, puis par non_assignes
             solutions.sort(key=lambda s: (not s.get("avec_geo", False), s.get("non_assignes", 999)))
@@ -439,12 +660,62 @@ class Optimiseur:
             traceback.print_exc()
             return None, f"Erreur lors de l'optimisation: {str(e)}"
 
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def ordres_services(self, rng):
+        """
+        Ordres de services tirés au hasard un par un, sans construire la liste des
+        permutations. Les services qui ne peuvent recevoir aucun voyage libre sont
+        omis, et deux services identiques (même plage, aucun voyage pré-assigné)
+        sont interchangeables : un ordre qui donnerait la même affectation qu'un
+        ordre déjà tiré n'est pas proposé. S'arrête quand tous ont été tirés.
+        """
+        fixes = {v_idx for serv in self.services_objets for v_idx in serv.voyages_assignes}
+        libres = [voy for voy in self.voyages_objets if voy.index not in fixes]
+        utiles = [s_idx for s_idx, serv in enumerate(self.services_objets)
+                  if any(serv.accepte(voy) for voy in libres)]
+
+        # Classe d'un service : les services d'une même classe sont interchangeables
+        classes = {}
+        classe = {}
+        tailles = {}
+        for s_idx in utiles:
+            serv = self.services_objets[s_idx]
+            c = classes.setdefault((serv.debut, serv.fin, tuple(serv.interdits), tuple(serv.voyages_assignes)), len(classes))
+            classe[s_idx] = c
+            tailles[c] = tailles.get(c, 0) + 1
+
+        # Nombre d'ordres qui donnent des affectations différentes
+        nb_distincts = math.factorial(len(utiles))
+        for taille in tailles.values():
+            nb_distincts //= math.factorial(taille)
+
+        ordre = list(utiles)
+        vus = set()
+        while len(vus) < nb_distincts:
+            rng.shuffle(ordre)
+            cle = tuple(classe[s_idx] for s_idx in ordre)
+            if cle not in vus:
+                vus.add(cle)
+                yield list(ordre)
+
     def optimiser_avec_ordre(self, tri_voyages, ordre_services, verifier_geo=True):
         """Optimise avec un ordre de services spécifique"""
+        assignations, voyage_assigne = self.assigner_avec_ordre(tri_voyages, ordre_services, verifier_geo)
+        solution = self._construire_solution(assignations)
+        non_assignes = sum(1 for a in voyage_assigne if not a)
+
+        return solution, non_assignes, voyage_assigne
+
+    def assigner_avec_ordre(self, tri_voyages, ordre_services, verifier_geo=True):
+        """Premier service compatible dans l'ordre donné : (assignations, voyage_assigne)"""
         n_voyages = len(self.voyages_objets)
         n_services = len(self.services_objets)
 
         assignations = [list(serv.voyages_assignes) for serv in self.services_objets]
+        masques = [self.graphe.masque(a) for a in assignations]
         voyage_assigne = [False] * n_voyages
 
         for s_idx, serv in enumerate(self.services_objets):
@@ -470,15 +741,13 @@ class Optimiseur:
             voy = self.voyages_objets[v_idx]
 
             for s_idx in ordre_services:
-                if self.voyage_compatible_service(voy, s_idx, assignations[s_idx], verifier_geo):
+                if self.voyage_compatible_service(voy, s_idx, assignations[s_idx], verifier_geo, masques[s_idx]):
                     assignations[s_idx].append(v_idx)
+                    masques[s_idx] |= self.graphe.bit(v_idx)
                     voyage_assigne[v_idx] = True
                     break
 
-        solution = self._construire_solution(assignations)
-        non_assignes = sum(1 for a in voyage_assigne if not a)
-
-        return solution, non_assignes, voyage_assigne
+        return assignations, voyage_assigne
 
 
 class DialogResultatsOptimisation(QDialog):
@@ -598,9 +867,9 @@ class DialogResultatsOptimisation(QDialog):
                     # Vérifier la continuité géographique avec le voyage précédent
                     geo_warning = ""
                     if prev_voyage:
-                        prev_arrivee = prev_voyage.get('arrivee', '').strip().upper()[:3]
-                        curr_depart = voyage.get('depart', '').strip().upper()[:3]
-                        if prev_arrivee and curr_depart and prev_arrivee != curr_depart:
+                        prev_arrivee = code_groupe_arret(prev_voyage.get('arrivee', ''))
+                        curr_depart = code_groupe_arret(voyage.get('depart', ''))
+                        if prev_arrivee != curr_depart:
                             geo_warning = " ⚠️ RUPTURE GÉO"
                             problemes_geo.append(f"{service_data['nom']}: {prev_voyage.get('arrivee', '')} → {voyage.get('depart', '')}")
 
@@ -745,7 +1014,16 @@ class TimelineView(QGraphicsView):
     def get_pixels_par_heure(self):
         """Calcule dynamiquement les pixels par heure selon la largeur disponible"""
         largeur_disponible = self.viewport().width() - MARGE_GAUCHE - 20
-        return largeur_disponible / (HEURE_FIN - HEURE_DEBUT)
+        return largeur_disponible / (self.heure_fin_timeline() - HEURE_DEBUT)
+
+    def heure_fin_timeline(self):
+        """HEURE_FIN, prolongée jusqu'à HEURE_FIN_MAX si un service ou un voyage passe minuit"""
+        fin = HEURE_FIN
+        for service in self.services_data:
+            fin = max(fin, service.get('heure_fin', HEURE_FIN))
+            for voyage in service.get('voyages', []):
+                fin = max(fin, voyage.get('heure_depart', 0) + voyage.get('duree_minutes', 0) / 60)
+        return min(int(-(-fin // 1)), HEURE_FIN_MAX)
 
     def resizeEvent(self, event):
         """Redessine la timeline quand la vue est redimensionnée"""
@@ -788,17 +1066,18 @@ class TimelineView(QGraphicsView):
 
     def _dessiner_echelle_temps(self, pixels_par_heure):
         """Dessine l'échelle de temps en haut"""
-        largeur_totale = (HEURE_FIN - HEURE_DEBUT) * pixels_par_heure
+        heure_fin = self.heure_fin_timeline()
+        largeur_totale = (heure_fin - HEURE_DEBUT) * pixels_par_heure
 
-        for heure in range(HEURE_DEBUT, HEURE_FIN + 1):
+        for heure in range(HEURE_DEBUT, heure_fin + 1):
             x = MARGE_GAUCHE + (heure - HEURE_DEBUT) * pixels_par_heure
 
             ligne = QGraphicsLineItem(x, MARGE_HAUT - 10, x, MARGE_HAUT)
             ligne.setPen(QPen(QColor('#7f8c8d'), 1))
             self.scene.addItem(ligne)
 
-            # Afficher 24h comme "00h" si on veut, ou garder "24h"
-            heure_affichee = heure if heure < 24 else 0
+            # Après minuit : 24h -> "00h", 25h -> "01h"...
+            heure_affichee = heure % 24
             label = QGraphicsTextItem(f"{heure_affichee:02d}h")
             label.setDefaultTextColor(QColor('#7f8c8d'))
             label.setFont(QFont("Arial", 8))
@@ -814,7 +1093,8 @@ class TimelineView(QGraphicsView):
 
     def _dessiner_service(self, service_data, y_position, pixels_par_heure):
         """Dessine une ligne de service avec ses limites d'heures"""
-        largeur_totale = (HEURE_FIN - HEURE_DEBUT) * pixels_par_heure
+        heure_fin = self.heure_fin_timeline()
+        largeur_totale = (heure_fin - HEURE_DEBUT) * pixels_par_heure
 
         # Limites du service
         service_heure_debut = service_data.get('heure_debut', HEURE_DEBUT)
@@ -844,9 +1124,9 @@ class TimelineView(QGraphicsView):
             fond_avant.setZValue(-1)
             self.scene.addItem(fond_avant)
 
-        if service_heure_fin < HEURE_FIN:
+        if service_heure_fin < heure_fin:
             x_apres = MARGE_GAUCHE + (service_heure_fin - HEURE_DEBUT) * pixels_par_heure
-            largeur_apres = (HEURE_FIN - service_heure_fin) * pixels_par_heure
+            largeur_apres = (heure_fin - service_heure_fin) * pixels_par_heure
             fond_apres = QGraphicsRectItem(x_apres, y_position - 25, largeur_apres, HAUTEUR_SERVICE)
             fond_apres.setBrush(QBrush(QColor(200, 200, 200, 100)))
             fond_apres.setPen(QPen(Qt.PenStyle.NoPen))
@@ -1737,54 +2017,59 @@ class DialogImportCSV(QDialog):
 
         couleurs = ['#3498db', '#e74c3c', '#2ecc71', '#f39c12', '#9b59b6', '#1abc9c']
 
+        lignes = []
         for row in range(self.tableau.rowCount()):
             checkbox = self.get_checkbox(row)
             if checkbox and checkbox.isChecked():
-                voyage_dict = self.donnees[row]
-
-                # Convertir les heures en format décimal
-                heure_debut_str = voyage_dict.get('Début', '00:00').strip()
-                heure_fin_str = voyage_dict.get('Fin', '00:00').strip()
-
-                try:
-                    h_deb, m_deb = map(int, heure_debut_str.replace('h', ':').replace('H', ':').split(':'))
-                    heure_debut = h_deb + m_deb / 60
-                except:
-                    heure_debut = 8.0
-
-                try:
-                    h_fin, m_fin = map(int, heure_fin_str.replace('h', ':').replace('H', ':').split(':'))
-                    heure_fin = h_fin + m_fin / 60
-                except:
-                    heure_fin = heure_debut + 1
-
-                # Calculer la durée
-                duree_minutes = int((heure_fin - heure_debut) * 60)
-                if duree_minutes <= 0:
-                    duree_minutes = 60  # Durée par défaut
+                lignes.append(row)
+
+        # Heures converties en une fois pour toute la sélection ("7h30" accepté comme "7:30"),
+        # puis en minutes de journée de service (voyages de nuit)
+        def colonne(nom):
+            return [(self.donnees[row].get(nom) or '').strip().replace('h', ':').replace('H', ':') for row in lignes]
+
+        hdebuts, debuts_ok = parse_heures(colonne('Début'))
+        hfins, fins_ok = parse_heures(colonne('Fin'))
+        hdebuts, hfins = journee_service_colonnes(hdebuts, hfins)
+
+        nb_ignores = 0
+        for row, hdebut, hfin, valide in zip(lignes, hdebuts.tolist(), hfins.tolist(), (debuts_ok & fins_ok).tolist()):
+            voyage_dict = self.donnees[row]
+            if not valide:
+                print(f"⚠️ Heure invalide, voyage ignoré : ligne {row + 1} ({voyage_dict.get('Début')} - {voyage_dict.get('Fin')})")
+                nb_ignores += 1
+                continue
 
-                arret_depart = voyage_dict.get('De', '').strip()
-                arret_arrivee = voyage_dict.get('À', '').strip()
-                num_ligne = voyage_dict.get('Ligne', '').strip()
+            heure_debut = hdebut / 60
+            duree_minutes = hfin - hdebut
+            if duree_minutes <= 0:
+                duree_minutes = 60  # Durée par défaut
+
+            arret_depart = voyage_dict.get('De', '').strip()
+            arret_arrivee = voyage_dict.get('À', '').strip()
+            num_ligne = voyage_dict.get('Ligne', '').strip()
+
+            # Couleur basée sur le numéro de ligne
+            try:
+                couleur_idx = int(num_ligne) % len(couleurs) if num_ligne.isdigit() else hash(num_ligne) % len(couleurs)
+            except:
+                couleur_idx = row % len(couleurs)
+
+            voyage_data = {
+                'nom': f"{arret_depart} → {arret_arrivee}",
+                'numero_ligne': num_ligne,
+                'numero_voyage': voyage_dict.get('Voy.', '').strip(),
+                'heure_depart': heure_debut,
+                'duree_minutes': duree_minutes,
+                'arret_depart': arret_depart,
+                'arret_arrivee': arret_arrivee,
+                'js_srv': voyage_dict.get('Js srv', '').strip(),
+                'couleur': couleurs[couleur_idx]
+            }
+            self.voyages_importes.append(voyage_data)
 
-                # Couleur basée sur le numéro de ligne
-                try:
-                    couleur_idx = int(num_ligne) % len(couleurs) if num_ligne.isdigit() else hash(num_ligne) % len(couleurs)
-                except:
-                    couleur_idx = row % len(couleurs)
-
-                voyage_data = {
-                    'nom': f"{arret_depart} → {arret_arrivee}",
-                    'numero_ligne': num_ligne,
-                    'numero_voyage': voyage_dict.get('Voy.', '').strip(),
-                    'heure_depart': heure_debut,
-                    'duree_minutes': duree_minutes,
-                    'arret_depart': arret_depart,
-                    'arret_arrivee': arret_arrivee,
-                    'js_srv': voyage_dict.get('Js srv', '').strip(),
-                    'couleur': couleurs[couleur_idx]
-                }
-                self.voyages_importes.append(voyage_data)
+        if nb_ignores:
+            QMessageBox.warning(self, "Attention", f"{nb_ignores} voyage(s) ignoré(s) : heure de début ou de fin invalide")
 
         if not self.voyages_importes:
             QMessageBox.warning(self, "Attention", "Aucun voyage sélectionné")
@@ -1818,18 +2103,12 @@ class DialogAjoutService(QDialog):
         self.heure_debut.setDisplayFormat("HH:mm")
         layout.addRow("Heure de début:", self.heure_debut)
 
-        # Heure de fin
+        # Heure de fin (une fin avant le début = service qui passe minuit, 00:00 = minuit)
         self.heure_fin = QTimeEdit()
-        self.heure_fin.setTime(QTime(24, 0) if QTime(24, 0).isValid() else QTime(23, 59))
+        self.heure_fin.setTime(QTime(0, 0))
         self.heure_fin.setDisplayFormat("HH:mm")
         layout.addRow("Heure de fin:", self.heure_fin)
 
-        # Note: pour 24h, on utilisera 23:59 ou on gère spécialement
-        self.checkbox_minuit = QCheckBox("Jusqu'à minuit (24:00)")
-        self.checkbox_minuit.setChecked(True)
-        self.checkbox_minuit.stateChanged.connect(self.on_minuit_change)
-        layout.addRow("", self.checkbox_minuit)
-
         # Couleur
         self.couleur_combo = QComboBox()
         couleurs = [
@@ -1853,26 +2132,16 @@ class DialogAjoutService(QDialog):
         buttons.rejected.connect(self.reject)
         layout.addRow(buttons)
 
-        self.on_minuit_change()
-
-    def on_minuit_change(self):
-        """Active/désactive le champ heure de fin selon la checkbox"""
-        if self.checkbox_minuit.isChecked():
-            self.heure_fin.setEnabled(False)
-            self.heure_fin.setTime(QTime(23, 59))
-        else:
-            self.heure_fin.setEnabled(True)
-
     def get_data(self):
-        """Retourne les données du service"""
+        """Retourne les données du service (heures de journée de service)"""
         time_debut = self.heure_debut.time()
-        heure_debut_dec = time_debut.hour() + time_debut.minute() / 60
-
-        if self.checkbox_minuit.isChecked():
-            heure_fin_dec = 24.0
-        else:
-            time_fin = self.heure_fin.time()
-            heure_fin_dec = time_fin.hour() + time_fin.minute() / 60
+        time_fin = self.heure_fin.time()
+        heure_debut_dec, heure_fin_dec = vers_journee_service(
+            time_debut.hour() + time_debut.minute() / 60,
+            time_fin.hour() + time_fin.minute() / 60
+        )
+        if heure_fin_dec == heure_debut_dec:
+            heure_fin_dec += 24
 
         return {
             'nom': self.nom_edit.text() or "Nouveau service",
@@ -1956,6 +2225,8 @@ class DialogAjoutVoyage(QDialog):
     def get_data(self):
         time = self.heure_depart.time()
         heure_decimale = time.hour() + time.minute() / 60
+        if heure_decimale < HEURE_DEBUT:
+            heure_decimale += 24  # Voyage de nuit : fin de la journée de service
 
         # Créer le nom à partir des arrêts
         arret_dep = self.arret_depart_edit.text() or "Départ"
@@ -2082,7 +2353,7 @@ class MainWindow(QMainWindow):
             )
 
             # Lancer l'optimisation
-            solutions, message = optimiseur.optimiser(max_solutions=5)
+            solutions, message = optimiseur.optimiser(max_solutions=5, amelioration_locale=True)
 
             if solutions:
                 self.info_label.setText(f"✅ {message}")
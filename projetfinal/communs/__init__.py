@@ -0,0 +1,8 @@
+"""
+Modules communs à projetfinal, newversion et programmeglouton.py
+(heures, registre des arrêts, graphe de succession, couverture par
+chemins, empreintes, recherche locale, exécution parallèle).
+
+Depuis projetfinal/ : from communs.heures import parse_heures
+Depuis la racine du dépôt : from projetfinal.communs.heures import parse_heures
+"""
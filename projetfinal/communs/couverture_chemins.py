@@ -0,0 +1,188 @@
+"""
+Nombre minimum de services : couverture minimale par chemins du graphe de succession
+Fichier: communs/couverture_chemins.py
+
+Un service est une chaîne de voyages où chaque voyage suit directement le
+précédent (arc du graphe : pause respectée et, avec geo, départ du groupe
+d'arrivée). Sans limite de durée ni plage horaire, le minimum de services est
+n - (couplage maximum), le couplage reliant chaque voyage à son successeur
+direct.
+
+Sans fenêtre d'attente (graphe construit sans attente_max), les successeurs
+d'un voyage sont, dans son groupe d'arrivée, tous les départs après sa fin +
+pause : un suffixe des départs triés. Un balayage par groupe donne alors un
+couplage maximum en O(n log n), sans construire les O(n²) arcs. Avec une
+fenêtre d'attente, le couplage est calculé par Hopcroft-Karp sur les arcs du
+graphe, en O(arcs x racine(n)).
+
+Sans fenêtre, c'est une borne inférieure pour les solvers : durées, plages
+horaires et voyages fixes ne peuvent qu'ajouter des services. Les voyages sont
+supposés de durée non nulle, ou pause_min > 0 : le graphe est alors sans cycle.
+"""
+
+import numpy as np
+
+from .graphe_succession import GEO, TEMPS
+
+
+def adjacence(graphe, geo=True):
+    """Successeurs directs de chaque voyage (listes Python), triés par heure de début"""
+    sources, cibles = graphe.arcs(TEMPS | GEO if geo else TEMPS)
+    pointeurs = np.zeros(len(graphe) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=len(graphe)), out=pointeurs[1:])
+    cibles = cibles.tolist()
+    pointeurs = pointeurs.tolist()
+    return [cibles[pointeurs[i]:pointeurs[i + 1]] for i in range(len(graphe))]
+
+
+def couplage_maximum(successeurs, nb_droite=None):
+    """
+    Hopcroft-Karp sur le biparti (voyage -> successeur direct).
+    Retourne (suivant, precedent) : suivant[i] = voyage qui suit i (-1 sinon),
+    precedent[j] = voyage qui précède j (-1 sinon).
+    """
+    n = len(successeurs)
+    nb_droite = n if nb_droite is None else nb_droite
+    suivant = [-1] * n
+    precedent = [-1] * nb_droite
+
+    # Couplage glouton de départ : le premier successeur libre
+    for u, voisins in enumerate(successeurs):
+        for v in voisins:
+            if precedent[v] < 0:
+                suivant[u] = v
+                precedent[v] = u
+                break
+
+    infini = n + 1
+    while True:
+        # Niveaux depuis les voyages sans successeur (BFS)
+        niveau = [infini] * n
+        file = [u for u in range(n) if suivant[u] < 0]
+        for u in file:
+            niveau[u] = 0
+        chemin_trouve = False
+        k = 0
+        while k < len(file):
+            u = file[k]
+            k += 1
+            for v in successeurs[u]:
+                w = precedent[v]
+                if w < 0:
+                    chemin_trouve = True
+                elif niveau[w] == infini:
+                    niveau[w] = niveau[u] + 1
+                    file.append(w)
+        if not chemin_trouve:
+            return suivant, precedent
+
+        # Chemins augmentants disjoints (DFS itératif, un pointeur d'arc par voyage)
+        position = [0] * n
+        for racine in range(n):
+            if suivant[racine] >= 0 or niveau[racine] != 0:
+                continue
+            pile = [racine]
+            while pile:
+                u = pile[-1]
+                voisins = successeurs[u]
+                if position[u] == len(voisins):
+                    niveau[u] = infini  # impasse pour cette phase
+                    pile.pop()
+                    continue
+                v = voisins[position[u]]
+                position[u] += 1
+                w = precedent[v]
+                if w < 0:
+                    # Augmenter : chaque voyage de la pile prend l'ancien successeur du suivant
+                    for u in reversed(pile):
+                        ancien = suivant[u]
+                        suivant[u] = v
+                        precedent[v] = u
+                        v = ancien
+                    break
+                if niveau[w] == niveau[u] + 1:
+                    pile.append(w)
+
+
+def couplage_par_balayage(hdebut, hfin, groupe_debut, groupe_fin, pause_min=0, geo=True):
+    """
+    Couplage maximum quand i -> j dès que hfin[i] + pause_min <= hdebut[j] (et même
+    groupe avec geo). Les départs sont balayés par heure croissante ; chacun prend
+    le voyage disponible arrivé le plus tard (attente la plus courte). Tous les
+    voyages disponibles peuvent suivre les départs suivants : le choix ne réduit
+    pas le couplage. Retourne (suivant, precedent) comme couplage_maximum.
+    """
+    n = len(hdebut)
+    suivant = [-1] * n
+    precedent = [-1] * n
+    hdebut = np.asarray(hdebut)
+    pretes = np.asarray(hfin) + pause_min
+    if geo:
+        groupes_fin, groupes_debut = np.asarray(groupe_fin), np.asarray(groupe_debut)
+    else:
+        groupes_fin = groupes_debut = np.zeros(n, dtype=np.int32)
+
+    arrivees = np.lexsort((pretes, groupes_fin)).tolist()
+    departs = np.lexsort((hdebut, groupes_debut)).tolist()
+    groupes_fin, groupes_debut = groupes_fin.tolist(), groupes_debut.tolist()
+    pretes, hdebut = pretes.tolist(), hdebut.tolist()
+
+    a = 0
+    disponibles = []
+    groupe = None
+    for j in departs:
+        if groupes_debut[j] != groupe:
+            groupe = groupes_debut[j]
+            disponibles = []
+            while a < len(arrivees) and groupes_fin[arrivees[a]] < groupe:
+                a += 1
+        # Voyages arrivés dans le groupe et prêts avant ce départ (triés par heure prête)
+        while a < len(arrivees) and groupes_fin[arrivees[a]] == groupe and pretes[arrivees[a]] <= hdebut[j]:
+            disponibles.append(arrivees[a])
+            a += 1
+        if not disponibles:
+            continue
+        i = disponibles.pop()
+        suivant[i] = j
+        precedent[j] = i
+    return suivant, precedent
+
+
+def chaines_depuis_couplage(suivant, precedent, hdebut=None):
+    """Chaînes de voyages (une par service), triées par heure de début du premier voyage"""
+    chaines = []
+    for debut in range(len(suivant)):
+        if precedent[debut] >= 0:
+            continue
+        chaine = [debut]
+        while suivant[chaine[-1]] >= 0:
+            chaine.append(suivant[chaine[-1]])
+        chaines.append(chaine)
+    if hdebut is not None:
+        chaines.sort(key=lambda chaine: hdebut[chaine[0]])
+    return chaines
+
+
+def couverture_sans_fenetre(hdebut, hfin, groupe_debut, groupe_fin, pause_min=0, geo=True):
+    """
+    (nombre minimum de services, chaînes) depuis les tableaux des voyages (une
+    VoyageTable ou un GrapheSuccession les fournissent), sans construire les arcs.
+    """
+    suivant, precedent = couplage_par_balayage(hdebut, hfin, groupe_debut, groupe_fin, pause_min, geo)
+    nb_couples = sum(1 for v in suivant if v >= 0)
+    return len(suivant) - nb_couples, chaines_depuis_couplage(suivant, precedent, np.asarray(hdebut).tolist())
+
+
+def couverture_minimale(graphe, geo=True):
+    """
+    (nombre minimum de services, chaînes) pour les voyages du graphe.
+    geo : deux voyages consécutifs d'une chaîne respectent la continuité géographique.
+    Chaque chaîne est une liste d'index de voyages dans l'ordre du service.
+    Avec attente_max, le minimum porte sur les seuls arcs de la fenêtre.
+    """
+    if graphe.attente_max is None:
+        return couverture_sans_fenetre(graphe.hdebut, graphe.hfin, graphe.groupe_debut, graphe.groupe_fin,
+                                       graphe.pause_min, geo)
+    suivant, precedent = couplage_maximum(adjacence(graphe, geo))
+    nb_couples = sum(1 for v in suivant if v >= 0)
+    return len(graphe) - nb_couples, chaines_depuis_couplage(suivant, precedent, graphe.hdebut.tolist())
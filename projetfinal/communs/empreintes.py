@@ -0,0 +1,77 @@
+"""
+Empreintes de solutions, pour écarter les doublons avant de construire les dictionnaires
+Fichier: communs/empreintes.py
+
+Une solution est réduite à son vecteur d'affectation (voyage -> service,
+NON_ASSIGNE sinon), puis à un entier de 64 bits (blake2b sur les octets du
+vecteur). Même affectation => même empreinte ; deux affectations différentes
+ont une chance sur 2^64 de collision.
+
+Avec classes (une classe par service), les services d'une même classe sont
+interchangeables : ils sont renumérotés dans l'ordre de leur premier voyage
+(canoniser), et échanger leurs voyages ne change pas l'empreinte.
+"""
+
+import hashlib
+
+import numpy as np
+
+NON_ASSIGNE = -1
+
+
+def vecteur_affectation(services, nb_voyages):
+    """services : indices des voyages de chaque service, dans l'ordre des services"""
+    affectation = np.full(nb_voyages, NON_ASSIGNE, dtype=np.int32)
+    for s, indices in enumerate(services):
+        affectation[np.asarray(indices, dtype=np.intp)] = s
+    return affectation
+
+
+def classes_services(cles):
+    """Numéro de classe de chaque service : même clé (plage, voyages fixes...) => même classe"""
+    numeros = {}
+    return np.fromiter((numeros.setdefault(cle, len(numeros)) for cle in cles), dtype=np.int32)
+
+
+def canoniser(affectation, classes):
+    """
+    Renumérote les services d'une même classe dans l'ordre de leur premier
+    voyage : le r-ième utilisé devient le r-ième service de la classe. Le
+    résultat reste une affectation valide (mêmes numéros de services).
+    """
+    affectation = np.asarray(affectation, dtype=np.int32)
+    classes = np.asarray(classes, dtype=np.int32)
+    assignes = affectation != NON_ASSIGNE
+    services, premiers = np.unique(affectation[assignes], return_index=True)
+    if len(services) == 0:
+        return affectation.copy()
+
+    # Services triés par classe puis par premier voyage ; rang dans la classe
+    ordre = np.lexsort((premiers, classes[services]))
+    services = services[ordre]
+    classes_triees = classes[services]
+    positions = np.arange(len(services))
+    nouvelle_classe = np.r_[True, classes_triees[1:] != classes_triees[:-1]]
+    rangs = positions - np.maximum.accumulate(np.where(nouvelle_classe, positions, 0))
+
+    # Le service de rang r prend le numéro du r-ième service de sa classe
+    membres = np.argsort(classes, kind='stable').astype(np.int32)
+    debuts_classes = np.searchsorted(classes[membres], classes_triees)
+    numeros = np.empty(len(classes), dtype=np.int32)
+    numeros[services] = membres[debuts_classes + rangs]
+    canonique = affectation.copy()
+    canonique[assignes] = numeros[affectation[assignes]]
+    return canonique
+
+
+def empreinte(affectation, classes=None):
+    """Entier de 64 bits identifiant une affectation (à l'échange près de services interchangeables)"""
+    if classes is not None:
+        affectation = canoniser(affectation, classes)
+    octets = np.ascontiguousarray(affectation, dtype=np.int32).tobytes()
+    return int.from_bytes(hashlib.blake2b(octets, digest_size=8).digest(), 'little')
+
+
+def empreinte_services(services, nb_voyages, classes=None):
+    """Empreinte depuis les indices des voyages de chaque service"""
+    return empreinte(vecteur_affectation(services, nb_voyages), classes)
@@ -0,0 +1,175 @@
+"""
+Graphe des successions entre voyages, calculé une seule fois et partagé
+par toutes les stratégies d'un solver
+Fichier: communs/graphe_succession.py
+
+Arc i -> j : le voyage j peut suivre le voyage i dans un même service
+(hfin[i] + pause_min <= hdebut[j]). Chaque arc porte des drapeaux :
+TEMPS (toujours présent) et GEO (j part du groupe d'arrêts où i arrive).
+
+Les arcs ne sont construits qu'avec une attente_max bornée, en CSR : les
+successeurs de i sont successeurs[pointeurs[i]:pointeurs[i + 1]], triés par
+heure de début. Sans borne, tous les couples compatibles dans le temps
+seraient des arcs (O(n²) : 11 millions d'arcs pour 5000 voyages) ; le graphe
+ne garde alors que les colonnes. peut_suivre(), compatibles() et
+continuite_geo() comparent les colonnes et répondent pour n'importe quel
+couple, même hors de la fenêtre d'attente : c'est tout ce que lisent les
+gloutons.
+"""
+
+import numpy as np
+
+from .registre_arrets import REGISTRE_ARRETS
+
+TEMPS = 1   # j commence au moins pause_min après la fin de i
+GEO = 2     # j part du groupe d'arrêts d'arrivée de i
+
+
+class GrapheSuccession:
+
+    def __init__(self, hdebut, hfin, groupe_debut, groupe_fin, pause_min=0, attente_max=None):
+        self.hdebut = np.asarray(hdebut, dtype=np.int32)
+        self.hfin = np.asarray(hfin, dtype=np.int32)
+        self.groupe_debut = np.asarray(groupe_debut, dtype=np.int32)
+        self.groupe_fin = np.asarray(groupe_fin, dtype=np.int32)
+        self.pause_min = pause_min
+        self.attente_max = attente_max
+
+        # Listes Python pour les tests unitaires (plus rapides qu'un accès NumPy scalaire)
+        self._debuts = self.hdebut.tolist()
+        self._fins = self.hfin.tolist()
+        self._fins_pause = (self.hfin + pause_min).tolist()
+        self._groupes_debut = self.groupe_debut.tolist()
+        self._groupes_fin = self.groupe_fin.tolist()
+        self._index_par_id = None
+        self.objets = None
+
+        self.pointeurs = None
+        self.successeurs_csr = None
+        self.drapeaux_csr = None
+        if attente_max is not None:
+            self._construire_csr()
+
+    # ---------- Construction ----------
+
+    @classmethod
+    def depuis_table(cls, table, pause_min=0, attente_max=None):
+        """Depuis une VoyageTable (les index du graphe sont ceux de la table)"""
+        graphe = cls(table.hdebut, table.hfin, table.groupe_debut, table.groupe_fin,
+                     pause_min, attente_max)
+        graphe.objets = table.objets
+        return graphe
+
+    @classmethod
+    def depuis_voyages(cls, voyages, pause_min=0, attente_max=None):
+        """Depuis une liste d'objets voyage (codes de groupe du registre si absents)"""
+        n = len(voyages)
+        groupes_debut = np.fromiter(
+            (getattr(v, 'groupe_debut', None) if getattr(v, 'groupe_debut', None) is not None
+             else REGISTRE_ARRETS.groupe(v.arret_debut) for v in voyages),
+            dtype=np.int32, count=n
+        )
+        groupes_fin = np.fromiter(
+            (getattr(v, 'groupe_fin', None) if getattr(v, 'groupe_fin', None) is not None
+             else REGISTRE_ARRETS.groupe(v.arret_fin) for v in voyages),
+            dtype=np.int32, count=n
+        )
+        graphe = cls(
+            np.fromiter((v.hdebut for v in voyages), dtype=np.int32, count=n),
+            np.fromiter((v.hfin for v in voyages), dtype=np.int32, count=n),
+            groupes_debut, groupes_fin, pause_min, attente_max
+        )
+        graphe.objets = list(voyages)
+        return graphe
+
+    def _construire_csr(self):
+        n = len(self.hdebut)
+        ordre = np.argsort(self.hdebut, kind='stable')
+        debuts_tries = self.hdebut[ordre]
+
+        premier = np.searchsorted(debuts_tries, self.hfin + self.pause_min, side='left')
+        dernier = np.searchsorted(debuts_tries, self.hfin + self.attente_max, side='right')
+        nb = np.maximum(dernier - premier, 0)
+
+        # Pour chaque arc : position dans l'ordre trié = premier[source] + rang dans la fenêtre
+        sources = np.repeat(np.arange(n, dtype=np.int32), nb)
+        decalage = np.repeat(np.cumsum(nb) - nb, nb)
+        positions = np.repeat(premier, nb) + (np.arange(len(sources)) - decalage)
+        cibles = ordre[positions].astype(np.int32)
+
+        # Voyage de durée nulle avec pause_min = 0 : pas d'arc vers lui-même
+        sans_boucle = sources != cibles
+        if not sans_boucle.all():
+            sources, cibles = sources[sans_boucle], cibles[sans_boucle]
+            nb = np.bincount(sources, minlength=n)
+
+        self.pointeurs = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(nb, out=self.pointeurs[1:])
+        self.successeurs_csr = cibles
+        self.drapeaux_csr = (TEMPS | np.where(
+            self.groupe_fin[sources] == self.groupe_debut[cibles], GEO, 0
+        )).astype(np.uint8)
+
+    # ---------- Requêtes sur un couple ----------
+
+    def __len__(self):
+        return len(self._debuts)
+
+    @property
+    def a_des_arcs(self):
+        return self.successeurs_csr is not None
+
+    @property
+    def nb_arcs(self):
+        """Nombre d'arcs construits (0 sans attente_max)"""
+        return len(self.successeurs_csr) if self.a_des_arcs else 0
+
+    def index_de(self, voyage):
+        """Index d'un objet voyage du graphe (None si absent)"""
+        if self._index_par_id is None:
+            self._index_par_id = {id(v): i for i, v in enumerate(self.objets or ())}
+        return self._index_par_id.get(id(voyage))
+
+    def peut_suivre(self, i, j):
+        """Vrai si j commence au moins pause_min après la fin de i"""
+        return self._fins_pause[i] <= self._debuts[j]
+
+    def compatibles(self, i, j):
+        """Vrai si i et j peuvent être dans un même service (l'un suit l'autre)"""
+        return self._fins_pause[i] <= self._debuts[j] or self._fins_pause[j] <= self._debuts[i]
+
+    def continuite_geo(self, i, j):
+        """Vrai si j part du groupe d'arrêts où i arrive"""
+        return self._groupes_fin[i] == self._groupes_debut[j]
+
+    def hdebut_de(self, i):
+        return self._debuts[i]
+
+    def hfin_de(self, i):
+        return self._fins[i]
+
+    # ---------- Requêtes sur les arcs (attente_max bornée) ----------
+
+    def _verifier_arcs(self):
+        if not self.a_des_arcs:
+            raise ValueError("Graphe sans arcs : donner une attente_max bornée pour construire les successeurs")
+
+    def successeurs(self, i):
+        """Successeurs de i dans la fenêtre d'attente, triés par heure de début"""
+        self._verifier_arcs()
+        return self.successeurs_csr[self.pointeurs[i]:self.pointeurs[i + 1]]
+
+    def drapeaux(self, i):
+        self._verifier_arcs()
+        return self.drapeaux_csr[self.pointeurs[i]:self.pointeurs[i + 1]]
+
+    def successeurs_geo(self, i):
+        """Successeurs de i qui assurent la continuité géographique"""
+        return self.successeurs(i)[(self.drapeaux(i) & GEO) != 0]
+
+    def arcs(self, drapeau=TEMPS):
+        """Tous les arcs portant le drapeau : (sources, cibles) en int32"""
+        self._verifier_arcs()
+        sources = np.repeat(np.arange(len(self), dtype=np.int32), np.diff(self.pointeurs))
+        garder = (self.drapeaux_csr & drapeau) == drapeau
+        return sources[garder], self.successeurs_csr[garder]
@@ -0,0 +1,199 @@
+"""
+Conversion des heures en minutes, pour une valeur ou une colonne entière
+Fichier: communs/heures.py
+
+Formats acceptés : "H:MM", "HH:MM", "HH:MM:SS" (secondes ignorées),
+heures décimales ("7.5" = 07h30) et heures après minuit ("25:10").
+
+Journée de service : les heures sont des minutes croissantes de 0 à 2159
+(36 h). Un voyage qui passe minuit garde une fin > 1440 ("23:40 - 00:20"
+devient 1420 - 1460) et tout ce qui commence avant DEBUT_JOURNEE_SERVICE
+appartient à la nuit de la veille ("00:30" devient 1470).
+"""
+
+import numpy as np
+
+MINUTES_JOUR = 24 * 60
+DEBUT_JOURNEE_SERVICE = 4 * 60      # Avant 04h00 : nuit de la journée de service précédente
+FIN_JOURNEE_SERVICE = 36 * 60       # Minutes de journée de service : 0 à 2159
+
+LONGUEUR_MAX_HEURE = 9     # "HHH:MM:SS"
+MINUTES_MAX = 1000 * 60    # Au-delà, la valeur n'est pas une heure
+
+
+def _chiffres(texte, nb_max):
+    """Vrai si texte contient de 1 à nb_max chiffres ASCII"""
+    return texte.isascii() and texte.isdigit() and len(texte) <= nb_max
+
+
+def _facteur(unite_nombres):
+    """Minutes par unité pour les valeurs numériques ('heures' ou 'minutes')"""
+    if unite_nombres not in ('heures', 'minutes'):
+        raise ValueError(f"unite_nombres inconnue: {unite_nombres}")
+    return 60 if unite_nombres == 'heures' else 1
+
+
+def heure_vers_minutes(valeur, unite_nombres='heures'):
+    """
+    Convertit une heure en minutes depuis minuit.
+    Lève ValueError si la valeur n'est pas une heure valide.
+    """
+    facteur = _facteur(unite_nombres)
+
+    if isinstance(valeur, (int, float, np.integer, np.floating)) and not isinstance(valeur, bool):
+        if not np.isfinite(valeur) or not 0 <= valeur * facteur < MINUTES_MAX:
+            raise ValueError(f"Heure invalide: {valeur!r}")
+        return int(np.rint(valeur * facteur))
+
+    texte = str(valeur).strip()
+    heures, sep, reste = texte.partition(':')
+
+    if sep:
+        minutes, sep_sec, secondes = reste.partition(':')
+        if (_chiffres(heures, 3) and _chiffres(minutes, 2) and int(minutes) < 60
+                and (not sep_sec or (_chiffres(secondes, 2) and int(secondes) < 60))):
+            return int(heures) * 60 + int(minutes)
+        raise ValueError(f"Heure invalide: {valeur!r}")
+
+    try:
+        nombre = float(texte)
+    except ValueError:
+        raise ValueError(f"Heure invalide: {valeur!r}") from None
+    if not np.isfinite(nombre) or not 0 <= nombre * facteur < MINUTES_MAX:
+        raise ValueError(f"Heure invalide: {valeur!r}")
+    return int(np.rint(nombre * facteur))
+
+
+def _vers_float(textes):
+    """Convertit un tableau de textes en float64 (NaN pour les valeurs non numériques)"""
+    try:
+        return textes.astype(np.float64)
+    except ValueError:
+        nombres = np.empty(len(textes), dtype=np.float64)
+        for i, texte in enumerate(textes):
+            try:
+                nombres[i] = float(texte)
+            except ValueError:
+                nombres[i] = np.nan
+        return nombres
+
+
+def _parse_hh_mm(textes):
+    """
+    Parse des textes "H:MM[:SS]" colonne de caractères par colonne de caractères :
+    9 passes vectorisées sur tout le tableau au lieu d'un split par ligne.
+    """
+    n = len(textes)
+    cars = textes.view(np.uint32).reshape(n, LONGUEUR_MAX_HEURE).astype(np.int32)
+
+    champs = np.zeros((3, n), dtype=np.int32)       # heures, minutes, secondes
+    nb_chiffres = np.zeros((3, n), dtype=np.int32)
+    zone = np.zeros(n, dtype=np.int32)              # nombre de ':' déjà lus
+    ok = np.ones(n, dtype=bool)
+
+    for j in range(LONGUEUR_MAX_HEURE):
+        car = cars[:, j]
+        chiffre = car - ord('0')
+        est_chiffre = (chiffre >= 0) & (chiffre <= 9)
+        est_sep = car == ord(':')
+        ok &= (car == 0) | est_chiffre | est_sep
+        zone += est_sep
+        for k in range(3):
+            dans_champ = est_chiffre & (zone == k)
+            champs[k] = np.where(dans_champ, champs[k] * 10 + chiffre, champs[k])
+            nb_chiffres[k] += dans_champ
+
+    heures, minutes, secondes = champs
+    ok &= (zone >= 1) & (zone <= 2)
+    ok &= (nb_chiffres[0] >= 1) & (nb_chiffres[0] <= 3)
+    ok &= (nb_chiffres[1] >= 1) & (nb_chiffres[1] <= 2) & (minutes < 60)
+    ok &= (zone == 1) | ((nb_chiffres[2] >= 1) & (nb_chiffres[2] <= 2) & (secondes < 60))
+
+    return np.where(ok, heures * 60 + minutes, 0).astype(np.int32), ok
+
+
+def parse_heures(valeurs, unite_nombres='heures'):
+    """
+    Convertit une colonne d'heures en minutes, en une seule passe vectorisée.
+
+    Retourne (minutes, valide) : minutes en int32 (0 pour les valeurs invalides)
+    et un masque booléen des valeurs reconnues. unite_nombres indique si les
+    valeurs numériques sans ':' sont des heures décimales ou déjà des minutes.
+    """
+    facteur = _facteur(unite_nombres)
+    valeurs = np.asarray(valeurs)
+    if valeurs.ndim != 1:
+        valeurs = valeurs.reshape(-1)
+
+    n = len(valeurs)
+    minutes = np.zeros(n, dtype=np.int32)
+    valide = np.zeros(n, dtype=bool)
+    if n == 0:
+        return minutes, valide
+
+    # Colonne déjà numérique : pas de passage par le texte
+    if valeurs.dtype.kind in 'iuf':
+        nombres = valeurs.astype(np.float64) * facteur
+        valide = np.isfinite(nombres) & (nombres >= 0) & (nombres < MINUTES_MAX)
+        minutes[valide] = np.rint(nombres[valide])
+        return minutes, valide
+
+    textes = np.char.strip(valeurs.astype(str))
+    avec_sep = np.char.find(textes, ':') >= 0
+
+    # Format H:MM, HH:MM ou HH:MM:SS (9 caractères au plus)
+    courts = avec_sep & (np.char.str_len(textes) <= LONGUEUR_MAX_HEURE)
+    if courts.any():
+        minutes_courts, ok = _parse_hh_mm(textes[courts].astype(f'<U{LONGUEUR_MAX_HEURE}'))
+        minutes[courts] = minutes_courts
+        valide[courts] = ok
+
+    # Nombre décimal (heures ou minutes selon unite_nombres)
+    sans_sep = ~avec_sep & (textes != '')
+    if sans_sep.any():
+        nombres = _vers_float(textes[sans_sep]) * facteur
+        ok = np.isfinite(nombres) & (nombres >= 0) & (nombres < MINUTES_MAX)
+        minutes[sans_sep] = np.rint(np.where(ok, nombres, 0))
+        valide[sans_sep] = ok
+
+    return minutes, valide
+
+
+# ---------- Journée de service ----------
+
+def journee_service(hdebut, hfin, bascule=DEBUT_JOURNEE_SERVICE):
+    """
+    Ramène un intervalle (minutes depuis minuit) en minutes de journée de service :
+    début avant la bascule -> +24h, fin avant le début -> passage de minuit.
+    """
+    if hdebut < bascule:
+        hdebut += MINUTES_JOUR
+    if hfin < hdebut:
+        hfin += MINUTES_JOUR
+    return hdebut, hfin
+
+
+def limites_journee_service(hdebut, hfin, bascule=DEBUT_JOURNEE_SERVICE):
+    """
+    Limites d'un service, d'une coupure ou d'une pause en minutes de journée de
+    service. Comme journee_service, sauf qu'un intervalle qui commence avant la
+    bascule et finit après (service qui démarre à 03h30) reste tel quel, et que
+    la fin est ramenée à FIN_JOURNEE_SERVICE. Des limites déjà normalisées ne
+    changent pas. Lève ValueError hors de la journée de service.
+    """
+    if hdebut < 0 or hfin < 0 or hdebut >= FIN_JOURNEE_SERVICE:
+        raise ValueError(f"Limites hors journée de service: {hdebut} - {hfin}")
+    if not hdebut < bascule < hfin:
+        hdebut, hfin = journee_service(hdebut, hfin, bascule)
+    if hdebut >= FIN_JOURNEE_SERVICE:
+        raise ValueError(f"Limites hors journée de service: {hdebut} - {hfin}")
+    return hdebut, min(hfin, FIN_JOURNEE_SERVICE)
+
+
+def journee_service_colonnes(hdebuts, hfins, bascule=DEBUT_JOURNEE_SERVICE):
+    """Version vectorisée de journee_service pour des colonnes de minutes"""
+    hdebuts = np.asarray(hdebuts, dtype=np.int32)
+    hfins = np.asarray(hfins, dtype=np.int32)
+    hdebuts = np.where(hdebuts < bascule, hdebuts + MINUTES_JOUR, hdebuts).astype(np.int32)
+    hfins = np.where(hfins < hdebuts, hfins + MINUTES_JOUR, hfins).astype(np.int32)
+    return hdebuts, hfins
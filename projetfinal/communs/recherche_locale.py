@@ -0,0 +1,350 @@
+"""
+Amélioration locale d'une solution gloutonne
+Fichier: communs/recherche_locale.py
+
+Après la construction gloutonne, les voyages non assignés et les ruptures
+géographiques restent là où l'ordre de tri les a laissés. On applique ici
+des mouvements entre services tant qu'ils améliorent l'objectif :
+
+    insertion   : un voyage libre entre dans un service
+    ejection    : un voyage libre prend la place d'un voyage, qui est
+                  replacé ailleurs (chaîne d'éjection, profondeur bornée)
+    relocation  : un voyage change de service
+    echange     : deux voyages de services différents échangent leur place
+    queues      : deux services échangent leurs fins de journée (2-opt*)
+
+Objectif = POIDS_ASSIGNATION x voyages assignés + somme des transitions,
+une transition a -> b valant BONUS_GEO si b part du groupe d'arrêts où a
+arrive, plus max(0, BONUS_ATTENTE - attente). Un mouvement ne touche que
+deux ou trois services : son gain se calcule sur les transitions modifiées.
+"""
+
+import time
+from bisect import bisect_left, insort
+
+POIDS_ASSIGNATION = 1000
+BONUS_GEO = 100
+BONUS_ATTENTE = 50
+
+MODES = ('premier', 'meilleur')
+
+
+class RechercheLocale:
+    """
+    services : listes d'indices de voyages (une par service)
+    autorise : autorise(s, i) vrai si le voyage i peut aller dans le service s
+               (fenêtre horaire, pauses) ; le chaînage est vérifié ici
+    fixes    : voyages qui ne quittent pas leur service
+    geo_stricte : toute transition doit assurer la continuité géographique
+    continuite  : continuite(a, b) vrai si b part d'où a arrive ; par défaut,
+                  égalité des groupes d'arrêts
+    """
+
+    def __init__(self, hdebut, hfin, groupe_debut, groupe_fin, autorise, pause_min=0,
+                 fixes=(), geo_stricte=False, continuite=None):
+        self.hdebut = [int(h) for h in hdebut]
+        self.hfin = [int(h) for h in hfin]
+        self.groupe_debut = [int(g) for g in groupe_debut]
+        self.groupe_fin = [int(g) for g in groupe_fin]
+        self.autorise = autorise
+        self.pause_min = pause_min
+        self.fixes = set(fixes)
+        self.geo_stricte = geo_stricte
+        if continuite is not None:
+            self.continuite = continuite
+        self._limite = None
+        self.stats = self._stats_vides()
+
+    @classmethod
+    def depuis_graphe(cls, graphe, autorise, fixes=(), geo_stricte=False, continuite=None):
+        """Depuis un GrapheSuccession (mêmes index de voyages, même pause_min)"""
+        return cls(graphe.hdebut.tolist(), graphe.hfin.tolist(),
+                   graphe.groupe_debut.tolist(), graphe.groupe_fin.tolist(),
+                   autorise, graphe.pause_min, fixes, geo_stricte, continuite)
+
+    @staticmethod
+    def _stats_vides():
+        return {
+            'mouvements': {nom: 0 for nom in ('insertion', 'ejection', 'relocation', 'echange', 'queues')},
+            'evaluations': 0,
+            'score_initial': 0,
+            'score_final': 0,
+            'temps': 0.0,
+        }
+
+    # ---------- Objectif ----------
+
+    def continuite(self, a, b):
+        return self.groupe_fin[a] == self.groupe_debut[b]
+
+    def transition(self, a, b):
+        score = BONUS_GEO if self.continuite(a, b) else 0
+        return score + max(0, BONUS_ATTENTE - (self.hdebut[b] - self.hfin[a]))
+
+    def score_service(self, seq):
+        return sum(self.transition(a, b) for a, b in zip(seq, seq[1:]))
+
+    def score(self, services):
+        return sum(POIDS_ASSIGNATION * len(seq) + self.score_service(seq) for seq in services)
+
+    # ---------- Gains élémentaires ----------
+
+    def _enchainable(self, a, b):
+        """b peut suivre a directement dans un service"""
+        if self.hfin[a] + self.pause_min > self.hdebut[b]:
+            return False
+        return not self.geo_stricte or self.continuite(a, b)
+
+    def _lien(self, a, b):
+        return self.transition(a, b) if a is not None and b is not None else 0
+
+    def _position(self, seq, i):
+        return bisect_left(seq, self.hdebut[i], key=self.hdebut.__getitem__)
+
+    def _gain_insertion(self, seq, s, i):
+        """Gain de l'insertion de i dans seq (service s), None si impossible"""
+        if not self.autorise(s, i):
+            return None
+        p = self._position(seq, i)
+        avant = seq[p - 1] if p > 0 else None
+        apres = seq[p] if p < len(seq) else None
+        if avant is not None and not self._enchainable(avant, i):
+            return None
+        if apres is not None and not self._enchainable(i, apres):
+            return None
+        return self._lien(avant, i) + self._lien(i, apres) - self._lien(avant, apres)
+
+    def _gain_retrait(self, seq, p):
+        """Gain du retrait de seq[p], None si le trou laissé est interdit (géo stricte)"""
+        i = seq[p]
+        avant = seq[p - 1] if p > 0 else None
+        apres = seq[p + 1] if p + 1 < len(seq) else None
+        if self.geo_stricte and avant is not None and apres is not None and not self.continuite(avant, apres):
+            return None
+        return self._lien(avant, apres) - self._lien(avant, i) - self._lien(i, apres)
+
+    def _gain_remplacement(self, seq, s, p, i):
+        """Gain du remplacement de seq[p] par i à la même place, None si impossible"""
+        if not self.autorise(s, i):
+            return None
+        ancien = seq[p]
+        avant = seq[p - 1] if p > 0 else None
+        apres = seq[p + 1] if p + 1 < len(seq) else None
+        if avant is not None and not self._enchainable(avant, i):
+            return None
+        if apres is not None and not self._enchainable(i, apres):
+            return None
+        return (self._lien(avant, i) + self._lien(i, apres)
+                - self._lien(avant, ancien) - self._lien(ancien, apres))
+
+    def _hors_temps(self):
+        return self._limite is not None and time.perf_counter() > self._limite
+
+    # ---------- Voisinages ----------
+    # Chaque voisinage produit des (gain, nom, opérations) ; une opération est
+    # ('retirer' | 'inserer', service, voyage), service None = voyages libres.
+
+    def _insertions(self, services, libres):
+        for i in libres:
+            if self._hors_temps():
+                return
+            for s, seq in enumerate(services):
+                self.stats['evaluations'] += 1
+                gain = self._gain_insertion(seq, s, i)
+                if gain is not None:
+                    yield (POIDS_ASSIGNATION + gain, 'insertion',
+                           [('retirer', None, i), ('inserer', s, i)])
+
+    def _remplacements(self, services, i, touches):
+        """Places de services non touchés où i peut remplacer un voyage mobile"""
+        for s, seq in enumerate(services):
+            if s in touches or not seq:
+                continue
+            # i ne peut prendre que la place d'un voyage voisin de sa position d'insertion
+            position = self._position(seq, i)
+            for p in (position - 1, position):
+                if 0 <= p < len(seq) and seq[p] not in self.fixes:
+                    self.stats['evaluations'] += 1
+                    gain = self._gain_remplacement(seq, s, p, i)
+                    if gain is not None:
+                        yield s, p, gain
+
+    def _placements(self, services, i, touches, profondeur):
+        """Façons de placer i (éjecté) : insertion simple ou nouvelle éjection"""
+        for s, seq in enumerate(services):
+            if s in touches:
+                continue
+            self.stats['evaluations'] += 1
+            gain = self._gain_insertion(seq, s, i)
+            if gain is not None:
+                yield gain, [('inserer', s, i)]
+
+        if profondeur <= 1:
+            return
+        for s, p, gain in self._remplacements(services, i, touches):
+            ejecte = services[s][p]
+            for gain_suite, ops in self._placements(services, ejecte, touches | {s}, profondeur - 1):
+                yield gain + gain_suite, [('retirer', s, ejecte), ('inserer', s, i)] + ops
+
+    def _ejections(self, services, libres, profondeur):
+        for u in libres:
+            if self._hors_temps():
+                return
+            for s, p, gain in self._remplacements(services, u, set()):
+                ejecte = services[s][p]
+                for gain_suite, ops in self._placements(services, ejecte, {s}, profondeur):
+                    yield (POIDS_ASSIGNATION + gain + gain_suite, 'ejection',
+                           [('retirer', None, u), ('retirer', s, ejecte), ('inserer', s, u)] + ops)
+
+    def _relocations(self, services):
+        for a, seq_a in enumerate(services):
+            for p, i in enumerate(seq_a):
+                if self._hors_temps():
+                    return
+                if i in self.fixes:
+                    continue
+                gain_retrait = self._gain_retrait(seq_a, p)
+                if gain_retrait is None:
+                    continue
+                for b, seq_b in enumerate(services):
+                    if b == a:
+                        continue
+                    self.stats['evaluations'] += 1
+                    gain = self._gain_insertion(seq_b, b, i)
+                    if gain is not None:
+                        yield (gain_retrait + gain, 'relocation',
+                               [('retirer', a, i), ('inserer', b, i)])
+
+    def _echanges(self, services):
+        hdebut = self.hdebut
+        for a, seq_a in enumerate(services):
+            for p, i in enumerate(seq_a):
+                if self._hors_temps():
+                    return
+                if i in self.fixes:
+                    continue
+                # j doit tenir dans le trou laissé par i : il part après la fin du précédent
+                # et avant le début du suivant
+                debut_min = self.hfin[seq_a[p - 1]] + self.pause_min if p > 0 else None
+                debut_max = hdebut[seq_a[p + 1]] - self.pause_min if p + 1 < len(seq_a) else None
+                for b in range(a + 1, len(services)):
+                    seq_b = services[b]
+                    q = 0 if debut_min is None else bisect_left(seq_b, debut_min, key=hdebut.__getitem__)
+                    while q < len(seq_b) and (debut_max is None or hdebut[seq_b[q]] <= debut_max):
+                        j = seq_b[q]
+                        if j not in self.fixes:
+                            self.stats['evaluations'] += 1
+                            gain_a = self._gain_remplacement(seq_a, a, p, j)
+                            gain_b = self._gain_remplacement(seq_b, b, q, i) if gain_a is not None else None
+                            if gain_b is not None:
+                                yield (gain_a + gain_b, 'echange',
+                                       [('retirer', a, i), ('retirer', b, j),
+                                        ('inserer', a, j), ('inserer', b, i)])
+                        q += 1
+
+    def _queue_mobile(self, s, queue):
+        return all(i not in self.fixes and self.autorise(s, i) for i in queue)
+
+    def _echanges_queues(self, services):
+        """2-opt* : A[:k] + B[l:] et B[:l] + A[k:], coupes à la même heure"""
+        for a, seq_a in enumerate(services):
+            for b, seq_b in enumerate(services):
+                if b == a or not seq_b:
+                    continue
+                if self._hors_temps():
+                    return
+                for k in range(1, len(seq_a) + 1):
+                    dernier_a = seq_a[k - 1]
+                    # Première position de B qui peut suivre la tête de A
+                    l = bisect_left(seq_b, self.hfin[dernier_a] + self.pause_min, key=self.hdebut.__getitem__)
+                    if l == 0 or (k == len(seq_a) and l == len(seq_b)):
+                        continue
+                    dernier_b = seq_b[l - 1]
+                    premier_a = seq_a[k] if k < len(seq_a) else None
+                    premier_b = seq_b[l] if l < len(seq_b) else None
+                    if premier_a is not None and not self._enchainable(dernier_b, premier_a):
+                        continue
+                    if premier_b is not None and not self._enchainable(dernier_a, premier_b):
+                        continue
+                    self.stats['evaluations'] += 1
+                    queue_a, queue_b = seq_a[k:], seq_b[l:]
+                    if not (self._queue_mobile(b, queue_a) and self._queue_mobile(a, queue_b)):
+                        continue
+                    gain = (self._lien(dernier_a, premier_b) + self._lien(dernier_b, premier_a)
+                            - self._lien(dernier_a, premier_a) - self._lien(dernier_b, premier_b))
+                    ops = ([('retirer', a, i) for i in queue_a] + [('retirer', b, j) for j in queue_b]
+                           + [('inserer', b, i) for i in queue_a] + [('inserer', a, j) for j in queue_b])
+                    yield gain, 'queues', ops
+
+    def _voisinage(self, services, libres, profondeur_ejection):
+        libres_tries = sorted(libres, key=self.hdebut.__getitem__)
+        # Du moins coûteux au plus coûteux : en mode 'premier', les chaînes
+        # d'éjection ne sont explorées que quand rien d'autre n'améliore
+        yield from self._insertions(services, libres_tries)
+        yield from self._relocations(services)
+        yield from self._echanges(services)
+        yield from self._echanges_queues(services)
+        if profondeur_ejection > 0:
+            yield from self._ejections(services, libres_tries, profondeur_ejection)
+
+    # ---------- Boucle principale ----------
+
+    def _appliquer(self, services, libres, ops):
+        cle = self.hdebut.__getitem__
+        for op, s, i in ops:
+            if s is None:
+                if op == 'retirer':
+                    libres.discard(i)
+                else:
+                    libres.add(i)
+            elif op == 'retirer':
+                services[s].remove(i)
+            else:
+                insort(services[s], i, key=cle)
+
+    def ameliorer(self, services, temps_max=2.0, mode='premier', profondeur_ejection=2, libres=None):
+        """
+        Améliore les services tant qu'un mouvement augmente l'objectif.
+
+        temps_max : budget en secondes (None : jusqu'à l'optimum local)
+        mode      : 'premier' applique le premier mouvement améliorant trouvé,
+                    'meilleur' parcourt tout le voisinage et applique le meilleur
+        libres    : voyages à placer (défaut : tous ceux qui ne sont dans aucun service)
+
+        Retourne (services, libres) : listes triées par heure de début.
+        Les compteurs de l'exécution sont dans self.stats.
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode inconnu: {mode}")
+
+        debut = time.perf_counter()
+        self._limite = debut + temps_max if temps_max is not None else None
+        self.stats = self._stats_vides()
+
+        services = [sorted(seq, key=self.hdebut.__getitem__) for seq in services]
+        if libres is None:
+            assignes = {i for seq in services for i in seq}
+            libres = {i for i in range(len(self.hdebut)) if i not in assignes}
+        else:
+            libres = set(libres)
+
+        self.stats['score_initial'] = self.score(services)
+
+        while not self._hors_temps():
+            retenu = None
+            for mouvement in self._voisinage(services, libres, profondeur_ejection):
+                if mouvement[0] <= 0:
+                    continue
+                if retenu is None or mouvement[0] > retenu[0]:
+                    retenu = mouvement
+                if mode == 'premier':
+                    break
+            if retenu is None:
+                break
+            self._appliquer(services, libres, retenu[2])
+            self.stats['mouvements'][retenu[1]] += 1
+
+        self._limite = None
+        self.stats['score_final'] = self.score(services)
+        self.stats['temps'] = time.perf_counter() - debut
+        return services, sorted(libres, key=self.hdebut.__getitem__)
@@ -0,0 +1,122 @@
+"""
+Registre des arrêts : chaque nom d'arrêt est normalisé une seule fois
+et reçoit un code entier, ainsi qu'un code de groupe géographique.
+Fichier: communs/registre_arrets.py
+
+La continuité géographique entre deux voyages devient une simple
+comparaison d'entiers : groupe(arrivée) == groupe(départ). Un arrêt vide a le
+groupe INCONNU : il ne suit qu'un arrêt vide, comme arret_fin_id() ==
+arret_debut_id() sur deux noms vides. Objets, graphe de succession, couverture
+par chemins, recherche locale et solvers appliquent tous cette règle.
+"""
+
+import numpy as np
+
+
+def normaliser_arret(nom):
+    """Normalise un nom d'arrêt (espaces et casse ignorés)"""
+    return str(nom).strip().upper()
+
+
+def cle_prefixe(longueur=3):
+    """Clé de groupe : les `longueur` premiers caractères du nom normalisé"""
+    def cle(nom_normalise):
+        return nom_normalise[:longueur]
+    return cle
+
+
+class StopRegistry:
+    """
+    Attribue un code entier à chaque arrêt et à chaque groupe d'arrêts.
+
+    Par défaut un groupe = les 3 premiers caractères de l'arrêt (comme
+    arret_debut_id()). Une autre clé peut être donnée, par exemple un
+    dictionnaire arrêt -> zone d'arrêt : cle_groupe=lambda nom: zones.get(nom, nom)
+    """
+
+    INCONNU = -1    # Code d'un arrêt vide (pas d'information)
+
+    def __init__(self, cle_groupe=None):
+        self.cle_groupe = cle_groupe or cle_prefixe(3)
+        self.noms = []              # code arrêt -> nom normalisé
+        self.groupe_par_code = []   # code arrêt -> code groupe
+        self.groupes = []           # code groupe -> clé de groupe
+        self._codes = {}            # nom brut ou normalisé -> code arrêt
+        self._codes_groupes = {}    # clé de groupe -> code groupe
+
+    def __len__(self):
+        return len(self.noms)
+
+    def __contains__(self, nom):
+        return nom in self._codes or normaliser_arret(nom) in self._codes
+
+    def _code_groupe(self, nom_normalise):
+        cle = self.cle_groupe(nom_normalise)
+        code = self._codes_groupes.get(cle)
+        if code is None:
+            code = len(self.groupes)
+            self._codes_groupes[cle] = code
+            self.groupes.append(cle)
+        return code
+
+    # ---------- Codes ----------
+
+    def code(self, nom):
+        """Code entier de l'arrêt (créé au premier appel)"""
+        code = self._codes.get(nom)
+        if code is not None:
+            return code
+        if nom is None:
+            return self.INCONNU
+
+        nom_normalise = normaliser_arret(nom)
+        if not nom_normalise:
+            return self.INCONNU
+
+        code = self._codes.get(nom_normalise)
+        if code is None:
+            code = len(self.noms)
+            self.noms.append(nom_normalise)
+            self.groupe_par_code.append(self._code_groupe(nom_normalise))
+            self._codes[nom_normalise] = code
+        self._codes[nom] = code
+        return code
+
+    def groupe(self, nom):
+        """Code du groupe géographique de l'arrêt (INCONNU si arrêt vide)"""
+        code = self.code(nom)
+        if code == self.INCONNU:
+            return self.INCONNU
+        return self.groupe_par_code[code]
+
+    def nom(self, code):
+        return self.noms[code]
+
+    def meme_groupe(self, arrivee, depart):
+        """Continuité géographique entre deux arrêts (un arrêt vide ne suit qu'un arrêt vide)"""
+        return self.groupe(arrivee) == self.groupe(depart)
+
+    # ---------- En lot ----------
+
+    def codes(self, noms):
+        """Codes arrêts d'une liste de noms (tableau int32)"""
+        return np.fromiter((self.code(n) for n in noms), dtype=np.int32, count=len(noms))
+
+    def codes_groupes(self, noms):
+        """Codes groupes d'une liste de noms (tableau int32)"""
+        return np.fromiter((self.groupe(n) for n in noms), dtype=np.int32, count=len(noms))
+
+    def definir_cle_groupe(self, cle_groupe):
+        """
+        Change la clé de groupe et recalcule les groupes des arrêts connus.
+        Les codes arrêts ne changent pas ; les codes groupes déjà stockés
+        ailleurs (voyages, tables) doivent être recalculés.
+        """
+        self.cle_groupe = cle_groupe
+        self.groupes = []
+        self._codes_groupes = {}
+        self.groupe_par_code = [self._code_groupe(nom) for nom in self.noms]
+
+
+# Registre partagé par le modèle, les solvers et l'interface
+REGISTRE_ARRETS = StopRegistry()
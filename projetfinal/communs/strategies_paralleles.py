@@ -0,0 +1,94 @@
+"""
+Exécution des stratégies gloutonnes en parallèle, sur plusieurs processus
+Fichier: communs/strategies_paralleles.py
+
+Les données communes à toutes les stratégies (table, graphe, services) sont
+transmises une seule fois à chaque processus (initializer) ; une tâche ne
+transporte que ses paramètres, par exemple l'index de la stratégie.
+
+Les résultats sont fusionnés dans l'ordre des tâches, comme en séquentiel :
+la liste retournée ne dépend pas de l'ordre de fin des processus.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# En dessous de voyages x services, lancer des processus coûte plus que les stratégies
+SEUIL_PARALLELE = 20000
+
+_contexte = None
+
+
+def _initialiser(contexte):
+    global _contexte
+    _contexte = contexte
+
+
+def _executer(fonction, args):
+    return fonction(_contexte, *args)
+
+
+def nb_processus(nb_taches, max_workers=None):
+    """Nombre de processus utiles : pas plus que de tâches ni que de cœurs"""
+    return max(1, min(nb_taches, max_workers or os.cpu_count() or 1))
+
+
+def executer_strategies(fonction, contexte, taches, max_solutions=None, cle=None,
+                        deja_vus=None, parallele=True, max_workers=None):
+    """
+    Exécute fonction(contexte, *args) pour chaque args de taches.
+
+    fonction      : fonction de module (doit pouvoir être envoyée à un processus)
+    cle           : cle(resultat) pour dédupliquer (None : pas de déduplication)
+    deja_vus      : clés déjà retenues, mis à jour (pour enchaîner plusieurs phases)
+    max_solutions : arrêt dès que ce nombre de résultats distincts est atteint ;
+                    les tâches pas encore démarrées sont annulées
+
+    Retourne la liste des résultats retenus (None ignorés) dans l'ordre des tâches.
+    """
+    retenus = []
+    deja_vus = set() if deja_vus is None else deja_vus
+
+    def retenir(resultat):
+        """Ajoute le résultat s'il est nouveau ; vrai quand il y en a assez"""
+        if resultat is not None:
+            k = cle(resultat) if cle is not None else None
+            if k is None or k not in deja_vus:
+                if k is not None:
+                    deja_vus.add(k)
+                retenus.append(resultat)
+        return max_solutions is not None and len(retenus) >= max_solutions
+
+    def sequentiel(taches_restantes):
+        for args in taches_restantes:
+            if retenir(fonction(contexte, *args)):
+                break
+        return retenus
+
+    if max_solutions is not None and max_solutions <= 0:
+        return retenus
+
+    workers = nb_processus(len(taches), max_workers)
+    if not parallele or workers <= 1:
+        return sequentiel(taches)
+
+    try:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_initialiser, initargs=(contexte,))
+    except (OSError, NotImplementedError):
+        # Pas de processus disponibles (bac à sable, plateforme) : même résultat en séquentiel
+        return sequentiel(taches)
+
+    try:
+        futures = [executor.submit(_executer, fonction, args) for args in taches]
+        for i, future in enumerate(futures):
+            try:
+                resultat = future.result()
+            except BrokenProcessPool:
+                return sequentiel(taches[i:])
+            if retenir(resultat):
+                break
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return retenus
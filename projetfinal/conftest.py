@@ -0,0 +1,52 @@
+"""
+Fabriques d'instances aléatoires partagées par les tests
+"""
+
+import random
+
+import pytest
+
+from objet import service_agent, voyage
+
+
+def _instance_aleatoire(nb_voyages, nb_services, graine):
+    """Voyages entre 4 arrêts et services de 8 h commençant à 5 h, 10 h ou 15 h"""
+    r = random.Random(graine)
+    arrets = ['A', 'B', 'C', 'D']
+    voyages = []
+    for i in range(nb_voyages):
+        debut = r.randrange(300, 1300)
+        depart = r.choice(arrets)
+        arrivee = r.choice([a for a in arrets if a != depart])
+        voyages.append(voyage.depuis_minutes('1', i, depart, arrivee, debut, debut + r.randrange(20, 60)))
+    services = []
+    for k in range(nb_services):
+        service = service_agent(num_service=k)
+        debut = r.choice([300, 600, 900])
+        service.set_limites(debut, debut + 480)
+        services.append((service, []))
+    return voyages, services
+
+
+@pytest.fixture
+def instance_aleatoire():
+    """instance_aleatoire(nb_voyages, nb_services, graine) -> (voyages, services)"""
+    return _instance_aleatoire
+
+
+@pytest.fixture
+def colonnes_aleatoires():
+    """
+    colonnes_aleatoires(nb_voyages, nb_services, graine) -> (hdebut, hfin,
+    groupe_debut, groupe_fin, services) : la même instance en colonnes, un
+    groupe par arrêt, et chaque service (debut, fin, (debut_pause, fin_pause))
+    avec une pause de 30 min après 4 h
+    """
+    def fabrique(nb_voyages, nb_services, graine):
+        voyages, services = _instance_aleatoire(nb_voyages, nb_services, graine)
+        groupes = {arret: g for g, arret in enumerate(['A', 'B', 'C', 'D'])}
+        colonnes = ([v.hdebut for v in voyages], [v.hfin for v in voyages],
+                    [groupes[v.arret_debut] for v in voyages], [groupes[v.arret_fin] for v in voyages])
+        bornes = [(s.heure_debut, s.heure_fin, (s.heure_debut + 240, s.heure_debut + 270)) for s, _ in services]
+        return (*colonnes, bornes)
+    return fabrique
@@ -0,0 +1,245 @@
+"""
+Décomposition de l'affectation voyages -> services en blocs
+Fichier: decomposition.py
+
+1. Composantes : deux services sont liés s'ils peuvent recevoir un même
+   voyage. Les voyages de deux composantes n'interagissent pas : les
+   composantes sont résolues en parallèle (strategies_paralleles).
+2. Horizon glissant : dans une composante, les voyages triés par heure de
+   début sont pris par blocs de taille_bloc voyages. Chaque bloc voit en plus,
+   comme tampon, les voyages qui partent moins de `tampon` minutes après son
+   dernier départ, et il est résolu avec CP-SAT (ModeleServices) ou le glouton.
+   Les blocs d'une composante se suivent (pas de résolution parallèle des
+   blocs) : chacun part des chaînes laissées par le précédent.
+3. Raccord : chaque bloc reçoit comme voyages fixes la fin de chaîne (dernier
+   voyage retenu) de chaque service, et le prochain voyage pré-assigné de
+   chaque service au-delà du bloc. Les voyages qu'il ajoute à un service
+   suivent donc sa fin de chaîne et précèdent son prochain voyage fixe : les
+   affectations des voyages du bloc sont gardées telles quelles, sans perte au
+   raccord. Un service qui a un voyage fixe après le bloc garde aussi les
+   voyages du tampon qui le précèdent.
+4. Les voyages restés libres sont ajoutés par le glouton. Si le résultat est
+   moins bon que le glouton sur toute l'instance, c'est ce dernier qui est
+   retourné.
+"""
+
+import time
+from bisect import bisect_right
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from communs.empreintes import NON_ASSIGNE
+from communs.strategies_paralleles import SEUIL_PARALLELE, executer_strategies, nb_processus
+from solverfinal import InstanceServices, ModeleServices, creer_solver
+from table_voyages import VoyageTable
+
+TEMPS_BLOC_MIN = 1.0  # Secondes au minimum pour un bloc CP-SAT (sinon glouton), construction du modèle comprise
+SOLVEURS_BLOC = ('cpsat', 'glouton')
+
+
+# ==================== COMPOSANTES ====================
+
+def composantes(compatibles):
+    """
+    Composantes connexes du biparti voyages - services.
+    Retourne [(services, voyages)] (tableaux d'index triés) ; un voyage
+    qu'aucun service ne peut recevoir n'est dans aucune composante.
+    """
+    nb_services = compatibles.shape[1]
+    parent = list(range(nb_services))
+
+    def racine(s):
+        while parent[s] != s:
+            parent[s] = parent[parent[s]]
+            s = parent[s]
+        return s
+
+    # Deux services d'une même ligne de la matrice sont dans la même composante
+    for ligne in np.unique(compatibles, axis=0):
+        services = np.flatnonzero(ligne).tolist()
+        for s in services[1:]:
+            parent[racine(s)] = racine(services[0])
+
+    racines = np.array([racine(s) for s in range(nb_services)])
+    resultat = []
+    for r in np.unique(racines).tolist():
+        services = np.flatnonzero(racines == r)
+        voyages = np.flatnonzero(compatibles[:, services].any(axis=1))
+        if len(voyages):
+            resultat.append((services, voyages))
+    return resultat
+
+
+# ==================== RÉSOLUTION D'UN BLOC ====================
+
+def _resoudre_bloc(table, indices, compatibles, coupures, fixes_bloc, options, temps_max):
+    """
+    Résout un bloc : indices (index globaux) et sa matrice voyages x services,
+    coupures des services, fixes_bloc = service imposé de chaque voyage du bloc
+    (NON_ASSIGNE sinon).
+    Retourne le service de chaque voyage du bloc (colonnes de la matrice).
+    """
+    debut = time.perf_counter()
+    sous_table = table.sous_table(indices)
+    services_bloc = [(None, np.flatnonzero(fixes_bloc == s).tolist()) for s in range(compatibles.shape[1])]
+
+    if options['solveur_bloc'] == 'glouton' or temps_max < TEMPS_BLOC_MIN:
+        return InstanceServices(sous_table, services_bloc, options, compatibles, coupures).affectation_gloutonne()
+
+    modele = ModeleServices(sous_table, services_bloc, options, compatibles, coupures)
+    affectation = modele.affectation_initiale()
+    if options['indices']:
+        modele.indiquer(affectation)
+    reste = temps_max - (time.perf_counter() - debut)
+    if reste > 0:
+        solver = creer_solver(options, reste)
+        if solver.Solve(modele.model) in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            affectation = modele.affectation(solver.Value)
+    return affectation
+
+
+# ==================== HORIZON GLISSANT ====================
+
+def _resoudre_composante(contexte, services, voyages, temps_max):
+    """
+    Résout une composante bloc par bloc (dans un processus). Retourne le
+    service (index global) de chaque voyage de `voyages`, NON_ASSIGNE sinon.
+    """
+    table, compatibles, coupures, fixes, options = contexte
+    limite = time.perf_counter() + temps_max
+    taille, tampon = options['taille_bloc'], options['tampon']
+    nb_services = len(services)
+    local = {s: k for k, s in enumerate(services.tolist())}
+    coupures = [coupures[s] for s in services.tolist()]
+
+    hdebut = table.hdebut
+    ordre = voyages[np.argsort(hdebut[voyages], kind='stable')].tolist()
+    departs = hdebut[ordre].tolist()
+
+    # Voyages pré-assignés de chaque service (service local), par heure de début
+    fixe = {v: local[int(fixes[v])] for v in ordre if fixes[v] != NON_ASSIGNE}
+    fixes_service = [[] for _ in range(nb_services)]
+    for v in ordre:
+        if v in fixe:
+            fixes_service[fixe[v]].append(v)
+    prochain_fixe = [0] * nb_services
+
+    service_de = {}                  # voyage -> service local retenu
+    traites = set()                  # voyages retenus ou laissés libres
+    fin_chaine = [None] * nb_services
+    p = 0
+    while p < len(ordre):
+        coeur = []
+        while p < len(ordre) and len(coeur) < taille:
+            if ordre[p] not in traites:
+                coeur.append(ordre[p])
+            p += 1
+        if not coeur:
+            break
+        q = bisect_right(departs, hdebut[coeur[-1]] + tampon, lo=p)
+        fenetre = coeur + [v for v in ordre[p:q] if v not in traites]
+        dans_coeur, dans_fenetre = set(coeur), set(fenetre)
+
+        # Prochain voyage fixe de chaque service au-delà de la fenêtre (ancre)
+        ancres = []
+        fixe_apres_coeur = [False] * nb_services
+        for s in range(nb_services):
+            liste = fixes_service[s]
+            while prochain_fixe[s] < len(liste) and liste[prochain_fixe[s]] in traites:
+                prochain_fixe[s] += 1
+            for v in liste[prochain_fixe[s]:]:
+                if v not in dans_fenetre:
+                    ancres.append(v)
+                    fixe_apres_coeur[s] = True
+                    break
+                if v not in dans_coeur:
+                    fixe_apres_coeur[s] = True
+
+        queues = [v for v in fin_chaine if v is not None]
+        indices = np.array(queues + fenetre + ancres, dtype=np.intp)
+        matrice = compatibles[np.ix_(indices, services)].copy()
+        fixes_bloc = np.full(len(indices), NON_ASSIGNE, dtype=np.int32)
+        for k, v in enumerate(indices.tolist()):
+            if v in fixe:
+                fixes_bloc[k] = fixe[v]
+        for k, s in enumerate(s for s in range(nb_services) if fin_chaine[s] is not None):
+            fixes_bloc[k] = s
+        # Un voyage fixe (fin de chaîne, ancre) ne va que dans son service ; un
+        # voyage libre ne va dans un service qu'après sa fin de chaîne
+        imposes = fixes_bloc != NON_ASSIGNE
+        matrice[imposes] = False
+        matrice[np.flatnonzero(imposes), fixes_bloc[imposes]] = True
+        departs_bloc = hdebut[indices]
+        for s, queue in enumerate(fin_chaine):
+            if queue is not None:
+                matrice[~imposes & (departs_bloc <= hdebut[queue]), s] = False
+
+        nb_restants = max(1, -(-(len(ordre) - len(traites)) // taille))
+        temps_bloc = (limite - time.perf_counter()) / nb_restants
+        affectation = _resoudre_bloc(table, indices, matrice, coupures, fixes_bloc, options, temps_bloc)
+
+        # Voyages retenus : le cœur, et tout le bloc pour un service qui a un
+        # voyage fixe plus loin (sa chaîne doit rester reliée à ce voyage)
+        for k, v in enumerate(fenetre, start=len(queues)):
+            s = int(affectation[k])
+            if v in dans_coeur or (s != NON_ASSIGNE and fixe_apres_coeur[s]):
+                traites.add(v)
+                if s != NON_ASSIGNE:
+                    service_de[v] = s
+                    if fin_chaine[s] is None or hdebut[v] > hdebut[fin_chaine[s]]:
+                        fin_chaine[s] = v
+
+    return np.array([services[service_de[v]] if v in service_de else NON_ASSIGNE for v in voyages.tolist()],
+                    dtype=np.int32)
+
+
+def resoudre_par_blocs(voyages, services, options):
+    """
+    Affectation par blocs (options de solverfinal : taille_bloc, tampon,
+    solveur_bloc, parallele, max_workers). Retourne [solution] au format de
+    DialogSolutionsOptimisation, comme resoudre_cpsat.
+    """
+    debut = time.perf_counter()
+    if options['solveur_bloc'] not in SOLVEURS_BLOC:
+        raise ValueError(f"Solveur de bloc inconnu : {options['solveur_bloc']} (attendu : {', '.join(SOLVEURS_BLOC)})")
+
+    table = VoyageTable.depuis_voyages(voyages)
+    # Matrice sans restriction de symétrie : la numérotation se fait bloc par bloc
+    instance = InstanceServices(table, services, {**options, 'symetries': False})
+    fixes = np.full(len(table), NON_ASSIGNE, dtype=np.int32)
+    for s, (_, indices_assignes) in enumerate(services):
+        fixes[list(indices_assignes)] = s
+
+    # Les composantes se partagent les cœurs ; dans une composante, les blocs
+    # se suivent et se partagent le temps de la composante
+    liste = composantes(instance.compatibles)
+    parallele = options['parallele'] and len(liste) > 1 and (
+        options['solveur_bloc'] == 'cpsat' or len(table) * len(services) >= SEUIL_PARALLELE
+    )
+    simultanees = nb_processus(len(liste), options['max_workers']) if parallele else 1
+    reste = max(0.0, options['temps_max'] - (time.perf_counter() - debut))
+    temps_composante = reste * simultanees / max(len(liste), 1)
+    contexte = (table.sans_objets(), instance.compatibles, instance.coupures, fixes,
+                {**options, 'nb_workers': 1, 'tous_assignes': False})
+    resultats = executer_strategies(
+        _resoudre_composante, contexte,
+        [(services_comp, voyages_comp, temps_composante) for services_comp, voyages_comp in liste],
+        parallele=parallele, max_workers=options['max_workers']
+    )
+
+    affectation = np.full(len(table), NON_ASSIGNE, dtype=np.int32)
+    for (_, voyages_comp), services_voyages in zip(liste, resultats):
+        affectation[voyages_comp] = services_voyages
+    nb_libres = int((affectation == NON_ASSIGNE).sum())
+    affectation = instance.completer(affectation)
+    nb_blocs = -(-len(table) // options['taille_bloc'])
+    strategie = f"Décomposition {len(liste)} composante(s), blocs de {options['taille_bloc']} ({options['solveur_bloc']})"
+    print(f"🧩 {strategie} : {nb_libres} voyage(s) libres après les blocs, "
+          f"{nb_libres - int((affectation == NON_ASSIGNE).sum())} ajouté(s) par le glouton (~{nb_blocs} blocs)")
+
+    gloutonne = instance.affectation_gloutonne()
+    if instance.objectif(gloutonne) > instance.objectif(affectation):
+        print("↩️ Le glouton sur toute l'instance fait mieux que les blocs : il est retourné")
+        affectation, strategie = gloutonne, "Glouton (meilleur que la décomposition)"
+    return [instance.solution(affectation, strategie)]
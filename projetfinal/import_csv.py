@@ -12,6 +12,9 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont, QColor
 
+from communs.heures import journee_service_colonnes, parse_heures
+from table_voyages import VoyageTable
+
 
 class DialogImportCSV(QDialog):
     """Dialogue pour importer des voyages depuis un fichier CSV"""
@@ -231,21 +234,37 @@ class DialogImportCSV(QDialog):
 
     def get_voyages_importes(self):
         """Retourne les voyages importés au format standardisé"""
-        voyages = []
+        lignes = [self._nettoyer_ligne(ligne) for ligne in self.donnees_selectionnees]
+
+        # Les heures sont converties en une fois pour toute la colonne
+        hdebuts, debuts_ok = parse_heures([l.get('Début', l.get('Debut', '00:00')) for l in lignes])
+        hfins, fins_ok = parse_heures([l.get('Fin', l.get('fin', '00:00')) for l in lignes])
+        hdebuts, hfins = journee_service_colonnes(hdebuts, hfins)
 
-        for ligne in self.donnees_selectionnees:
-            voyage = self._parser_ligne(ligne)
+        voyages = []
+        for ligne, hdebut, hfin, debut_ok, fin_ok in zip(lignes, hdebuts.tolist(), hfins.tolist(),
+                                                         debuts_ok.tolist(), fins_ok.tolist()):
+            if not (debut_ok and fin_ok):
+                print(f"⚠️ Heure invalide, voyage ignoré: {ligne}")
+                continue
+            voyage = self._parser_ligne(ligne, hdebut, hfin)
             if voyage:
                 voyages.append(voyage)
 
         return voyages
 
-    def _parser_ligne(self, donnee):
-        """Parse une ligne CSV en dictionnaire voyage"""
-        try:
-            # Nettoyer les données
-            donnee_clean = {k: str(v).strip() if v else '' for k, v in donnee.items()}
+    def get_table_voyages(self):
+        """Retourne les voyages importés sous forme de VoyageTable (colonnes NumPy)"""
+        return VoyageTable.depuis_donnees_csv(self.get_voyages_importes())
 
+    @staticmethod
+    def _nettoyer_ligne(donnee):
+        """Nettoie les valeurs d'une ligne CSV"""
+        return {k: str(v).strip() if v else '' for k, v in donnee.items()}
+
+    def _parser_ligne(self, donnee_clean, hdebut, hfin):
+        """Parse une ligne CSV nettoyée en dictionnaire voyage (heures déjà en minutes)"""
+        try:
             # Récupérer les valeurs
             numero_ligne = donnee_clean.get('Ligne', donnee_clean.get('ligne', ''))
             numero_voyage = donnee_clean.get('Voy.', donnee_clean.get('Voyage', donnee_clean.get('voy', '')))
@@ -255,13 +274,10 @@ class DialogImportCSV(QDialog):
             arret_arrivee = donnee_clean.get('À', donnee_clean.get('A', donnee_clean.get('à', '')))
             js_srv = donnee_clean.get('Js srv', donnee_clean.get('JS SRV', ''))
 
-            # Convertir les heures
-            heure_depart = self._heure_vers_decimal(heure_debut_str)
-            heure_fin = self._heure_vers_decimal(heure_fin_str)
-
-            # Calculer la durée
-            duree_minutes = int((heure_fin - heure_depart) * 60)
-            if duree_minutes <= 0:
+            # Heure de départ en décimal, durée en minutes
+            heure_depart = hdebut / 60
+            duree_minutes = hfin - hdebut
+            if duree_minutes == 0:
                 duree_minutes = 60
 
             return {
@@ -284,16 +300,6 @@ class DialogImportCSV(QDialog):
             print(f"Erreur parsing: {e}")
             return None
 
-    def _heure_vers_decimal(self, heure_str):
-        """Convertit HH:MM en décimal"""
-        try:
-            if ':' in str(heure_str):
-                parts = str(heure_str).split(':')
-                return int(parts[0]) + int(parts[1]) / 60
-            return float(heure_str) if heure_str else 0
-        except:
-            return 0.0
-
 
 def importer_voyages_csv(parent=None):
     """
@@ -14,6 +14,8 @@ from PyQt6.QtCore import Qt, pyqtSignal, QTime
 from PyQt6.QtGui import QFont, QColor, QBrush
 
 from objet import voyage, service_agent
+from communs.heures import FIN_JOURNEE_SERVICE, journee_service_colonnes, parse_heures
+from table_voyages import VoyageTable
 
 
 class DialogImportCSVAvecServices(QDialog):
@@ -331,26 +333,33 @@ class DialogImportCSVAvecServices(QDialog):
         couleurs = ['#e3f2fd', '#e8f5e9', '#fff3e0', '#fce4ec', '#f3e5f5', '#e0f7fa', '#fbe9e7']
         couleur_idx = 0
 
+        noms_selectionnes = []
         for i in range(self.liste_services.count()):
             item = self.liste_services.item(i)
+            if item.data(Qt.ItemDataRole.UserRole + 1):
+                noms_selectionnes.append(item.data(Qt.ItemDataRole.UserRole))
 
-            if not item.data(Qt.ItemDataRole.UserRole + 1):
-                continue  # Service non sélectionné
+        # Parser toutes les lignes des services sélectionnés en une passe (heures vectorisées)
+        voyages_parses = self._parser_lignes(
+            [ligne for nom in noms_selectionnes for ligne in self.services_detectes[nom]]
+        )
 
-            nom_service = item.data(Qt.ItemDataRole.UserRole)
+        position = 0
+        for nom_service in noms_selectionnes:
             voyages_csv = self.services_detectes[nom_service]
+            parses = voyages_parses[position:position + len(voyages_csv)]
+            position += len(voyages_csv)
 
             if not voyages_csv:
                 continue
 
             # Trouver les heures min/max pour le service
-            heure_min = 24 * 60
+            heure_min = FIN_JOURNEE_SERVICE
             heure_max = 0
 
             voyages_du_service = []
 
-            for ligne in voyages_csv:
-                voy_data = self._parser_ligne(ligne)
+            for voy_data in parses:
                 if voy_data:
                     voyages_du_service.append(voy_data)
 
@@ -400,11 +409,28 @@ class DialogImportCSVAvecServices(QDialog):
         if reply == QMessageBox.StandardButton.Yes:
             self.accept()
 
-    def _parser_ligne(self, donnee):
-        """Parse une ligne CSV en données voyage"""
-        try:
-            donnee_clean = {k: str(v).strip() if v else '' for k, v in donnee.items()}
+    def _parser_lignes(self, donnees):
+        """Parse des lignes CSV ; les heures sont converties colonne par colonne"""
+        lignes = [{k: str(v).strip() if v else '' for k, v in d.items()} for d in donnees]
+
+        hdebuts, debuts_ok = parse_heures([l.get('Début', l.get('Debut', '00:00')) for l in lignes])
+        hfins, fins_ok = parse_heures([l.get('Fin', l.get('fin', '00:00')) for l in lignes])
+        hdebuts, hfins = journee_service_colonnes(hdebuts, hfins)
+
+        resultats = []
+        for ligne, hdebut, hfin, debut_ok, fin_ok in zip(lignes, hdebuts.tolist(), hfins.tolist(),
+                                                         debuts_ok.tolist(), fins_ok.tolist()):
+            if not (debut_ok and fin_ok):
+                print(f"⚠️ Heure invalide, voyage ignoré: {ligne}")
+                resultats.append(None)
+                continue
+            resultats.append(self._parser_ligne(ligne, hdebut, hfin))
 
+        return resultats
+
+    def _parser_ligne(self, donnee_clean, hdebut, hfin):
+        """Parse une ligne CSV nettoyée en données voyage (heures déjà en minutes)"""
+        try:
             numero_ligne = donnee_clean.get('Ligne', donnee_clean.get('ligne', ''))
             numero_voyage = donnee_clean.get('Voy.', donnee_clean.get('Voyage', donnee_clean.get('voy', '')))
             heure_debut_str = donnee_clean.get('Début', donnee_clean.get('Debut', '00:00'))
@@ -413,11 +439,7 @@ class DialogImportCSVAvecServices(QDialog):
             arret_arrivee = donnee_clean.get('À', donnee_clean.get('A', donnee_clean.get('à', '')))
             js_srv = donnee_clean.get('Js srv', donnee_clean.get('JS SRV', ''))
 
-            # Convertir les heures en minutes
-            hdebut = self._heure_vers_minutes(heure_debut_str)
-            hfin = self._heure_vers_minutes(heure_fin_str)
-
-            if hfin <= hdebut:
+            if hfin == hdebut:
                 hfin = hdebut + 60  # Durée par défaut 1h
 
             return {
@@ -436,20 +458,16 @@ class DialogImportCSVAvecServices(QDialog):
             print(f"Erreur parsing: {e}")
             return None
 
-    def _heure_vers_minutes(self, heure_str):
-        """Convertit HH:MM en minutes depuis minuit"""
-        try:
-            if ':' in str(heure_str):
-                parts = str(heure_str).split(':')
-                return int(parts[0]) * 60 + int(parts[1])
-            return int(float(heure_str) * 60) if heure_str else 0
-        except:
-            return 0
-
     def get_services_a_creer(self):
         """Retourne la liste des services à créer avec leurs voyages"""
         return self.services_a_creer
 
+    def get_table_voyages(self):
+        """Retourne tous les voyages des services à créer sous forme de VoyageTable"""
+        return VoyageTable.depuis_donnees_csv(
+            [voy_data for s in self.services_a_creer for voy_data in s['voyages']]
+        )
+
 
 def importer_csv_avec_services(parent=None):
     """
@@ -3,6 +3,7 @@ Interface de gestion des services de bus avec timeline
 Utilise les classes de objet.py (voyage, service_agent, hlp, proposition)
 """
 
+import queue
 import sys
 import re
 
@@ -11,20 +12,22 @@ from PyQt6.QtWidgets import (
     QGraphicsView, QGraphicsScene, QGraphicsRectItem, QGraphicsTextItem,
     QPushButton, QLabel, QTimeEdit, QDialog, QFormLayout, QLineEdit,
     QComboBox, QDialogButtonBox, QFrame, QTableWidget, QTableWidgetItem,
-    QHeaderView, QAbstractItemView, QMessageBox, QTextEdit
+    QHeaderView, QAbstractItemView, QMessageBox, QTextEdit, QFileDialog
 )
-from PyQt6.QtCore import Qt, QTime, pyqtSignal
+from PyQt6.QtCore import Qt, QTime, QTimer, pyqtSignal
 from PyQt6.QtGui import QBrush, QPen, QColor, QFont, QPainter
 
 # Import des classes métier
 from objet import voyage, service_agent, hlp, proposition
+from communs.heures import FIN_JOURNEE_SERVICE, journee_service
 from import_csv import DialogImportCSV
 
 
 # ==================== CONFIGURATION ====================
 
 HEURE_DEBUT = 4       # Heure de début de la timeline (en heures)
-HEURE_FIN = 24        # Heure de fin de la timeline
+HEURE_FIN = 24        # Heure de fin de la timeline (prolongée si des services passent minuit)
+HEURE_FIN_MAX = FIN_JOURNEE_SERVICE // 60   # Fin de la journée de service (36h)
 HAUTEUR_SERVICE = 50  # Hauteur d'une ligne de service en pixels
 MARGE_GAUCHE = 100    # Marge pour les noms de services
 MARGE_HAUT = 40       # Marge pour les heures
@@ -157,6 +160,7 @@ class TimelineView(QGraphicsView):
 
         self.services = []
         self.pixels_par_heure = 80
+        self.heure_fin = HEURE_FIN
         self.voyage_actuel = None
 
         # Configuration
@@ -178,7 +182,8 @@ class TimelineView(QGraphicsView):
             return
 
         # Dimensions
-        largeur = MARGE_GAUCHE + (HEURE_FIN - HEURE_DEBUT) * self.pixels_par_heure + 50
+        self.heure_fin = self.calculer_heure_fin()
+        largeur = MARGE_GAUCHE + (self.heure_fin - HEURE_DEBUT) * self.pixels_par_heure + 50
         hauteur = MARGE_HAUT + len(self.services) * HAUTEUR_SERVICE + 50
         self.scene.setSceneRect(0, 0, largeur, hauteur)
 
@@ -190,13 +195,25 @@ class TimelineView(QGraphicsView):
             y = MARGE_HAUT + i * HAUTEUR_SERVICE
             self._dessiner_service(service, y, i)
 
+    def calculer_heure_fin(self):
+        """Heure de fin de la timeline : HEURE_FIN, ou plus tard si un service passe minuit"""
+        fin_minutes = 0
+        for service in self.services:
+            if service.heure_fin is not None:
+                fin_minutes = max(fin_minutes, service.heure_fin)
+            if service.voyages.fin is not None:
+                fin_minutes = max(fin_minutes, service.voyages.fin)
+
+        heure_fin = -(-fin_minutes // 60)   # arrondi à l'heure supérieure
+        return min(max(HEURE_FIN, heure_fin), HEURE_FIN_MAX)
+
     def _dessiner_grille(self):
         """Dessine la grille des heures avec lignes pointillées rouges"""
         hauteur_totale = MARGE_HAUT + len(self.services) * HAUTEUR_SERVICE
-        largeur_totale = MARGE_GAUCHE + (HEURE_FIN - HEURE_DEBUT) * self.pixels_par_heure
+        largeur_totale = MARGE_GAUCHE + (self.heure_fin - HEURE_DEBUT) * self.pixels_par_heure
 
         # Lignes verticales pour chaque heure
-        for heure in range(HEURE_DEBUT, HEURE_FIN + 1):
+        for heure in range(HEURE_DEBUT, self.heure_fin + 1):
             x = MARGE_GAUCHE + (heure - HEURE_DEBUT) * self.pixels_par_heure
 
             # Graduation en haut
@@ -204,7 +221,7 @@ class TimelineView(QGraphicsView):
             ligne_grad.setPen(QPen(QColor('#bdc3c7'), 1))
 
             # Label de l'heure
-            heure_affichee = heure if heure < 24 else 0
+            heure_affichee = heure % 24
             label = QGraphicsTextItem(f"{heure_affichee:02d}h")
             label.setDefaultTextColor(QColor('#ecf0f1'))
             label.setFont(QFont("Arial", 8))
@@ -220,7 +237,7 @@ class TimelineView(QGraphicsView):
 
     def _dessiner_service(self, service, y, index):
         """Dessine un service_agent avec ses voyages"""
-        largeur = MARGE_GAUCHE + (HEURE_FIN - HEURE_DEBUT) * self.pixels_par_heure
+        largeur = MARGE_GAUCHE + (self.heure_fin - HEURE_DEBUT) * self.pixels_par_heure
 
         # Fond alternée avec couleurs sombres
         couleur_fond = QColor('#34495e') if index % 2 == 0 else QColor('#3d566e')
@@ -695,14 +712,8 @@ class PanneauGauche(QFrame):
             hlp_obj.hfin = data['hfin']
             hlp_obj.couleur = '#95a5a6'
 
-            # Ajouter au service
-            insert_pos = len(service.voyages)
-            for i, v in enumerate(service.voyages):
-                if v.hdebut > data['hdebut']:
-                    insert_pos = i
-                    break
-
-            service.voyages.insert(insert_pos, hlp_obj)
+            # Ajouter au service (voyages_tries : inséré à sa place chronologique)
+            service.voyages.append(hlp_obj)
 
             # Rafraîchir
             self.timeline.redessiner()
@@ -1123,11 +1134,11 @@ class DialogVoyage(QDialog):
                 hdebut = getattr(voyage_obj, 'hdebut', 0) or 0
                 hfin = getattr(voyage_obj, 'hfin', 60) or 60
 
-                h_debut = int(hdebut) // 60
+                h_debut = int(hdebut) // 60 % 24
                 m_debut = int(hdebut) % 60
                 self.time_debut.setTime(QTime(h_debut, m_debut))
 
-                h_fin = int(hfin) // 60
+                h_fin = int(hfin) // 60 % 24
                 m_fin = int(hfin) % 60
                 self.time_fin.setTime(QTime(h_fin, m_fin))
 
@@ -1176,11 +1187,12 @@ class DialogVoyage(QDialog):
         t_debut = self.time_debut.time()
         t_fin = self.time_fin.time()
 
+        # Une fin avant le début = voyage qui passe minuit
         minutes_debut = t_debut.hour() * 60 + t_debut.minute()
         minutes_fin = t_fin.hour() * 60 + t_fin.minute()
 
-        if minutes_fin <= minutes_debut:
-            QMessageBox.warning(self, "Attention", "L'heure de fin doit être après l'heure de début")
+        if minutes_fin == minutes_debut:
+            QMessageBox.warning(self, "Attention", "L'heure de fin doit être différente de l'heure de début")
             return
 
         self.accept()
@@ -1190,13 +1202,16 @@ class DialogVoyage(QDialog):
         t_debut = self.time_debut.time()
         t_fin = self.time_fin.time()
 
+        hdebut, hfin = journee_service(t_debut.hour() * 60 + t_debut.minute(),
+                                       t_fin.hour() * 60 + t_fin.minute())
+
         return {
             'num_ligne': self.edit_ligne.text().strip(),
             'num_voyage': self.edit_voyage.text().strip(),
             'heure_debut_str': t_debut.toString("HH:mm"),
             'heure_fin_str': t_fin.toString("HH:mm"),
-            'hdebut': t_debut.hour() * 60 + t_debut.minute(),
-            'hfin': t_fin.hour() * 60 + t_fin.minute(),
+            'hdebut': hdebut,
+            'hfin': hfin,
             'arret_debut': self.edit_depart.text().strip(),
             'arret_fin': self.edit_arrivee.text().strip(),
             'js_srv': self.edit_js_srv.text().strip()
@@ -1321,7 +1336,7 @@ class DialogAjoutPause(QDialog):
         t_debut = self.time_debut.time()
         t_fin = self.time_fin.time()
 
-        return (
+        return journee_service(
             t_debut.hour() * 60 + t_debut.minute(),
             t_fin.hour() * 60 + t_fin.minute()
         )
@@ -1402,11 +1417,14 @@ class DialogAjoutHLP(QDialog):
         t_debut = self.time_debut.time()
         t_fin = self.time_fin.time()
 
+        hdebut, hfin = journee_service(t_debut.hour() * 60 + t_debut.minute(),
+                                       t_fin.hour() * 60 + t_fin.minute())
+
         return {
             'arret_depart': self.edit_depart.text(),
             'arret_arrivee': self.edit_arrivee.text(),
-            'hdebut': t_debut.hour() * 60 + t_debut.minute(),
-            'hfin': t_fin.hour() * 60 + t_fin.minute()
+            'hdebut': hdebut,
+            'hfin': hfin
         }
 
 
@@ -1832,13 +1850,21 @@ class PanneauDetails(QFrame):
 # ==================== DIALOGUE SOLUTIONS OPTIMISATION ====================
 
 class DialogSolutionsOptimisation(QDialog):
-    """Dialogue pour afficher et choisir une solution d'optimisation"""
+    """
+    Dialogue pour afficher et choisir une solution d'optimisation.
+    Avec recherche (solverfinal.RechercheContinue), les solutions arrivent
+    pendant la recherche : la file est relue toutes les INTERVALLE_LECTURE ms
+    et chaque solution n'est mise en forme que lorsqu'elle est affichée.
+    """
+
+    INTERVALLE_LECTURE = 200  # ms entre deux lectures de la file de la recherche
 
-    def __init__(self, solutions, services_originaux, parent=None):
+    def __init__(self, solutions, services_originaux, parent=None, recherche=None):
         super().__init__(parent)
-        self.solutions = solutions
+        self.solutions = list(solutions)
         self.services_originaux = services_originaux
         self.solution_choisie = None
+        self.recherche = recherche
 
         print(f"📋 Initialisation dialogue avec {len(solutions)} solution(s)")
 
@@ -1848,10 +1874,10 @@ class DialogSolutionsOptimisation(QDialog):
         layout = QVBoxLayout(self)
 
         # Header
-        header = QLabel(f"🎉 {len(solutions)} solution(s) trouvée(s) !")
-        header.setFont(QFont("Arial", 12, QFont.Weight.Bold))
-        header.setStyleSheet("background-color: #27ae60; color: white; padding: 10px;")
-        layout.addWidget(header)
+        self.header = QLabel(f"🎉 {len(solutions)} solution(s) trouvée(s) !")
+        self.header.setFont(QFont("Arial", 12, QFont.Weight.Bold))
+        self.header.setStyleSheet("background-color: #27ae60; color: white; padding: 10px;")
+        layout.addWidget(self.header)
 
         # Sélection de solution
         select_layout = QHBoxLayout()
@@ -1859,12 +1885,9 @@ class DialogSolutionsOptimisation(QDialog):
 
         self.combo_solutions = QComboBox()
         for i, sol in enumerate(solutions):
-            strategie = sol.get("strategie", "Solution")
-            nb_non_assignes = sol.get("nb_non_assignes", 0)
-            label = f"Solution {i + 1}: {strategie}"
-            if nb_non_assignes > 0:
-                label += f" ⚠️ ({nb_non_assignes} non assignés)"
-            self.combo_solutions.addItem(label, i)
+            self.combo_solutions.addItem(
+                self.libelle_solution(i, sol.get("strategie", "Solution"), sol.get("nb_non_assignes", 0)), i
+            )
         self.combo_solutions.currentIndexChanged.connect(self.afficher_solution)
         select_layout.addWidget(self.combo_solutions)
         select_layout.addStretch()
@@ -1885,10 +1908,16 @@ class DialogSolutionsOptimisation(QDialog):
         # Boutons
         buttons_layout = QHBoxLayout()
 
-        btn_appliquer = QPushButton("✅ Appliquer cette solution")
-        btn_appliquer.setStyleSheet("background-color: #27ae60; color: white; padding: 10px;")
-        btn_appliquer.clicked.connect(self.appliquer_solution)
-        buttons_layout.addWidget(btn_appliquer)
+        self.btn_appliquer = QPushButton("✅ Appliquer cette solution")
+        self.btn_appliquer.setStyleSheet("background-color: #27ae60; color: white; padding: 10px;")
+        self.btn_appliquer.clicked.connect(self.appliquer_solution)
+        self.btn_appliquer.setEnabled(bool(solutions))
+        buttons_layout.addWidget(self.btn_appliquer)
+
+        if recherche is not None:
+            self.btn_arreter = QPushButton("⏹️ Arrêter la recherche")
+            self.btn_arreter.clicked.connect(recherche.arreter)
+            buttons_layout.addWidget(self.btn_arreter)
 
         btn_annuler = QPushButton("❌ Annuler")
         btn_annuler.clicked.connect(self.reject)
@@ -1902,6 +1931,63 @@ class DialogSolutionsOptimisation(QDialog):
         if solutions:
             self.afficher_solution()
 
+        # Solutions de la recherche en cours : lecture périodique de la file
+        if recherche is not None:
+            self.header.setText("⏳ Recherche en cours...")
+            self.timer = QTimer(self)
+            self.timer.timeout.connect(self.lire_solutions)
+            self.timer.start(self.INTERVALLE_LECTURE)
+            self.lire_solutions()
+
+    @staticmethod
+    def libelle_solution(i, strategie, nb_non_assignes):
+        label = f"Solution {i + 1}: {strategie}"
+        if nb_non_assignes > 0:
+            label += f" ⚠️ ({nb_non_assignes} non assignés)"
+        return label
+
+    def lire_solutions(self):
+        """Ajoute les solutions déposées par la recherche depuis la dernière lecture"""
+        while True:
+            try:
+                element = self.recherche.file.get_nowait()
+            except queue.Empty:
+                break
+            if element is None:
+                self.fin_recherche()
+                break
+
+            # Affectation gardée telle quelle, mise en forme à l'affichage
+            affectation, strategie = element
+            i = len(self.solutions)
+            self.solutions.append(element)
+            suivre = self.combo_solutions.currentIndex() == self.combo_solutions.count() - 1
+            self.combo_solutions.addItem(self.libelle_solution(i, strategie, int((affectation < 0).sum())), i)
+            if suivre:
+                # L'utilisateur regarde la dernière solution : afficher la nouvelle (meilleure)
+                self.combo_solutions.setCurrentIndex(i)
+            self.btn_appliquer.setEnabled(True)
+            self.header.setText(f"⏳ Recherche en cours... {len(self.solutions)} solution(s)")
+
+    def fin_recherche(self):
+        self.timer.stop()
+        self.btn_arreter.setEnabled(False)
+        self.header.setText(f"🎉 {len(self.solutions)} solution(s) trouvée(s) !")
+
+    def solution(self, idx):
+        """Solution idx au format dictionnaire (construit à la première demande)"""
+        solution = self.solutions[idx]
+        if isinstance(solution, tuple):
+            solution = self.solutions[idx] = self.recherche.solution(*solution)
+        return solution
+
+    def done(self, resultat):
+        # Fermeture du dialogue (appliquer, annuler) : la recherche s'arrête
+        if self.recherche is not None:
+            self.timer.stop()
+            self.recherche.arreter()
+        super().done(resultat)
+
     def afficher_solution(self):
         print("📊 afficher_solution() appelée")
         idx = self.combo_solutions.currentData()
@@ -1911,7 +1997,7 @@ class DialogSolutionsOptimisation(QDialog):
 
         print(f"📊 Affichage de la solution {idx}")
 
-        solution = self.solutions[idx]
+        solution = self.solution(idx)
 
         # Afficher info stratégie
         strategie = solution.get("strategie", "Stratégie inconnue")
@@ -1953,7 +2039,7 @@ class DialogSolutionsOptimisation(QDialog):
                     if i > 0:
                         voy_prec = voyages_list[i - 1]["voyage_obj"]
                         try:
-                            if voy_prec.arret_fin_id() != voy.arret_debut_id():
+                            if not voy_prec.continuite_geo(voy):
                                 texte += " ⚠️ RUPTURE GÉO"
                         except:
                             pass
@@ -1977,7 +2063,9 @@ class DialogSolutionsOptimisation(QDialog):
 
     def appliquer_solution(self):
         idx = self.combo_solutions.currentData()
-        self.solution_choisie = self.solutions[idx]
+        if idx is None:
+            return
+        self.solution_choisie = self.solution(idx)
         print(f"✅ Solution {idx} choisie")
         self.accept()
 
@@ -1990,6 +2078,8 @@ class MainWindow(QMainWindow):
         self.setMinimumSize(1200, 600)
         self.resize(1400, 700)
 
+        self.solution_appliquee = None  # Dernière solution d'optimisation appliquée
+
         central = QWidget()
         self.setCentralWidget(central)
 
@@ -2001,12 +2091,26 @@ class MainWindow(QMainWindow):
         self.btn_effacer.clicked.connect(self.effacer_tout)
         toolbar.addWidget(self.btn_effacer)
 
+        self.btn_ouvrir = QPushButton("📂 Ouvrir scénario")
+        self.btn_ouvrir.clicked.connect(self.ouvrir_scenario)
+        toolbar.addWidget(self.btn_ouvrir)
+
+        self.btn_enregistrer = QPushButton("💾 Enregistrer scénario")
+        self.btn_enregistrer.clicked.connect(self.enregistrer_scenario)
+        toolbar.addWidget(self.btn_enregistrer)
+
         # ✨ NOUVEAU BOUTON OPTIMISER
         self.btn_optimiser = QPushButton("🚀 Optimiser l'attribution")
         self.btn_optimiser.setStyleSheet("background-color: #e67e22; color: white; padding: 8px; font-weight: bold;")
         self.btn_optimiser.clicked.connect(self.optimiser_services)
         toolbar.addWidget(self.btn_optimiser)
 
+        self.btn_optimiser_cpsat = QPushButton("🧠 Optimiser (CP-SAT)")
+        self.btn_optimiser_cpsat.setStyleSheet("background-color: #8e44ad; color: white; padding: 8px; font-weight: bold;")
+        self.btn_optimiser_cpsat.setToolTip("Solutions affichées au fil de la recherche")
+        self.btn_optimiser_cpsat.clicked.connect(self.optimiser_services_cpsat)
+        toolbar.addWidget(self.btn_optimiser_cpsat)
+
         # ===== NOUVEAU : CHAMP PAUSE MINIMUM =====
         toolbar.addSpacing(20)  # Espacement
 
@@ -2061,22 +2165,16 @@ class MainWindow(QMainWindow):
         """Retourne la valeur actuelle de PAUSE_MIN"""
         return self.spin_pause_min.value()
 
-    def optimiser_services(self):
-        """Lance l'optimisation des services"""
-        from solver_bus import optimiser_services
-
-        pause_min = self.get_pause_min()
-
-        print(f"🚀 Début optimisation (pause_min = {pause_min} min)")
-
+    def donnees_optimisation(self):
+        """(voyages, [(service, indices pré-assignés)]) pour les solvers, None si rien à optimiser"""
         # Vérifications
         if not self.panneau_gauche.voyages_importes:
             QMessageBox.warning(self, "Attention", "Aucun voyage importé")
-            return
+            return None
 
         if not self.timeline.services:
             QMessageBox.warning(self, "Attention", "Aucun service créé")
-            return
+            return None
 
         # Préparer les données
         voyages_list = self.panneau_gauche.voyages_importes
@@ -2092,9 +2190,31 @@ class MainWindow(QMainWindow):
 
             print(f"📋 Service {service.num_service} : {len(indices_assignes)} voyages pré-assignés")
             services_data.append((service, indices_assignes))
+        return voyages_list, services_data
+
+    def optimiser_services(self):
+        """Lance l'optimisation des services"""
+        from communs.couverture_chemins import couverture_sans_fenetre
+        from solver_bus import optimiser_services
+        from table_voyages import VoyageTable
+
+        pause_min = self.get_pause_min()
+
+        print(f"🚀 Début optimisation (pause_min = {pause_min} min)")
+
+        donnees = self.donnees_optimisation()
+        if donnees is None:
+            return
+        voyages_list, services_data = donnees
+
+        # Minimum théorique (couverture par chemins, sans limites de durée) : instantané
+        table = VoyageTable.depuis_voyages(voyages_list)
+        nb_minimum, _ = couverture_sans_fenetre(table.hdebut, table.hfin, table.groupe_debut,
+                                                table.groupe_fin, pause_min)
+        print(f"🎯 Minimum théorique : {nb_minimum} services")
 
         # Lancer l'optimisation avec indicateur de chargement
-        self.label_info.setText("⏳ Optimisation en cours...")
+        self.label_info.setText(f"⏳ Optimisation en cours... (minimum théorique : {nb_minimum} services)")
         QApplication.processEvents()  # Forcer l'affichage
 
         try:
@@ -2135,6 +2255,43 @@ class MainWindow(QMainWindow):
             import traceback
             traceback.print_exc()
 
+    def optimiser_services_cpsat(self):
+        """
+        Optimisation CP-SAT (solverfinal) : le dialogue s'ouvre dès la solution
+        gloutonne et reçoit les solutions suivantes pendant la recherche.
+        """
+        from solverfinal import RechercheContinue
+
+        pause_min = self.get_pause_min()
+
+        print(f"🧠 Début optimisation CP-SAT (pause_min = {pause_min} min)")
+
+        donnees = self.donnees_optimisation()
+        if donnees is None:
+            return
+        voyages_list, services_data = donnees
+
+        try:
+            recherche = RechercheContinue(voyages_list, services_data, {'pause_min': pause_min})
+            recherche.demarrer()
+        except Exception as e:
+            QMessageBox.critical(self, "Erreur", f"Erreur lors de l'optimisation:\n{str(e)}")
+            self.label_info.setText("❌ Erreur d'optimisation")
+            import traceback
+            traceback.print_exc()
+            return
+
+        self.label_info.setText("⏳ Optimisation CP-SAT en cours...")
+        dialog = DialogSolutionsOptimisation([], self.timeline.services, self, recherche=recherche)
+        result = dialog.exec()
+
+        if result == QDialog.DialogCode.Accepted and dialog.solution_choisie is not None:
+            print("✅ Solution acceptée, application en cours...")
+            self.appliquer_solution_optimisee(dialog.solution_choisie)
+        else:
+            print("❌ Solution annulée")
+            self.label_info.setText("Optimisation annulée")
+
     def appliquer_solution_optimisee(self, solution):
         """Applique une solution d'optimisation à l'interface"""
 
@@ -2189,6 +2346,7 @@ class MainWindow(QMainWindow):
                     voyages_a_assigner.append((service_id, v_idx))
 
             print(f"   ✅ {len(voyages_a_assigner)} voyages assignés")
+            self.solution_appliquee = solution
 
             # ✨ NOUVEAU : Détecter les ruptures géographiques
             print("   🔍 Détection des ruptures géographiques...")
@@ -2234,6 +2392,61 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Erreur", f"Erreur lors de l'application de la solution:\n{str(e)}")
             self.label_info.setText("❌ Erreur lors de l'application")
 
+    def enregistrer_scenario(self):
+        """Enregistre voyages, services, pauses, HLP et attribution dans un fichier scénario"""
+        from scenario import sauvegarder_scenario, EXTENSION
+
+        chemin, _ = QFileDialog.getSaveFileName(
+            self, "Enregistrer le scénario", "", f"Scénario (*{EXTENSION})"
+        )
+        if not chemin:
+            return
+        if not chemin.endswith(EXTENSION):
+            chemin += EXTENSION
+
+        try:
+            sauvegarder_scenario(
+                chemin,
+                self.panneau_gauche.voyages_importes,
+                self.timeline.services,
+                parametres={'pause_min': self.get_pause_min()},
+                solution=self.solution_appliquee
+            )
+            self.label_info.setText(f"💾 Scénario enregistré : {chemin}")
+        except Exception as e:
+            QMessageBox.critical(self, "Erreur", f"Erreur lors de l'enregistrement:\n{str(e)}")
+
+    def ouvrir_scenario(self):
+        """Remplace la session courante par un fichier scénario"""
+        from scenario import charger_scenario, EXTENSION
+
+        chemin, _ = QFileDialog.getOpenFileName(
+            self, "Ouvrir un scénario", "", f"Scénario (*{EXTENSION})"
+        )
+        if not chemin:
+            return
+
+        try:
+            scenario = charger_scenario(chemin)
+            voyages = list(scenario.voyages)
+            services = scenario.services()
+        except Exception as e:
+            QMessageBox.critical(self, "Erreur", f"Erreur lors de l'ouverture:\n{str(e)}")
+            return
+
+        self.panneau_gauche.voyages_importes = voyages
+        self.timeline.services = services
+        self.solution_appliquee = scenario.solution()
+        if 'pause_min' in scenario.parametres:
+            self.spin_pause_min.setValue(scenario.parametres['pause_min'])
+
+        self.timeline.redessiner()
+        self.panneau_gauche.refresh_table_importes()
+        self.panneau_gauche.refresh_combo_services()
+        self.panneau_gauche.refresh_pauses()
+        self.panneau_details.effacer()
+        self.label_info.setText(f"📂 Scénario chargé : {len(voyages)} voyage(s), {len(services)} service(s)")
+
     def detecter_ruptures_geo(self):
         """Détecte les ruptures géographiques dans tous les services"""
         ruptures = []
@@ -2249,7 +2462,7 @@ class MainWindow(QMainWindow):
                 voy2 = voyages_list_sorted[i + 1]
 
                 try:
-                    if voy1.arret_fin_id() != voy2.arret_debut_id():
+                    if not voy1.continuite_geo(voy2):
                         # Rupture détectée
                         service_nom = f"Service {service.num_service}" if service.num_service else f"Service {service_id + 1}"
 
@@ -2307,16 +2520,8 @@ class MainWindow(QMainWindow):
 
             hlp_obj.couleur = '#95a5a6'
 
-            # Ajouter au service
-            voyages_list = service.get_voyages()
-
-            insert_pos = len(voyages_list)
-            for i, v in enumerate(voyages_list):
-                if v.hdebut > hlp_obj.hfin:
-                    insert_pos = i
-                    break
-
-            service.voyages.insert(insert_pos, hlp_obj)
+            # Ajouter au service (voyages_tries : inséré à sa place chronologique)
+            service.voyages.append(hlp_obj)
 
             print(f"   ✅ HLP créé: {voy1.arret_fin} → {voy2.arret_debut} (durée encodée: {duree_hlp} min)")
 
@@ -2340,6 +2545,7 @@ class MainWindow(QMainWindow):
 
         if reply == QMessageBox.StandardButton.Yes:
             self.timeline.services = []
+            self.solution_appliquee = None
             self.timeline.redessiner()
             self.panneau_gauche.voyages_importes = []
             self.panneau_gauche.refresh_table_importes()
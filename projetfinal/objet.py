@@ -1,3 +1,11 @@
+from bisect import bisect_left, bisect_right, insort
+
+import numpy as np
+
+from communs.heures import FIN_JOURNEE_SERVICE, heure_vers_minutes, journee_service, limites_journee_service
+from communs.registre_arrets import REGISTRE_ARRETS
+
+
 class hlp:
 
     def __init__(self, arret_depart, arret_arrivee, duree, heure_debut=None):
@@ -23,11 +31,262 @@ class hlp:
         return self.__str__()
 
 
+class index_pauses:
+    """
+    Index des pauses d'un service : intervalles fusionnés, disjoints et triés.
+
+    Sur des intervalles disjoints triés, les fins sont aussi triées : une
+    bisection suffit pour trouver la seule pause qui peut chevaucher un
+    créneau, et np.searchsorted fait la même chose pour tout un tableau.
+    """
+
+    def __init__(self, pauses=()):
+        debuts, fins = [], []
+        for pause_debut, pause_fin in sorted(pauses):
+            if debuts and pause_debut < fins[-1]:
+                fins[-1] = max(fins[-1], pause_fin)
+            else:
+                debuts.append(pause_debut)
+                fins.append(pause_fin)
+        self.debuts = debuts
+        self.fins = fins
+        self._debuts_np = np.asarray(debuts, dtype=np.int32)
+        self._fins_np = np.asarray(fins, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.debuts)
+
+    def chevauche(self, hdebut, hfin):
+        """Vérifie en O(log p) si [hdebut, hfin] chevauche une pause"""
+        i = bisect_right(self.fins, hdebut)
+        return i < len(self.debuts) and self.debuts[i] < hfin
+
+    def masque_compatible(self, hdebut_array, hfin_array):
+        """Masque booléen : True pour chaque créneau qui ne chevauche aucune pause"""
+        hdebut_array = np.asarray(hdebut_array)
+        hfin_array = np.asarray(hfin_array)
+        masque = np.ones(hdebut_array.shape, dtype=bool)
+        if not self.debuts:
+            return masque
+
+        i = np.searchsorted(self._fins_np, hdebut_array, side='right')
+        dans_index = i < len(self.debuts)
+        masque[dans_index] = self._debuts_np[i[dans_index]] >= hfin_array[dans_index]
+        return masque
+
+
+def _compter_lignes(lignes, voyages, sens=1):
+    """Met à jour le compteur num_ligne -> nombre de voyages (les HLP n'ont pas de ligne)"""
+    for v in voyages:
+        num_ligne = getattr(v, 'num_ligne', None)
+        if num_ligne is None:
+            continue
+        nb = lignes.get(num_ligne, 0) + sens
+        if nb:
+            lignes[num_ligne] = nb
+        else:
+            del lignes[num_ligne]
+    return lignes
+
+
+def _nb_lignes_avec(lignes, voyages):
+    """Nombre de lignes distinctes si on ajoutait ces voyages (sans rien modifier)"""
+    nouvelles = {getattr(v, 'num_ligne', None) for v in voyages}
+    nouvelles.discard(None)
+    return len(lignes) + len(nouvelles.difference(lignes))
+
+
+def _peut_inserer(debuts, fins, hdebut, hfin, pause_min=0, pause_max=None):
+    """Test d'insertion commun à voyages_tries et voyages_figes (débuts triés)"""
+    pos = bisect_right(debuts, hdebut)
+
+    if pos > 0:
+        pause = hdebut - fins[pos - 1]
+        if pause < pause_min or (pause_max is not None and pause > pause_max):
+            return False
+
+    if pos < len(debuts):
+        pause = debuts[pos] - hfin
+        if pause < pause_min or (pause_max is not None and pause > pause_max):
+            return False
+
+    return True
+
+
+class voyages_tries(list):
+    """
+    Liste des voyages d'un service, toujours triée par heure de début.
+
+    Les heures de début/fin sont gardées en parallèle pour les recherches
+    par bisection. On suppose que les voyages d'un même service ne se
+    chevauchent pas : le prédécesseur d'un créneau est alors le voyage juste
+    avant sa position d'insertion, et le dernier voyage est celui qui finit
+    le plus tard.
+
+    Le nombre de voyages par ligne est tenu à jour à chaque ajout/retrait
+    (nb_lignes en O(1) au lieu d'un set reconstruit à chaque test).
+    """
+
+    def __init__(self, voyages=()):
+        super().__init__()
+        self._debuts = []
+        self._fins = []
+        self._fin_max = None
+        self._lignes = {}
+        for v in voyages:
+            self.append(v)
+
+    def __reduce__(self):
+        # copy/pickle : reconstruire via __init__ pour garder les index parallèles
+        return (self.__class__, (list(self),))
+
+    @staticmethod
+    def _heures(v):
+        # Les HLP insérés par l'interface ont hdebut/hfin, sinon heure_debut/heure_fin
+        hdebut = getattr(v, 'hdebut', None)
+        if hdebut is None:
+            return v.heure_debut, v.heure_fin
+        return hdebut, v.hfin
+
+    # ---------- Modification (garde la liste triée) ----------
+
+    def _inserer(self, pos, v, hdebut, hfin):
+        super().insert(pos, v)
+        self._debuts.insert(pos, hdebut)
+        self._fins.insert(pos, hfin)
+        if self._fin_max is None or hfin > self._fin_max:
+            self._fin_max = hfin
+        _compter_lignes(self._lignes, (v,))
+        return pos
+
+    def append(self, v):
+        """Insère le voyage à sa place chronologique et retourne sa position"""
+        hdebut, hfin = self._heures(v)
+        return self._inserer(bisect_right(self._debuts, hdebut), v, hdebut, hfin)
+
+    def insert(self, index, v):
+        """
+        Insère le voyage à la position demandée, qui doit être une place
+        chronologique (entre les voyages partant avant et après lui) ;
+        ValueError sinon. Retourne la position.
+        """
+        hdebut, hfin = self._heures(v)
+        if index < 0:
+            index = max(0, index + len(self))
+        index = min(index, len(self))
+        if not bisect_left(self._debuts, hdebut) <= index <= bisect_right(self._debuts, hdebut):
+            raise ValueError(f"Position {index} hors de l'ordre chronologique (début {hdebut})")
+        return self._inserer(index, v, hdebut, hfin)
+
+    def extend(self, voyages):
+        for v in voyages:
+            self.append(v)
+
+    def __iadd__(self, voyages):
+        self.extend(voyages)
+        return self
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            raise TypeError("Suppression par tranche non supportée")
+        if index < 0:
+            index += len(self)
+        _compter_lignes(self._lignes, (self[index],), -1)
+        super().__delitem__(index)
+        del self._debuts[index]
+        hfin = self._fins.pop(index)
+        if hfin == self._fin_max:
+            self._fin_max = max(self._fins) if self._fins else None
+
+    def __setitem__(self, index, v):
+        del self[index]
+        self.append(v)
+
+    def pop(self, index=-1):
+        v = self[index]
+        del self[index]
+        return v
+
+    def remove(self, v):
+        del self[self.position(v)]
+
+    def clear(self):
+        super().clear()
+        self._debuts.clear()
+        self._fins.clear()
+        self._fin_max = None
+        self._lignes.clear()
+
+    def sort(self, *args, **kwargs):
+        """Déjà triée par heure de début"""
+        pass
+
+    # ---------- Requêtes ----------
+
+    def position(self, v):
+        """Position d'un voyage (O(log n) + égalités d'heure de début)"""
+        hdebut, _ = self._heures(v)
+        pos = bisect_left(self._debuts, hdebut)
+        while pos < len(self) and self._debuts[pos] == hdebut:
+            if self[pos] is v:
+                return pos
+            pos += 1
+        raise ValueError("voyage absent du service")
+
+    @property
+    def debut(self):
+        """Heure de début du premier voyage (O(1))"""
+        return self._debuts[0] if self._debuts else None
+
+    @property
+    def fin(self):
+        """Heure de fin la plus tardive (O(1))"""
+        return self._fin_max
+
+    @property
+    def nb_lignes(self):
+        """Nombre de lignes distinctes (O(1))"""
+        return len(self._lignes)
+
+    def lignes(self):
+        """Lignes utilisées -> nombre de voyages sur chaque ligne"""
+        return dict(self._lignes)
+
+    def nb_lignes_avec(self, *voyages):
+        """Nombre de lignes distinctes si on ajoutait ces voyages"""
+        return _nb_lignes_avec(self._lignes, voyages)
+
+    def premier(self):
+        return self[0] if self else None
+
+    def dernier(self):
+        return self[-1] if self else None
+
+    # predecesseur/successeur : position = point d'insertion (convention de
+    # bisect), entre self[position - 1] et self[position]. Pour un créneau,
+    # c'est la position retournée par bisect_right sur les heures de début.
+
+    def predecesseur(self, position):
+        """Voyage juste avant le point d'insertion, self[position - 1] (O(1))"""
+        return self[position - 1] if 0 < position <= len(self) else None
+
+    def successeur(self, position):
+        """Voyage juste après le point d'insertion, self[position] (O(1))"""
+        return self[position] if 0 <= position < len(self) else None
+
+    def peut_inserer(self, hdebut, hfin, pause_min=0, pause_max=None):
+        """
+        Vérifie en O(log n) que [hdebut, hfin) tient entre ses voisins
+        avec une pause comprise entre pause_min et pause_max.
+        """
+        return _peut_inserer(self._debuts, self._fins, hdebut, hfin, pause_min, pause_max)
+
+
 class service_agent:
 
     def __init__(self, num_service=None, type_service="matin"):
-        self.voyages = []
-        self.hlps = []  # Liste des HLP du service
+        self.voyages = voyages_tries()
+        self.hlps = []  # Liste des HLP du service (durée totale tenue à jour)
         self.num_service = num_service
         self.type_service = type_service
         self.heure_debut = None
@@ -36,24 +295,52 @@ class service_agent:
         self.heure_fin_coupure = None
         self.pauses = []
 
+    @property
+    def hlps(self):
+        return self._hlps
+
+    @hlps.setter
+    def hlps(self, hlps):
+        self._hlps = list(hlps)
+        self._duree_hlps = sum(h.duree for h in self._hlps)
+
+    @property
+    def pauses(self):
+        return self._pauses
+
+    @pauses.setter
+    def pauses(self, pauses):
+        self._pauses = sorted(limites_journee_service(hdebut, hfin) for hdebut, hfin in pauses)
+        self._index_pauses = None
+
     def ajouter_pause(self, hdebut_minutes, hfin_minutes):
-        """Ajoute une pause au service"""
-        self.pauses.append((hdebut_minutes, hfin_minutes))
-        # Trier les pauses par heure de début
-        self.pauses.sort(key=lambda p: p[0])
+        """Ajoute une pause au service (la liste reste triée par heure de début)"""
+        insort(self._pauses, limites_journee_service(hdebut_minutes, hfin_minutes))
+        self._index_pauses = None
 
     def retirer_pause(self, index):
         """Retire une pause"""
-        if 0 <= index < len(self.pauses):
-            del self.pauses[index]
+        if 0 <= index < len(self._pauses):
+            del self._pauses[index]
+            self._index_pauses = None
+
+    def index_pauses(self):
+        """Index des pauses, reconstruit seulement après une modification"""
+        if self._index_pauses is None:
+            self._index_pauses = index_pauses(self._pauses)
+        return self._index_pauses
 
     def est_dans_pause(self, hdebut, hfin):
         """Vérifie si un créneau chevauche une pause"""
-        for pause_debut, pause_fin in self.pauses:
-            # Vérifier chevauchement
-            if not (hfin <= pause_debut or hdebut >= pause_fin):
-                return True
-        return False
+        return self.index_pauses().chevauche(hdebut, hfin)
+
+    def masque_compatible(self, hdebut_array, hfin_array):
+        """Pour tous les créneaux d'un coup : True si le créneau ne chevauche ni pause ni coupure"""
+        masque = self.index_pauses().masque_compatible(hdebut_array, hfin_array)
+        if self.type_service == "coupé" and self.heure_debut_coupure is not None and self.heure_fin_coupure is not None:
+            masque &= ((np.asarray(hfin_array) <= self.heure_debut_coupure)
+                       | (np.asarray(hdebut_array) >= self.heure_fin_coupure))
+        return masque
 
     def ajouter_voyage(self, voyage):
         valide, erreur = self.voyage_dans_limites(voyage)
@@ -62,19 +349,46 @@ class service_agent:
         self.voyages.append(voyage)
 
     def ajouter_hlp(self, hlp_obj):
-        self.hlps.append(hlp_obj)
+        self._hlps.append(hlp_obj)
+        self._duree_hlps += hlp_obj.duree
+
+    def retirer_hlp(self, hlp_obj):
+        self._hlps.remove(hlp_obj)
+        self._duree_hlps -= hlp_obj.duree
 
     def get_voyages(self):
         return self.voyages
 
+    def peut_ajouter(self, voyage, pause_min=0, pause_max=None):
+        """Vérifie en O(log n) que le voyage s'insère entre ses voisins (pause comprise)"""
+        return self.voyages.peut_inserer(voyage.hdebut, voyage.hfin, pause_min, pause_max)
+
+    def premier_voyage(self):
+        return self.voyages.premier()
+
+    def dernier_voyage(self):
+        return self.voyages.dernier()
+
     def get_hlps(self):
         return self.hlps
 
+    def nb_lignes(self):
+        return self.voyages.nb_lignes
+
+    def nb_lignes_avec(self, *voyages):
+        return self.voyages.nb_lignes_avec(*voyages)
+
     def set_limites(self, heure_debut, heure_fin):
+        """Limites en minutes ; une fin avant le début signifie que le service passe minuit"""
+        if heure_debut is not None and heure_fin is not None:
+            heure_debut, heure_fin = limites_journee_service(heure_debut, heure_fin)
         self.heure_debut = heure_debut
         self.heure_fin = heure_fin
 
     def set_coupure(self, heure_debut_coupure, heure_fin_coupure):
+        """Coupure en minutes, normalisée comme les limites du service"""
+        if heure_debut_coupure is not None and heure_fin_coupure is not None:
+            heure_debut_coupure, heure_fin_coupure = limites_journee_service(heure_debut_coupure, heure_fin_coupure)
         self.heure_debut_coupure = heure_debut_coupure
         self.heure_fin_coupure = heure_fin_coupure
 
@@ -98,9 +412,7 @@ class service_agent:
     def duree_services(self):
         if not self.voyages:
             return 0
-        debut = min(v.hdebut for v in self.voyages)
-        fin = max(v.hfin for v in self.voyages)
-        return fin - debut
+        return self.voyages.fin - self.voyages.debut
 
     def duree_coupure(self):
         if self.heure_debut_coupure is not None and self.heure_fin_coupure is not None:
@@ -112,7 +424,7 @@ class service_agent:
         return duree_totale - self.duree_coupure()
 
     def duree_hlp_totale(self):
-        return sum(h.duree for h in self.hlps)
+        return self._duree_hlps
 
     def get_elements_chronologiques(self):
         elements = []
@@ -134,8 +446,8 @@ class service_agent:
 
         elements = self.get_elements_chronologiques()
 
-        debut_service = min(v.hdebut for v in self.voyages)
-        fin_service = max(v.hfin for v in self.voyages)
+        debut_service = self.voyages.debut
+        fin_service = self.voyages.fin
 
         result = f"Service {self.num_service} ({self.type_service.upper()}): {len(self.voyages)} voyages"
         if self.hlps:
@@ -163,11 +475,54 @@ class voyage:
         self.num_voyage = num_voyage
         self.arret_debut = arret_debut
         self.arret_fin = arret_fin
-        self.hdebut = self.time_to_minutes(heure_debut)
-        self.hfin = self.time_to_minutes(heure_fin)
+        # Minutes de journée de service (0-2159) : un voyage de nuit reste croissant
+        self.hdebut, self.hfin = journee_service(self.time_to_minutes(heure_debut),
+                                                 self.time_to_minutes(heure_fin))
+        if self.hfin >= FIN_JOURNEE_SERVICE:
+            raise ValueError(f"Voyage hors journée de service: {heure_debut} - {heure_fin}")
         self.js_srv = js_srv
         self.distance = None
 
+    @classmethod
+    def depuis_minutes(cls, num_ligne, num_voyage, arret_debut, arret_fin, hdebut, hfin, js_srv=""):
+        """Crée un voyage depuis des minutes de journée de service déjà normalisées (sans parsing)"""
+        voy = cls.__new__(cls)
+        voy.num_ligne = num_ligne
+        voy.num_voyage = num_voyage
+        voy.arret_debut = arret_debut
+        voy.arret_fin = arret_fin
+        voy.hdebut = int(hdebut)
+        voy.hfin = int(hfin)
+        voy.js_srv = js_srv
+        voy.distance = None
+        return voy
+
+    # Les codes d'arrêt et de groupe (registre_arrets) sont calculés à l'affectation,
+    # la continuité géographique se teste ensuite par comparaison d'entiers
+    @property
+    def arret_debut(self):
+        return self._arret_debut
+
+    @arret_debut.setter
+    def arret_debut(self, arret):
+        self._arret_debut = arret
+        self.arret_debut_code = REGISTRE_ARRETS.code(arret)
+        self.groupe_debut = REGISTRE_ARRETS.groupe(arret)
+
+    @property
+    def arret_fin(self):
+        return self._arret_fin
+
+    @arret_fin.setter
+    def arret_fin(self, arret):
+        self._arret_fin = arret
+        self.arret_fin_code = REGISTRE_ARRETS.code(arret)
+        self.groupe_fin = REGISTRE_ARRETS.groupe(arret)
+
+    def continuite_geo(self, suivant):
+        """Vrai si le voyage suivant part du même groupe d'arrêts que notre arrivée (vide ne suit que vide)"""
+        return self.groupe_fin == suivant.groupe_debut
+
     def arret_debut_id(self):
         """Retourne les 3 premiers caractères de l'arrêt de début"""
         return self.arret_debut[:3]
@@ -178,8 +533,7 @@ class voyage:
 
     @staticmethod
     def time_to_minutes(time_str):
-        h, m = map(int, time_str.split(':'))
-        return h * 60 + m
+        return heure_vers_minutes(time_str)
 
     @staticmethod
     def minutes_to_time(minutes):
@@ -201,4 +555,189 @@ class proposition:
         return sum(len(s.get_hlps()) for s in self.service)
 
     def duree_hlp_totale(self):
-        return sum(s.duree_hlp_totale() for s in self.service)
\ No newline at end of file
+        # O(services) : chaque service tient sa durée HLP à jour
+        return sum(s.duree_hlp_totale() for s in self.service)
+
+    def duree_travail_totale(self):
+        return sum(s.duree_travail_effective() for s in self.service)
+
+
+# ==================== INSTANTANÉS POUR LA RECHERCHE ====================
+
+class voyages_figes(tuple):
+    """
+    Voyages d'un service figés : tuple trié par heure de début, jamais modifié.
+    avec()/sans() retournent un nouveau tuple, l'original reste valide.
+    """
+
+    def __new__(cls, voyages=()):
+        voyages = sorted(voyages, key=lambda v: v.hdebut)
+        self = super().__new__(cls, voyages)
+        self._debuts = tuple(v.hdebut for v in voyages)
+        self._fins = tuple(v.hfin for v in voyages)
+        self._ids = frozenset(id(v) for v in voyages)
+        self._fin_max = max(self._fins) if voyages else None
+        self._lignes = _compter_lignes({}, voyages)
+        return self
+
+    def __reduce__(self):
+        return (self.__class__, (tuple(self),))
+
+    @property
+    def debut(self):
+        return self._debuts[0] if self else None
+
+    @property
+    def fin(self):
+        return self._fin_max
+
+    @property
+    def nb_lignes(self):
+        return len(self._lignes)
+
+    def nb_lignes_avec(self, *voyages):
+        return _nb_lignes_avec(self._lignes, voyages)
+
+    def contient(self, voyage):
+        return id(voyage) in self._ids
+
+    def peut_inserer(self, hdebut, hfin, pause_min=0, pause_max=None):
+        return _peut_inserer(self._debuts, self._fins, hdebut, hfin, pause_min, pause_max)
+
+    def avec(self, *voyages):
+        return voyages_figes(tuple(self) + voyages)
+
+    def sans(self, *voyages):
+        ids = {id(v) for v in voyages}
+        return voyages_figes(v for v in self if id(v) not in ids)
+
+
+class service_fige:
+    """
+    Service immuable utilisé par les solvers : chaque ajout ou retrait crée un
+    nouveau service_fige qui ne copie que les voyages de ce service.
+    Mêmes requêtes que service_agent (get_voyages, peut_ajouter, durées).
+    """
+
+    __slots__ = ('num_service', 'type_service', 'petit_service', 'voyages')
+
+    def __init__(self, num_service=None, type_service="matin", petit_service=False, voyages=()):
+        self.num_service = num_service
+        self.type_service = type_service
+        self.petit_service = petit_service
+        self.voyages = voyages if isinstance(voyages, voyages_figes) else voyages_figes(voyages)
+
+    def _remplacer_voyages(self, voyages):
+        return service_fige(self.num_service, self.type_service, self.petit_service, voyages)
+
+    def avec_voyages(self, *voyages):
+        return self._remplacer_voyages(self.voyages.avec(*voyages))
+
+    def sans_voyages(self, *voyages):
+        return self._remplacer_voyages(self.voyages.sans(*voyages))
+
+    def get_voyages(self):
+        return self.voyages
+
+    def get_hlps(self):
+        return ()
+
+    def peut_ajouter(self, voyage, pause_min=0, pause_max=None):
+        return self.voyages.peut_inserer(voyage.hdebut, voyage.hfin, pause_min, pause_max)
+
+    def nb_lignes(self):
+        return self.voyages.nb_lignes
+
+    def nb_lignes_avec(self, *voyages):
+        return self.voyages.nb_lignes_avec(*voyages)
+
+    def duree_services(self):
+        if not self.voyages:
+            return 0
+        return self.voyages.fin - self.voyages.debut
+
+    def duree_travail_effective(self):
+        return self.duree_services()
+
+    def duree_hlp_totale(self):
+        return 0
+
+    def vers_service_agent(self):
+        """Copie modifiable pour l'interface (les objets voyage sont partagés, pas modifiés)"""
+        service = service_agent(num_service=self.num_service, type_service=self.type_service)
+        service.petit_service = self.petit_service
+        service.voyages.extend(self.voyages)
+        return service
+
+
+class proposition_figee:
+    """
+    Proposition immuable (instantané) : un tuple de service_fige.
+
+    Modifier un service retourne une nouvelle proposition qui partage tous les
+    autres services avec l'ancienne. « Forker » une solution partielle revient
+    donc à garder une référence (O(1)) ; un essai raté est simplement abandonné,
+    sans rien écrire sur les voyages d'origine.
+
+    Le nombre de voyages et la durée de travail cumulée sont reportés d'une
+    proposition à la suivante (différence sur le seul service modifié).
+    """
+
+    __slots__ = ('num_proposition', 'service', 'nb_voyages', 'duree_travail')
+
+    def __init__(self, num_proposition=None, services=(), _totaux=None):
+        self.num_proposition = num_proposition
+        self.service = tuple(services)
+        if _totaux is None:
+            _totaux = (sum(len(s.voyages) for s in self.service),
+                       sum(s.duree_travail_effective() for s in self.service))
+        self.nb_voyages, self.duree_travail = _totaux
+
+    def fork(self):
+        return self
+
+    def avec_num(self, num_proposition):
+        return proposition_figee(num_proposition, self.service, (self.nb_voyages, self.duree_travail))
+
+    def avec_service(self, service):
+        totaux = (self.nb_voyages + len(service.voyages),
+                  self.duree_travail + service.duree_travail_effective())
+        return proposition_figee(self.num_proposition, self.service + (service,), totaux)
+
+    def remplacer_service(self, index, service):
+        ancien = self.service[index]
+        totaux = (self.nb_voyages + len(service.voyages) - len(ancien.voyages),
+                  self.duree_travail + service.duree_travail_effective() - ancien.duree_travail_effective())
+        services = self.service[:index] + (service,) + self.service[index + 1:]
+        return proposition_figee(self.num_proposition, services, totaux)
+
+    def avec_voyages(self, index, *voyages):
+        return self.remplacer_service(index, self.service[index].avec_voyages(*voyages))
+
+    def sans_voyages(self, index, *voyages):
+        return self.remplacer_service(index, self.service[index].sans_voyages(*voyages))
+
+    def est_assigne(self, voyage):
+        return any(s.voyages.contient(voyage) for s in self.service)
+
+    def non_assignes(self, voyages):
+        return [v for v in voyages if not self.est_assigne(v)]
+
+    def total_voyages(self):
+        return self.nb_voyages
+
+    def total_hlps(self):
+        return 0
+
+    def duree_hlp_totale(self):
+        return 0
+
+    def duree_travail_totale(self):
+        return self.duree_travail
+
+    def vers_proposition(self):
+        """Proposition modifiable (service_agent) pour l'interface"""
+        propo = proposition(num_proposition=self.num_proposition)
+        for s in self.service:
+            propo.ajout_service(s.vers_service_agent())
+        return propo
@@ -0,0 +1,410 @@
+"""
+Scénario : sauvegarde et rechargement d'une session complète
+Fichier: scenario.py
+
+Un fichier scénario contient les voyages, les arrêts, les services (limites,
+coupures, pauses, petit service), les HLP et l'attribution appliquée.
+
+Format (un seul fichier) :
+    - 8 octets      : MAGIQUE
+    - 8 octets      : longueur de l'en-tête JSON (uint64 little-endian)
+    - en-tête JSON  : version, métadonnées des services, paramètres, solution,
+                      et pour chaque tableau son dtype, sa forme et son offset
+    - tableaux      : colonnes NumPy à largeur fixe, alignées sur 64 octets
+
+Les colonnes sont projetées en mémoire (np.memmap) à l'ouverture : rien n'est
+lu ni converti tant qu'on n'y accède pas, et les objets voyage ne sont créés
+qu'à la demande.
+
+Utilisation sans interface :
+    scenario = charger_scenario("reseau.scen")
+    table = scenario.table()                    # VoyageTable pour les solvers
+    solutions = optimiser_services(list(scenario.voyages), scenario.services_data())
+"""
+
+import json
+import os
+from collections.abc import Sequence
+
+import numpy as np
+
+from objet import voyage, service_agent, hlp
+from table_voyages import VoyageTable
+
+MAGIQUE = b'SCENBUS1'
+VERSION = 1
+ALIGNEMENT = 64
+EXTENSION = '.scen'
+
+_TAILLE_PREFIXE = len(MAGIQUE) + 8
+
+
+# ==================== CODAGE DES COLONNES ====================
+
+def _est_entier(valeur):
+    return isinstance(valeur, (int, np.integer)) and not isinstance(valeur, bool)
+
+
+def _coder(valeurs):
+    """
+    Code une colonne de valeurs en (codes int32, table des valeurs distinctes).
+    None -> code -1. La table est en int64 si toutes les valeurs sont entières,
+    sinon en texte à largeur fixe ; le type d'origine est donc conservé.
+    """
+    codes_par_valeur = {}
+    codes = np.empty(len(valeurs), dtype=np.int32)
+    for i, val in enumerate(valeurs):
+        if val is None:
+            codes[i] = -1
+            continue
+        code = codes_par_valeur.get(val)
+        if code is None:
+            code = codes_par_valeur[val] = len(codes_par_valeur)
+        codes[i] = code
+
+    uniques = list(codes_par_valeur)
+    if uniques and all(_est_entier(v) for v in uniques):
+        table = np.asarray(uniques, dtype=np.int64)
+    else:
+        table = np.asarray([str(v) for v in uniques], dtype=str)
+        if table.dtype.itemsize == 0:
+            table = table.astype('<U1')
+    return codes, table
+
+
+def _decoder(codes, table):
+    """Inverse de _coder : liste Python des valeurs"""
+    valeurs = table.tolist()
+    return [valeurs[c] if c >= 0 else None for c in codes.tolist()]
+
+
+# ==================== ÉCRITURE ====================
+
+def _aligner(position):
+    return -(-position // ALIGNEMENT) * ALIGNEMENT
+
+
+def _ecrire(chemin, entete, tableaux):
+    """Écrit l'en-tête et les tableaux (fichier temporaire puis remplacement)"""
+    tableaux = {nom: np.ascontiguousarray(t) for nom, t in tableaux.items()}
+
+    offset = 0
+    description = {}
+    for nom, t in tableaux.items():
+        description[nom] = {'dtype': t.dtype.str, 'shape': list(t.shape), 'offset': offset}
+        offset = _aligner(offset + t.nbytes)
+    entete = dict(entete, version=VERSION, tableaux=description)
+
+    brut = json.dumps(entete, ensure_ascii=False).encode('utf-8')
+    debut_donnees = _aligner(_TAILLE_PREFIXE + len(brut))
+
+    temporaire = chemin + '.tmp'
+    with open(temporaire, 'wb') as f:
+        f.write(MAGIQUE)
+        f.write(np.uint64(len(brut)).tobytes())
+        f.write(brut)
+        for nom, t in tableaux.items():
+            f.write(b'\0' * (debut_donnees + description[nom]['offset'] - f.tell()))
+            f.write(t.tobytes())
+    os.replace(temporaire, chemin)
+
+
+def sauvegarder_scenario(chemin, voyages, services, parametres=None, solution=None):
+    """
+    Enregistre un scénario.
+
+    voyages   : liste des voyages importés (objets voyage)
+    services  : liste de service_agent ; leurs voyages et HLP sont enregistrés
+                comme attribution appliquée
+    parametres: dict JSON (ex. {'pause_min': 5})
+    solution  : solution appliquée au format des solvers (seules 'strategies'
+                et 'nb_non_assigned' sont gardées, l'attribution est celle des services)
+    """
+    voyages = list(voyages)
+    index_par_id = {id(v): i for i, v in enumerate(voyages)}
+
+    # Un voyage d'un service absent de la liste est ajouté en fin de table
+    for service in services:
+        for elem in service.voyages:
+            if not isinstance(elem, hlp) and id(elem) not in index_par_id:
+                index_par_id[id(elem)] = len(voyages)
+                voyages.append(elem)
+
+    # ---------- Services et HLP ----------
+    elements, pointeurs = [], [0]
+    hlps, hlp_service, hlp_dans_voyages = [], [], []
+    services_meta = []
+
+    for num, service in enumerate(services):
+        for elem in service.voyages:
+            if isinstance(elem, hlp):
+                elements.append(-1 - len(hlps))
+                hlps.append(elem)
+                hlp_service.append(num)
+                hlp_dans_voyages.append(True)
+            else:
+                elements.append(index_par_id[id(elem)])
+        pointeurs.append(len(elements))
+
+        for h in service.get_hlps():
+            hlps.append(h)
+            hlp_service.append(num)
+            hlp_dans_voyages.append(False)
+
+        services_meta.append({
+            'num_service': service.num_service,
+            'type_service': service.type_service,
+            'heure_debut': service.heure_debut,
+            'heure_fin': service.heure_fin,
+            'heure_debut_coupure': service.heure_debut_coupure,
+            'heure_fin_coupure': service.heure_fin_coupure,
+            'pauses': [list(p) for p in service.pauses],
+            'couleur': getattr(service, 'couleur', None),
+            'petit_service': getattr(service, 'petit_service', False),
+        })
+
+    # ---------- Colonnes ----------
+    # Arrêts des voyages et des HLP dans une seule table
+    n = len(voyages)
+    codes_arrets, t_arrets = _coder(
+        [v.arret_debut for v in voyages] + [v.arret_fin for v in voyages]
+        + [h.arret_depart for h in hlps] + [h.arret_arrivee for h in hlps]
+    )
+    nh = len(hlps)
+
+    v_ligne, t_lignes = _coder([v.num_ligne for v in voyages])
+    v_num_voyage, t_num_voyages = _coder([v.num_voyage for v in voyages])
+    v_js_srv, t_js_srv = _coder([getattr(v, 'js_srv', '') for v in voyages])
+    v_couleur, t_couleurs = _coder([getattr(v, 'couleur', None) for v in voyages])
+    v_service_assigne, t_services_assignes = _coder([getattr(v, 'service_assigne', None) for v in voyages])
+
+    tableaux = {
+        'v_hdebut': np.fromiter((v.hdebut for v in voyages), dtype=np.int32, count=n),
+        'v_hfin': np.fromiter((v.hfin for v in voyages), dtype=np.int32, count=n),
+        'v_ligne': v_ligne,
+        'v_num_voyage': v_num_voyage,
+        'v_arret_debut': codes_arrets[:n],
+        'v_arret_fin': codes_arrets[n:2 * n],
+        'v_js_srv': v_js_srv,
+        'v_couleur': v_couleur,
+        'v_assigne': np.fromiter((bool(getattr(v, 'assigne', False)) for v in voyages), dtype=np.bool_, count=n),
+        'v_service_assigne': v_service_assigne,
+        's_pointeurs': np.asarray(pointeurs, dtype=np.int64),
+        's_elements': np.asarray(elements, dtype=np.int32),
+        'h_service': np.asarray(hlp_service, dtype=np.int32),
+        'h_debut': np.asarray([-1 if h.heure_debut is None else h.heure_debut for h in hlps], dtype=np.int32),
+        'h_duree': np.asarray([h.duree for h in hlps], dtype=np.int32),
+        'h_depart': codes_arrets[2 * n:2 * n + nh],
+        'h_arrivee': codes_arrets[2 * n + nh:],
+        'h_dans_voyages': np.asarray(hlp_dans_voyages, dtype=np.bool_),
+        't_arrets': t_arrets,
+        't_lignes': t_lignes,
+        't_num_voyages': t_num_voyages,
+        't_js_srv': t_js_srv,
+        't_couleurs': t_couleurs,
+        't_services_assignes': t_services_assignes,
+    }
+
+    entete = {
+        'services': services_meta,
+        'parametres': parametres or {},
+        'solution': None if solution is None else {
+            'strategies': solution.get('strategies'),
+            'nb_non_assigned': solution.get('nb_non_assigned'),
+        },
+    }
+    _ecrire(chemin, entete, tableaux)
+
+
+# ==================== LECTURE ====================
+
+class VoyagesScenario(Sequence):
+    """
+    Voyages d'un scénario : les objets voyage sont créés au premier accès
+    puis gardés, les colonnes restent projetées en mémoire.
+    """
+
+    def __init__(self, scenario):
+        self._scenario = scenario
+        self._objets = [None] * len(scenario.tableaux['v_hdebut'])
+        self._colonnes = None
+
+    def __len__(self):
+        return len(self._objets)
+
+    def _decoder_colonnes(self):
+        t = self._scenario.tableaux
+        arrets = t['t_arrets'].tolist()
+        self._colonnes = {
+            'hdebut': t['v_hdebut'].tolist(),
+            'hfin': t['v_hfin'].tolist(),
+            'ligne': _decoder(t['v_ligne'], t['t_lignes']),
+            'num_voyage': _decoder(t['v_num_voyage'], t['t_num_voyages']),
+            'arret_debut': [arrets[c] for c in t['v_arret_debut'].tolist()],
+            'arret_fin': [arrets[c] for c in t['v_arret_fin'].tolist()],
+            'js_srv': _decoder(t['v_js_srv'], t['t_js_srv']),
+            'couleur': _decoder(t['v_couleur'], t['t_couleurs']),
+            'assigne': t['v_assigne'].tolist(),
+            'service_assigne': _decoder(t['v_service_assigne'], t['t_services_assignes']),
+        }
+
+    def _creer(self, i):
+        if self._colonnes is None:
+            self._decoder_colonnes()
+        c = self._colonnes
+        voy = voyage.depuis_minutes(
+            c['ligne'][i], c['num_voyage'][i], c['arret_debut'][i], c['arret_fin'][i],
+            c['hdebut'][i], c['hfin'][i], c['js_srv'][i] or ''
+        )
+        if c['couleur'][i] is not None:
+            voy.couleur = c['couleur'][i]
+        voy.assigne = c['assigne'][i]
+        voy.service_assigne = c['service_assigne'][i]
+        return voy
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        voy = self._objets[index]
+        if voy is None:
+            voy = self._objets[index] = self._creer(index)
+        return voy
+
+
+class Scenario:
+    """
+    Scénario ouvert : `tableaux` contient les colonnes (memmap en lecture seule),
+    `entete` les métadonnées. voyages est créé à la demande, services() et
+    table() construisent des objets neufs à chaque appel.
+    """
+
+    def __init__(self, entete, tableaux):
+        self.entete = entete
+        self.tableaux = tableaux
+        self.parametres = entete.get('parametres', {})
+        self.voyages = VoyagesScenario(self)
+
+    @classmethod
+    def ouvrir(cls, chemin, mmap=True):
+        with open(chemin, 'rb') as f:
+            if f.read(len(MAGIQUE)) != MAGIQUE:
+                raise ValueError(f"Fichier scénario invalide: {chemin}")
+            longueur = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+            entete = json.loads(f.read(longueur).decode('utf-8'))
+
+        if entete.get('version') != VERSION:
+            raise ValueError(f"Version de scénario non supportée: {entete.get('version')}")
+
+        debut_donnees = _aligner(_TAILLE_PREFIXE + longueur)
+        if mmap:
+            contenu = np.memmap(chemin, dtype=np.uint8, mode='r')
+        else:
+            contenu = np.fromfile(chemin, dtype=np.uint8)
+
+        tableaux = {}
+        for nom, desc in entete['tableaux'].items():
+            dtype = np.dtype(desc['dtype'])
+            shape = tuple(desc['shape'])
+            debut = debut_donnees + desc['offset']
+            nb_octets = dtype.itemsize * int(np.prod(shape))
+            tableaux[nom] = contenu[debut:debut + nb_octets].view(dtype).reshape(shape)
+        return cls(entete, tableaux)
+
+    def __len__(self):
+        return len(self.voyages)
+
+    @property
+    def nb_services(self):
+        return len(self.entete['services'])
+
+    def indices_services(self):
+        """Pour chaque service, indices des voyages affectés (sans les HLP)"""
+        pointeurs = self.tableaux['s_pointeurs'].tolist()
+        elements = self.tableaux['s_elements']
+        return [[e for e in elements[a:b].tolist() if e >= 0]
+                for a, b in zip(pointeurs[:-1], pointeurs[1:])]
+
+    def _hlps(self):
+        t = self.tableaux
+        arrets = t['t_arrets'].tolist()
+        hlps = []
+        for debut, duree, depart, arrivee in zip(t['h_debut'].tolist(), t['h_duree'].tolist(),
+                                                 t['h_depart'].tolist(), t['h_arrivee'].tolist()):
+            h = hlp(arrets[depart], arrets[arrivee], duree, None if debut < 0 else debut)
+            if h.heure_debut is not None:
+                # Attributs posés par l'interface sur les HLP de la timeline
+                h.hdebut = h.heure_debut
+                h.hfin = h.heure_fin
+                h.couleur = '#95a5a6'
+            hlps.append(h)
+        return hlps
+
+    def services(self):
+        """Recrée les service_agent avec leurs voyages (partagés avec self.voyages) et HLP"""
+        hlps = self._hlps()
+        pointeurs = self.tableaux['s_pointeurs'].tolist()
+        elements = self.tableaux['s_elements'].tolist()
+
+        services = []
+        for num, meta in enumerate(self.entete['services']):
+            service = service_agent(num_service=meta['num_service'], type_service=meta['type_service'])
+            # Valeurs déjà en minutes de journée de service : pas de renormalisation
+            service.heure_debut = meta['heure_debut']
+            service.heure_fin = meta['heure_fin']
+            service.set_coupure(meta['heure_debut_coupure'], meta['heure_fin_coupure'])
+            service.pauses = [tuple(p) for p in meta['pauses']]
+            if meta.get('couleur') is not None:
+                service.couleur = meta['couleur']
+            if meta.get('petit_service'):
+                service.petit_service = True
+
+            for e in elements[pointeurs[num]:pointeurs[num + 1]]:
+                service.voyages.append(self.voyages[e] if e >= 0 else hlps[-1 - e])
+            services.append(service)
+
+        dans_voyages = self.tableaux['h_dans_voyages'].tolist()
+        for h, num, dans in zip(hlps, self.tableaux['h_service'].tolist(), dans_voyages):
+            if not dans:
+                services[num].ajouter_hlp(h)
+        return services
+
+    def services_data(self, services=None):
+        """Entrée des solvers : [(service, indices des voyages déjà affectés)]"""
+        if services is None:
+            services = self.services()
+        return list(zip(services, self.indices_services()))
+
+    def table(self):
+        """VoyageTable directement sur les colonnes, sans créer d'objets voyage"""
+        t = self.tableaux
+        return VoyageTable(
+            hdebut=t['v_hdebut'],
+            hfin=t['v_hfin'],
+            ligne=t['v_ligne'],
+            arret_debut=t['v_arret_debut'],
+            arret_fin=t['v_arret_fin'],
+            lignes=t['t_lignes'].tolist(),
+            arrets=t['t_arrets'].tolist(),
+            objets=self.voyages
+        )
+
+    def solution(self):
+        """Attribution appliquée au format des solvers (None si aucune n'a été enregistrée)"""
+        meta = self.entete.get('solution')
+        if meta is None:
+            return None
+        return {
+            'services': {
+                num: [{'index': i, 'voyage_obj': self.voyages[i], 'fixe': False} for i in indices]
+                for num, indices in enumerate(self.indices_services()) if indices
+            },
+            'strategies': meta.get('strategies'),
+            'nb_non_assigned': meta.get('nb_non_assigned'),
+        }
+
+
+def charger_scenario(chemin, mmap=True):
+    """Ouvre un scénario ; les colonnes sont projetées en mémoire par défaut"""
+    return Scenario.ouvrir(chemin, mmap=mmap)
@@ -1,8 +1,62 @@
 import logging
-logging.basicConfig(level=logging.DEBUG)
-
-def optimiser_services(voyages_list, services_list, max_solutions=6, pause_min=5, verbose=True):
 
+import numpy as np
+
+from communs.couverture_chemins import couverture_minimale
+from communs.graphe_succession import GrapheSuccession
+from communs.recherche_locale import RechercheLocale
+from communs.strategies_paralleles import SEUIL_PARALLELE, executer_strategies
+from table_voyages import VoyageTable
+
+TEMPS_AMELIORATION = 2.0  # Budget de la recherche locale, par solution (secondes)
+
+
+def _par_lignes_chargees(table):
+    """Voyages des lignes qui en ont le plus d'abord, puis par heure de début"""
+    _, inverse, effectifs = np.unique(table.ligne, return_inverse=True, return_counts=True)
+    return np.lexsort((table.hdebut, table.ligne, -effectifs[inverse]))
+
+
+# Chaque stratégie retourne l'ordre de parcours des voyages (indices de la table)
+STRATEGIES = [
+    ("Par heure de début", lambda t: np.argsort(t.hdebut, kind='stable')),
+    ("Par durée", lambda t: np.argsort(t.duree, kind='stable')),
+    ("Par heure de fin", lambda t: np.argsort(t.hfin, kind='stable')),
+    ("Par ligne puis heure", lambda t: np.lexsort((t.hdebut, t.ligne))),
+    ("Ordre inversé", lambda t: np.argsort(-t.hdebut, kind='stable')),
+    ("Nombre de voyages", _par_lignes_chargees)
+]
+
+
+def _executer_strategie(contexte, strat_idx):
+    """
+    Une stratégie dans un processus. Le contexte n'a que des tableaux : la table
+    sans objets, la matrice voyages x services (8 voyages par octet) et les
+    voyages fixés de chaque service ; les tests d'enchaînement sont
+    reconstruits ici depuis les colonnes.
+    """
+    table, bits_compatibles, fixes, pause_min, amelioration = contexte
+    compatibles = np.unpackbits(bits_compatibles, axis=0, count=len(table)).astype(bool)
+    strat_nom, strat_tri = STRATEGIES[strat_idx]
+    return _glouton(table, compatibles, fixes, strat_tri, strat_nom,
+                    GrapheSuccession.depuis_table(table, pause_min), verbose=False, **amelioration)
+
+
+def cle_solution(solution):
+    """Clé de déduplication : indices des voyages de chaque service"""
+    return tuple(tuple(v['index'] for v in voyages) for voyages in solution['services'].values())
+
+
+def optimiser_services(voyages_list, services_list, max_solutions=6, pause_min=5, verbose=True,
+                       parallele=True, max_workers=None, amelioration_locale=False,
+                       temps_amelioration=TEMPS_AMELIORATION, mode_amelioration='premier'):
+    """
+    Génère jusqu'à max_solutions solutions distinctes, une par stratégie de tri.
+    Les stratégies tournent en parallèle (un processus par cœur) quand le
+    réseau est assez grand ; le résultat est le même qu'en séquentiel.
+    amelioration_locale : recherche locale sur chaque solution gloutonne
+    (budget temps_amelioration secondes, mode 'premier' ou 'meilleur').
+    """
     if verbose:
         print(f"🔧 Début optimisation glouton (pause_min = {pause_min} min)")
         print(f"   Voyages: {len(voyages_list)}")
@@ -11,156 +65,203 @@ def optimiser_services(voyages_list, services_list, max_solutions=6, pause_min=5
     if not voyages_list or not services_list:
         return logging.error("voyages_list or services_list not valid")
 
-    solutions = []
+    # La table et la matrice des services sont construites une seule fois et
+    # partagées par toutes les stratégies (chaque processus refait ses tests
+    # d'enchaînement depuis les colonnes de la table)
+    table = VoyageTable.depuis_voyages(voyages_list)
 
-    strategies = [
-        ("Par heure de début", lambda v:v['voyage'].hdebut),
-        ("Par durée", lambda v:v['voyage'].hfin - v['voyage'].hdebut),
-        ("Par heure de fin", lambda v:v['voyage'].hfin),
-        ("Par ligne puis heure",lambda v: (v['voyage'].num_ligne,v['voyage'].hdebut)),
-        ("Ordre inversé", lambda v:-v['voyage'].hdebut),
-        ("Nombre de voyages", lambda v: len(v['voyages']))
-    ]
+    if verbose:
+        # Borne inférieure : aucune affectation ne fait mieux, quelles que soient les durées
+        nb_minimum, _ = couverture_minimale(GrapheSuccession.depuis_table(table, pause_min))
+        print(f"   Minimum théorique: {nb_minimum} services")
+        if nb_minimum > len(services_list):
+            print(f"   ⚠️ {len(services_list)} services < {nb_minimum} : des voyages resteront non assignés")
+
+    parallele = parallele and len(voyages_list) * len(services_list) >= SEUIL_PARALLELE
+    compatibles, fixes = preparer_services(table, services_list)
+    solutions = executer_strategies(
+        _executer_strategie,
+        (table.sans_objets(), np.packbits(compatibles, axis=0), fixes, pause_min,
+         {'amelioration_locale': amelioration_locale, 'temps_amelioration': temps_amelioration,
+          'mode_amelioration': mode_amelioration}),
+        [(strat_idx,) for strat_idx in range(len(STRATEGIES))],
+        max_solutions=max_solutions,
+        cle=cle_solution,
+        parallele=parallele,
+        max_workers=max_workers
+    )
+
+    # Les processus ne renvoient que des indices : on remet les objets voyage
+    for solution in solutions:
+        for voyages in solution['services'].values():
+            for v in voyages:
+                v['voyage_obj'] = table.objet(v['index'])
 
-    for strat_idx, (strat_nom, strat_tri) in enumerate(strategies[:max_solutions]):
         if verbose:
-            print(f"\n Génération solution {strat_idx + 1} ({strat_nom})")
-
-        solution =generer_solution_gloutonne (
-            voyages_list,
-            services_list,
-            strat_tri,
-            strat_nom,
-            pause_min
-        )
+            nb_assignes = sum(len(voyages) for voyages in solution['services'].values())
+            print(f" {solution['strategies']} : {nb_assignes}/{len(table)} assignés "
+                  f"({solution['nb_non_assigned']} non assigned)")
 
-        if solution:
-            solutions.append(solution)
     if verbose:
         print(f"\n{len(solutions)} solutions trouvée")
     return solutions
 
-def generer_solution_gloutonne(voyages_list, services_list, tri_func, nom_strategie, pause_min=5, verbose=True):
-
-    services_info = []
-    for idx, (service, indices_assignes) in enumerate(services_list):
-        services_info.append({
-            'idx': idx,
-            'debut': service.heure_debut,
-            'fin': service.heure_fin,
-            'voyages_assignes': list(indices_assignes),
-            'voyages':[]
-        })
-
-    voyages_avec_index = []
-    for idx, voy in enumerate(voyages_list):
-        voyages_avec_index.append({
-            'index': idx,
-            'voyage': voy,
-            'assignes': False
-        })
+def preparer_services(table, services_list):
+    """
+    Matrice voyages x services (fenêtre horaire et pauses, évaluées une fois
+    pour tous les voyages) et voyages fixés de chaque service.
+    """
+    compatibles = np.zeros((len(table), len(services_list)), dtype=bool)
+    for s, (service, _) in enumerate(services_list):
+        compatible = table.masque_fenetre(service.heure_debut, service.heure_fin)
+        if hasattr(service, 'masque_compatible'):
+            compatible &= service.masque_compatible(table.hdebut, table.hfin)
+        elif getattr(service, 'pauses', None):
+            compatible &= ~np.fromiter(
+                (service.est_dans_pause(d, f) for d, f in zip(table.hdebut.tolist(), table.hfin.tolist())),
+                dtype=bool, count=len(table)
+            )
+        compatibles[:, s] = compatible
+    return compatibles, [list(indices_assignes) for _, indices_assignes in services_list]
+
+
+def _ordre_strategie(table, tri_func, nom_strategie):
+    """
+    Ordre de parcours d'une stratégie : tri_func(table) doit retourner une
+    permutation des index de la table (ValueError sinon)
+    """
+    ordre = np.asarray(tri_func(table))
+    n_voyages = len(table)
+    if (ordre.shape != (n_voyages,) or (n_voyages and not np.issubdtype(ordre.dtype, np.integer))
+            or not np.array_equal(np.sort(ordre), np.arange(n_voyages))):
+        raise ValueError(f"Ordre de la stratégie '{nom_strategie}' invalide : "
+                         f"attendu une permutation des {n_voyages} index de la table")
+    return ordre
+
+
+def generer_solution_gloutonne(table, services_list, tri_func, nom_strategie, pause_min=5, verbose=True,
+                               graphe=None, amelioration_locale=False, temps_amelioration=TEMPS_AMELIORATION,
+                               mode_amelioration='premier'):
+
+    if not isinstance(table, VoyageTable):
+        table = VoyageTable.depuis_voyages(table)
+    if graphe is None or graphe.pause_min != pause_min or len(graphe) != len(table):
+        graphe = GrapheSuccession.depuis_table(table, pause_min)
+    compatibles, fixes = preparer_services(table, services_list)
+    return _glouton(table, compatibles, fixes, tri_func, nom_strategie, graphe, verbose,
+                    amelioration_locale, temps_amelioration, mode_amelioration)
+
+
+def _glouton(table, compatibles_services, fixes, tri_func, nom_strategie, graphe, verbose=True,
+             amelioration_locale=False, temps_amelioration=TEMPS_AMELIORATION, mode_amelioration='premier'):
+    """Glouton d'une stratégie sur la matrice de preparer_services"""
+    n_voyages = len(table)
+    hdebut = table.hdebut.tolist()
+    hfin = table.hfin.tolist()
+    compatibles = graphe.compatibles
+    peut_suivre = graphe.peut_suivre
+    continuite_geo = graphe.continuite_geo
+
+    services_info = [
+        {'idx': idx, 'compatible': compatibles_services[:, idx].tolist(), 'voyages_assignes': indices, 'voyages': []}
+        for idx, indices in enumerate(fixes)
+    ]
+
+    assignes = [False] * n_voyages
 
     for serv_info in services_info:
         for v_idx in serv_info['voyages_assignes']:
-            if v_idx < len(voyages_avec_index):
-                voy_info = voyages_avec_index[v_idx]
-                serv_info['voyages'].append({
-                    'index': v_idx,
-                    'voyage_obj': voy_info['voyage'],
-                    'fixe': True
-                })
-                voy_info['assignes'] = True
-
-    voyages_non_assignes = [v for v in voyages_avec_index if not v['assignes']]
-    try:
-        voyages_non_assignes.sort(key=tri_func)
-    except:
-        voyages_non_assignes.sort(key=lambda v: v['voyage'].hdebut)
+            if v_idx < n_voyages:
+                serv_info['voyages'].append(v_idx)
+                assignes[v_idx] = True
+
+    ordre = _ordre_strategie(table, tri_func, nom_strategie)
 
     nb_non_assignes = 0
-    for voy_info in voyages_non_assignes:
-        voy = voy_info['voyage']
-        v_idx = voy_info['index']
+    for v_idx in ordre.tolist():
+        if assignes[v_idx]:
+            continue
 
         meilleure_service = None
         meilleur_score = -1
 
         for serv_info in services_info:
-            if voy.hdebut < serv_info['debut'] or voy.hfin > serv_info['fin']:
+            if not serv_info['compatible'][v_idx]:
                 continue
-            service_original = services_list[serv_info['idx']][0]
-            if hasattr(service_original, 'pauses') and service_original.est_dans_pause(voy.hdebut, voy.hfin):
+
+            if not all(compatibles(v_idx, v_exist) for v_exist in serv_info['voyages']):
                 continue
 
-            compatible = True
-            for v_existant in serv_info['voyages']:
-                v_exist = v_existant['voyage_obj']
-
-                if not (voy.hfin + pause_min <= v_exist.hdebut or
-                        voy.hdebut >= v_exist.hfin + pause_min):
-                    compatible = False
-                    break
-
-                #calcul du score
-                score = 0
-
-                voyages_avant = [v for v in serv_info['voyages']
-                                 if v ['voyage_obj'].hfin + pause_min <= voy.hdebut]
-
-                if voyages_avant:
-                    dernier = max(voyages_avant, key=lambda v: v['voyage_obj'].hfin)
-                    try:
-                        if dernier['voyage_obj'].arret_fin_id() == voy.arret_debut_id():
-                            score += 100
-                    except:
-                        pass
-
-                    temps_attente = voy.hdebut - dernier['voyage_obj'].hfin
-                    score += max (0, 50 - temps_attente)
-                else:
-                    score += 10
-
-                voyages_apres = [ v for v in serv_info['voyages']
-                                  if voy.hfin + pause_min <=['voyage_obj'].hdebut]
-                if voyages_apres:
-                    prochain = min(voyages_apres, key=lambda v: v['voyage_obj'].hdebut)
-                    try:
-                        if voy.arret_fin_id() == prochain['voyage_obj'].arret_debut_id():
-                            score += 100
-                    except:
-                        pass
-
-                score -= len(serv_info['voyages']) * 5
-
-                if score > meilleur_score:
-                    meilleur_score = score
-                    meilleure_service = serv_info
-
-            if meilleure_service:
-                meilleure_service['voyages'].append({
-                    'index': v_idx,
-                    'voyage_obj': voy,
-                    'fixe': False
-                })
-                voy_info['assignes'] = True
+            #calcul du score
+            score = 0
+
+            voyages_avant = [v for v in serv_info['voyages'] if peut_suivre(v, v_idx)]
 
+            if voyages_avant:
+                dernier = max(voyages_avant, key=lambda v: hfin[v])
+                if continuite_geo(dernier, v_idx):
+                    score += 100
+
+                temps_attente = hdebut[v_idx] - hfin[dernier]
+                score += max (0, 50 - temps_attente)
             else:
-                nb_non_assignes += 1
+                score += 10
+
+            voyages_apres = [v for v in serv_info['voyages'] if peut_suivre(v_idx, v)]
+            if voyages_apres:
+                prochain = min(voyages_apres, key=lambda v: hdebut[v])
+                if continuite_geo(v_idx, prochain):
+                    score += 100
+
+            score -= len(serv_info['voyages']) * 5
+
+            if score > meilleur_score:
+                meilleur_score = score
+                meilleure_service = serv_info
+
+        if meilleure_service:
+            meilleure_service['voyages'].append(v_idx)
+            assignes[v_idx] = True
+        else:
+            nb_non_assignes += 1
+
+    stats_amelioration = None
+    if amelioration_locale:
+        # Relocations, échanges, fins de service et chaînes d'éjection ; les voyages fixés restent
+        fixes = {v for serv_info in services_info for v in serv_info['voyages_assignes'] if v < n_voyages}
+        recherche = RechercheLocale.depuis_graphe(
+            graphe, lambda s, i: services_info[s]['compatible'][i], fixes
+        )
+        services, libres = recherche.ameliorer(
+            [serv_info['voyages'] for serv_info in services_info], temps_amelioration, mode_amelioration
+        )
+        for serv_info, voyages in zip(services_info, services):
+            serv_info['voyages'] = voyages
+        nb_non_assignes = len(libres)
+        stats_amelioration = recherche.stats
+        if verbose:
+            print(f" Amélioration locale : score {stats_amelioration['score_initial']} → "
+                  f"{stats_amelioration['score_final']} ({stats_amelioration['temps']:.2f}s)")
 
-        for serv_info in services_info:
-            serv_info['voyages'].sort(key=lambda v: v['voyage_obj'].hdebut)
+    solution = {
+        "services": {},
+        "strategies": nom_strategie,
+        "nb_non_assigned": nb_non_assignes
+    }
 
-        solution = {
-            "services": {},
-            "strategies": nom_strategie,
-            "nb_non_assigned": nb_non_assignes
-        }
+    for serv_info in services_info:
+        fixes = set(serv_info['voyages_assignes'])
+        serv_info['voyages'].sort(key=lambda v: hdebut[v])
+        solution['services'][serv_info['idx']] = [
+            {'index': v, 'voyage_obj': table.objet(v), 'fixe': v in fixes}
+            for v in serv_info['voyages']
+        ]
 
-        for serv_info in services_info:
-            solution['services'][serv_info['idx']] = serv_info['voyages']
+    if stats_amelioration is not None:
+        solution['amelioration'] = stats_amelioration
 
-        total_assignes = sum(len(s['voyages']) for s in services_info)
-        if verbose:
-            print(f" Assignés = {total_assignes}/{len(services_info)} ({nb_non_assignes} non assigned)")
+    total_assignes = sum(len(s['voyages']) for s in services_info)
+    if verbose:
+        print(f" Assignés = {total_assignes}/{n_voyages} ({nb_non_assignes} non assigned)")
 
-        return solution
+    return solution
@@ -1,38 +1,34 @@
 # solver_bus.py
-from objet import voyage, service_agent, proposition
+from bisect import bisect_left, bisect_right
+
+from objet import voyage, service_fige, proposition_figee
+from communs.strategies_paralleles import SEUIL_PARALLELE, executer_strategies
+from table_voyages import VoyageTable
 
 
 # ── Fonctions du solver (inchangées) ─────────────────────────────────────────
 
 def voyage_compatible(service, nouveau_voyage, min_pause, max_pause):
-    for v in service.get_voyages():
-        if not (nouveau_voyage.hfin <= v.hdebut or nouveau_voyage.hdebut >= v.hfin):
-            return False
-    voyages_tries = sorted(service.get_voyages() + [nouveau_voyage], key=lambda v: v.hdebut)
-    idx = voyages_tries.index(nouveau_voyage)
-    if idx > 0:
-        pause = nouveau_voyage.hdebut - voyages_tries[idx - 1].hfin
-        if not (min_pause <= pause <= max_pause):
-            return False
-    if idx < len(voyages_tries) - 1:
-        pause = voyages_tries[idx + 1].hdebut - nouveau_voyage.hfin
-        if not (min_pause <= pause <= max_pause):
-            return False
-    return True
+    return service.peut_ajouter(nouveau_voyage, min_pause, max_pause)
+
+
+def duree_simulee(service, *nouveaux_voyages):
+    voyages_service = service.get_voyages()
+    debut = min(v.hdebut for v in nouveaux_voyages)
+    fin = max(v.hfin for v in nouveaux_voyages)
+    if voyages_service:
+        debut = min(debut, voyages_service.debut)
+        fin = max(fin, voyages_service.fin)
+    return fin - debut
 
 
 def creer_service(num, voy, petit=False):
     type_s = "matin" if voy.hdebut <= 600 else "après-midi"
-    s = service_agent(num_service=num, type_service=type_s)
-    s.petit_service = petit
-    return s
+    return service_fige(num_service=num, type_service=type_s, petit_service=petit)
 
 
 def peut_ajouter_lignes(service, voy, voy2, nb_max_lignes):
-    lignes = set(v.num_ligne for v in service.get_voyages())
-    lignes.add(voy.num_ligne)
-    lignes.add(voy2.num_ligne)
-    return len(lignes) <= nb_max_lignes
+    return service.nb_lignes_avec(voy, voy2) <= nb_max_lignes
 
 
 def verifier_duree_service(service, min_duree, max_duree):
@@ -61,144 +57,406 @@ def petits_services_valides(propo, max_duree_petit=4 * 60):
     return True
 
 
-def essayer_proposition(voyages, min_pause, max_pause, nb_max_lignes, max_services, num_proposition):
-    for v in voyages:
-        v.assigned = False
+def indexer_departs(voyages):
+    """
+    Index des voyages par arrêt de départ : code -> (heures de début triées,
+    indices des voyages dans le même ordre). Ne dépend ni des pauses ni de
+    l'état des essais : construit une fois pour tous les essais.
+    """
+    par_arret = {}
+    for j, v in enumerate(voyages):
+        par_arret.setdefault(v.arret_debut_code, []).append((v.hdebut, j))
+
+    index = {}
+    for code, departs in par_arret.items():
+        departs.sort()
+        index[code] = ([h for h, _ in departs], [j for _, j in departs])
+    return index
+
+
+def successeurs_possibles(index, voy, i, min_pause, max_pause):
+    """
+    Voyages j > i qui partent de l'arrêt d'arrivée de voy avec une pause dans
+    [min_pause, max_pause], par index croissant (même ordre que la double boucle).
+    """
+    departs = index.get(voy.arret_fin_code)
+    if departs is None:
+        return []
+    debuts, indices = departs
+    debut = bisect_left(debuts, voy.hfin + max(min_pause, 0))
+    fin = bisect_right(debuts, voy.hfin + max_pause)
+    return sorted(j for j in indices[debut:fin] if j > i)
+
+
+def bornes_service(service):
+    """(petit_service, début, fin) d'un service ; début et fin None s'il est vide"""
+    voyages_service = service.get_voyages()
+    return service.petit_service, voyages_service.debut, voyages_service.fin
+
 
-    propo = proposition(num_proposition=num_proposition)
-    service_cible = creer_service(1, voyages[0])
-    propo.ajout_service(service_cible)
+def essayer_proposition(voyages, min_pause, max_pause, nb_max_lignes, max_services, num_proposition,
+                        index_departs=None, depart=None):
+    """
+    Construit une proposition_figee. Les voyages d'entrée ne sont pas modifiés :
+    l'état « assigné » est local à cet essai.
+    index_departs : indexer_departs(voyages), à passer quand on enchaîne les essais.
+    depart        : proposition d'un essai plus strict (départ à chaud) ; ses services
+                    sont gardés et seuls les voyages qu'elle n'assigne pas sont placés.
+    """
+    if index_departs is None:
+        index_departs = indexer_departs(voyages)
+
+    if depart is None:
+        assignes = [False] * len(voyages)
+        propo = proposition_figee(num_proposition=num_proposition)
+        propo = propo.avec_service(creer_service(1, voyages[0]))
+    else:
+        # Des contraintes plus strictes : les services de départ restent valides
+        ids = {id(v) for s in depart.service for v in s.get_voyages()}
+        assignes = [id(v) in ids for v in voyages]
+        propo = depart.avec_num(num_proposition)
+    # Bornes de chaque service, tenues à jour : la durée simulée se teste sans appel
+    bornes = [bornes_service(s) for s in propo.service]
 
     min_duree = 6 * 60
     max_duree = 8 * 60 + 30
 
-    for i in range(len(voyages)):
-        for j in range(i + 1, len(voyages)):
-            voy = voyages[i]
+    for i, voy in enumerate(voyages):
+        if assignes[i]:
+            continue
+
+        # Seuls les voyages qui partent de l'arrivée de voy dans la fenêtre de pause
+        for j in successeurs_possibles(index_departs, voy, i, min_pause, max_pause):
+            if assignes[j]:
+                continue
             voy2 = voyages[j]
-            pause_entre = voy2.hdebut - voy.hfin
-
-            if (voy.hdebut <= voy2.hfin
-                    and voy.hfin <= voy2.hdebut
-                    and voy.arret_fin == voy2.arret_debut
-                    and not voy.assigned
-                    and not voy2.assigned
-                    and min_pause <= pause_entre <= max_pause):
-
-                service_cible = None
-                for s in propo.service:
-                    if s.petit_service:
-                        continue
-                    tous_voyages = s.get_voyages() + [voy, voy2]
-                    debut_simule = min(v.hdebut for v in tous_voyages)
-                    fin_simulee = max(v.hfin for v in tous_voyages)
-                    duree_simulee = fin_simulee - debut_simule
-                    if (voyage_compatible(s, voy, min_pause, max_pause)
-                            and voyage_compatible(s, voy2, min_pause, max_pause)
-                            and peut_ajouter_lignes(s, voy, voy2, nb_max_lignes)
-                            and min_duree <= duree_simulee <= max_duree):
-                        service_cible = s
-                        break
-
-                if service_cible is None:
-                    if len(propo.service) >= max_services:
-                        continue
-                    duree_paire = voy2.hfin - voy.hdebut
-                    if not (min_duree <= duree_paire <= max_duree):
-                        continue
-                    service_cible = creer_service(len(propo.service) + 1, voy, petit=False)
-                    propo.ajout_service(service_cible)
-
-                if service_cible is None:
+
+            # voy2 part après la fin de voy : la paire couvre voy.hdebut -> voy2.hfin
+            idx_cible = None
+            for idx, (petit, debut, fin) in enumerate(bornes):
+                if petit:
+                    continue
+                duree = (voy2.hfin if fin is None else max(fin, voy2.hfin)) - \
+                        (voy.hdebut if debut is None else min(debut, voy.hdebut))
+                if not (min_duree <= duree <= max_duree):
+                    continue
+                s = propo.service[idx]
+                if (voyage_compatible(s, voy, min_pause, max_pause)
+                        and voyage_compatible(s, voy2, min_pause, max_pause)
+                        and peut_ajouter_lignes(s, voy, voy2, nb_max_lignes)):
+                    idx_cible = idx
                     break
 
-                service_cible.ajouter_voyage(voy)
-                service_cible.ajouter_voyage(voy2)
-                voy.assigned = True
-                voy2.assigned = True
-                break
+            if idx_cible is None:
+                if len(propo.service) >= max_services:
+                    continue
+                duree_paire = voy2.hfin - voy.hdebut
+                if not (min_duree <= duree_paire <= max_duree):
+                    continue
+                idx_cible = len(propo.service)
+                propo = propo.avec_service(creer_service(idx_cible + 1, voy, petit=False))
+                bornes.append(None)
+
+            propo = propo.avec_voyages(idx_cible, voy, voy2)
+            bornes[idx_cible] = bornes_service(propo.service[idx_cible])
+            assignes[i] = True
+            assignes[j] = True
+            break
 
     max_duree_petit = 4 * 60
-    for voy in [v for v in voyages if not v.assigned]:
-        service_cible = None
-        for s in propo.service:
-            if not s.petit_service:
+    for i, voy in enumerate(voyages):
+        if assignes[i]:
+            continue
+        idx_cible = None
+        for idx, (petit, debut, fin) in enumerate(bornes):
+            if not petit:
                 continue
-            tous_voyages = s.get_voyages() + [voy]
-            debut_simule = min(v.hdebut for v in tous_voyages)
-            fin_simulee = max(v.hfin for v in tous_voyages)
-            duree_simulee = fin_simulee - debut_simule
+            duree = (voy.hfin if fin is None else max(fin, voy.hfin)) - \
+                    (voy.hdebut if debut is None else min(debut, voy.hdebut))
+            if duree > max_duree_petit:
+                continue
+            s = propo.service[idx]
             if (voyage_compatible(s, voy, min_pause, max_pause)
-                    and peut_ajouter_lignes(s, voy, voy, nb_max_lignes)
-                    and duree_simulee <= max_duree_petit):
-                service_cible = s
+                    and peut_ajouter_lignes(s, voy, voy, nb_max_lignes)):
+                idx_cible = idx
                 break
-        if service_cible is None:
+        if idx_cible is None:
             if len(propo.service) >= max_services:
                 continue
-            service_cible = creer_service(len(propo.service) + 1, voy, petit=True)
-            propo.ajout_service(service_cible)
-        service_cible.ajouter_voyage(voy)
-        voy.assigned = True
+            idx_cible = len(propo.service)
+            propo = propo.avec_service(creer_service(idx_cible + 1, voy, petit=True))
+            bornes.append(None)
+        propo = propo.avec_voyages(idx_cible, voy)
+        bornes[idx_cible] = bornes_service(propo.service[idx_cible])
+        assignes[i] = True
 
     return propo
 
 
-# ── Fonction appelée par l'interface ─────────────────────────────────────────
+# ── Relaxation adaptative ────────────────────────────────────────────────────
+#
+# Un essai ne dépend que de (min_pause, max_pause, nb_max_lignes, max_services) :
+# la fenêtre de durée ne sert qu'à le valider. Les paliers de relaxation sont
+# ordonnés du plus strict au plus souple ; on cherche par dichotomie le premier
+# palier valide, puis on essaie les relaxations voisines (en parallèle si le
+# réseau est assez grand). Chaque essai part à chaud de l'essai plus strict le
+# plus proche, et les essais sont mis en cache par tuple de paramètres.
 
-def optimiser_services(voyages_list, services_data, max_solutions=5, pause_min=15):
+CIBLE_DUREE = 7 * 60 + 15
+PAS_VARIATION = 15  # élargissement de la fenêtre de durée par palier
+
+
+def paliers_relaxation(min_pause, max_pause=60, nb_max_lignes=1, max_services=10):
     """
-    Appelée par MainWindow.optimiser_services()
-    Retourne une liste de solutions au format attendu par l'interface.
+    Paramètres (min_pause, max_pause, nb_max_lignes, max_services) de chaque palier :
+    on baisse min_pause, puis on monte max_pause, nb_max_lignes et max_services.
+    Chaque palier est plus souple que le précédent sur tous les paramètres.
+    """
+    paliers = [(min_pause, max_pause, nb_max_lignes, max_services)]
+    while True:
+        if min_pause > 0:
+            min_pause = max(0, min_pause - 5)
+        elif max_pause < 120:
+            max_pause += 15
+        elif nb_max_lignes < 4:
+            nb_max_lignes += 1
+        elif max_services < 15:
+            max_services += 1
+        else:
+            return paliers
+        paliers.append((min_pause, max_pause, nb_max_lignes, max_services))
+
+
+def relaxations_voisines(params):
+    """Un seul paramètre relâché d'un cran (mêmes pas et bornes que les paliers)"""
+    min_pause, max_pause, nb_max_lignes, max_services = params
+    voisines = []
+    if min_pause > 0:
+        voisines.append((max(0, min_pause - 5), max_pause, nb_max_lignes, max_services))
+    if max_pause < 120:
+        voisines.append((min_pause, max_pause + 15, nb_max_lignes, max_services))
+    if nb_max_lignes < 4:
+        voisines.append((min_pause, max_pause, nb_max_lignes + 1, max_services))
+    if max_services < 15:
+        voisines.append((min_pause, max_pause, nb_max_lignes, max_services + 1))
+    return voisines
+
+
+def fenetre_duree(num_palier):
+    """Fenêtre de durée des services au palier donné (élargie de 15 min par palier)"""
+    variation = num_palier * PAS_VARIATION
+    return max(360, CIBLE_DUREE - variation), min(510, CIBLE_DUREE + variation)
+
+
+def proposition_valide(propo, nb_voyages, min_duree, max_duree):
+    """Tous les voyages assignés et toutes les durées de service respectées"""
+    return (propo.nb_voyages == nb_voyages
+            and tous_services_duree_valide(propo, min_duree, max_duree)
+            and petits_services_valides(propo))
+
+
+def decrire_relaxation(params, initiaux, fenetre):
+    """Texte court : paramètres relâchés par rapport aux paramètres initiaux"""
+    min_pause, max_pause, nb_max_lignes, max_services = params
+    parties = []
+    if min_pause != initiaux[0]:
+        parties.append(f"pause min {min_pause} min")
+    if max_pause != initiaux[1]:
+        parties.append(f"pause max {max_pause} min")
+    if nb_max_lignes != initiaux[2]:
+        parties.append(f"{nb_max_lignes} lignes")
+    if max_services != initiaux[3]:
+        parties.append(f"{max_services} services")
+    if fenetre != (CIBLE_DUREE, CIBLE_DUREE):
+        parties.append(f"durée {fenetre[0] // 60}h{fenetre[0] % 60:02d}-{fenetre[1] // 60}h{fenetre[1] % 60:02d}")
+    return ", ".join(parties) if parties else "sans relaxation"
+
+
+def etat_proposition(propo, table):
+    """Proposition en indices de table (transmissible à un autre processus)"""
+    return tuple((s.num_service, s.type_service, s.petit_service,
+                  tuple(table.index_de(v) for v in s.get_voyages()))
+                 for s in propo.service)
+
+
+def proposition_depuis_etat(etat, voyages, num_proposition=None):
+    return proposition_figee(num_proposition, (
+        service_fige(num, type_s, petit, tuple(voyages[i] for i in indices))
+        for num, type_s, petit, indices in etat
+    ))
+
+
+def cle_etat(etat):
+    """Clé de déduplication : voyages de chaque service non vide, sans la numérotation"""
+    return tuple(sorted(indices for _, _, _, indices in etat if indices))
+
+
+def _essai_relaxe(contexte, params, fenetre, a_chaud):
+    """Un essai dans un processus : (params, fenetre, a_chaud, etat) s'il est valide"""
+    table, index_departs, etat_depart = contexte
+    voyages_list = table.objets
+    depart = proposition_depuis_etat(etat_depart, voyages_list) if a_chaud else None
+    propo = essayer_proposition(voyages_list, *params, None, index_departs, depart)
+    if not proposition_valide(propo, len(voyages_list), *fenetre):
+        return None
+    return params, fenetre, a_chaud, etat_proposition(propo, table)
+
+
+class RelaxationAdaptative:
     """
-    min_pause = pause_min
-    max_pause = 60
-    nb_max_lignes = 1
-    max_services = 10
-    cible_duree = 7 * 60 + 15
-    variation = 0
+    Recherche des paliers de relaxation pour optimiser_services.
 
-    propositions_trouvees = []
-    num_proposition = 1
-    max_iterations = 200  # garde-fou contre boucle infinie
+    essais           : cache (params, params du départ à chaud ou None) -> proposition
+    retenus          : proposition gardée pour chaque palier évalué
+    nb_constructions : essais construits dans ce processus
+    """
 
-    while len(propositions_trouvees) < max_solutions and max_iterations > 0:
-        max_iterations -= 1
+    def __init__(self, voyages_list, pause_min=15, table=None):
+        self.voyages_list = voyages_list
+        self.table = table if table is not None else VoyageTable.depuis_voyages(voyages_list)
+        self.index_departs = indexer_departs(voyages_list)
+        self.paliers = paliers_relaxation(pause_min)
+        self.essais = {}
+        self.retenus = {}
+        self.nb_constructions = 0
+
+    def construire(self, params, params_depart=None):
+        cle = (params, params_depart)
+        propo = self.essais.get(cle)
+        if propo is None:
+            depart = self.retenus[params_depart] if params_depart is not None else None
+            propo = essayer_proposition(self.voyages_list, *params, None, self.index_departs, depart)
+            self.essais[cle] = propo
+            self.nb_constructions += 1
+        return propo
+
+    def depart(self, num_palier):
+        """Palier déjà évalué le plus souple parmi les paliers plus stricts (None si aucun)"""
+        for params in reversed(self.paliers[:num_palier]):
+            if params in self.retenus:
+                return params
+        return None
+
+    def valide(self, num_palier):
+        """
+        Évalue un palier : à chaud depuis le palier évalué juste en dessous, puis à
+        froid si le départ à chaud échoue (il peut bloquer des placements).
+        """
+        params = self.paliers[num_palier]
+        fenetre = fenetre_duree(num_palier)
+        nb_voyages = len(self.voyages_list)
+        params_depart = self.depart(num_palier)
+
+        propo = self.construire(params, params_depart)
+        valide = proposition_valide(propo, nb_voyages, *fenetre)
+        if not valide and params_depart is not None:
+            propo = self.construire(params)
+            valide = proposition_valide(propo, nb_voyages, *fenetre)
+        self.retenus[params] = propo
+        return valide
+
+    def premier_palier_valide(self):
+        """Dichotomie sur les paliers ; None si même le plus souple échoue"""
+        bas, haut = 0, len(self.paliers) - 1
+        if not self.valide(haut):
+            return None
+        while bas < haut:
+            milieu = (bas + haut) // 2
+            if self.valide(milieu):
+                haut = milieu
+            else:
+                bas = milieu + 1
+        return bas
+
+    def solutions(self, max_solutions=5, parallele=True, max_workers=None):
+        """
+        Jusqu'à max_solutions propositions distinctes, de la moins relâchée à la plus
+        relâchée : [(proposition, params, fenetre, params du départ à chaud ou None)].
+        """
+        num_palier = self.premier_palier_valide()
+        if num_palier is None or max_solutions <= 0:
+            return []
+
+        params = self.paliers[num_palier]
+        fenetre = fenetre_duree(num_palier)
+        propo = self.retenus[params]
+        deja_vus = {cle_etat(etat_proposition(propo, self.table))}
+        retenues = [(propo, params, fenetre, None)]
+
+        # Candidats indépendants : paliers suivants puis relaxations d'un seul paramètre,
+        # chacun à chaud depuis le palier évalué sous le palier retenu, puis à froid
+        params_depart = self.depart(num_palier)
+        candidats = [(self.paliers[suivant], fenetre_duree(suivant))
+                     for suivant in range(num_palier + 1, len(self.paliers))]
+        candidats += [(voisine, fenetre) for voisine in relaxations_voisines(params)
+                      if voisine not in self.paliers]
+        variantes = (params_depart, None) if params_depart is not None else (None,)
+
+        # Les essais déjà construits (dichotomie) ne sont pas refaits
+        rangs = {}
+        a_construire = []
+        for params_tache, fenetre_tache in candidats:
+            for depart_tache in variantes:
+                rangs[params_tache, depart_tache] = len(rangs)
+                deja = self.essais.get((params_tache, depart_tache))
+                if deja is None:
+                    a_construire.append((params_tache, fenetre_tache, depart_tache is not None))
+                elif proposition_valide(deja, len(self.voyages_list), *fenetre_tache):
+                    cle = cle_etat(etat_proposition(deja, self.table))
+                    if cle not in deja_vus and len(retenues) < max_solutions:
+                        deja_vus.add(cle)
+                        retenues.append((deja, params_tache, fenetre_tache, depart_tache))
+
+        parallele = parallele and len(self.voyages_list) * params[3] >= SEUIL_PARALLELE
+        etat_depart = (etat_proposition(self.retenus[params_depart], self.table)
+                       if params_depart is not None else None)
+        resultats = executer_strategies(
+            _essai_relaxe,
+            (self.table, self.index_departs, etat_depart),
+            a_construire,
+            max_solutions=max_solutions - len(retenues),
+            cle=lambda resultat: cle_etat(resultat[3]),
+            deja_vus=deja_vus,
+            parallele=parallele,
+            max_workers=max_workers
+        )
+        for params_tache, fenetre_tache, a_chaud, etat_tache in resultats:
+            depart_tache = params_depart if a_chaud else None
+            propo_tache = proposition_depuis_etat(etat_tache, self.voyages_list)
+            self.essais[params_tache, depart_tache] = propo_tache
+            retenues.append((propo_tache, params_tache, fenetre_tache, depart_tache))
 
-        min_duree_service = max(360, cible_duree - variation)
-        max_duree_service = min(510, cible_duree + variation)
+        # Même ordre que les candidats, que l'essai vienne du cache ou d'un processus
+        retenues[1:] = sorted(retenues[1:], key=lambda r: rangs[r[1], r[3]])
+        return retenues
 
-        propo = essayer_proposition(
-            voyages_list, min_pause, max_pause,
-            nb_max_lignes, max_services, num_proposition
-        )
 
-        voyages_non_assignes = [v for v in voyages_list if not v.assigned]
+# ── Fonction appelée par l'interface ─────────────────────────────────────────
 
-        if (not voyages_non_assignes
-                and tous_services_duree_valide(propo, min_duree_service, max_duree_service)
-                and petits_services_valides(propo)):
-            propositions_trouvees.append(propo)
-            num_proposition += 1
-            variation += 15
-        else:
-            variation += 15
-            if min_pause > 0:
-                min_pause = max(0, min_pause - 5)
-            elif max_pause < 120:
-                max_pause += 15
-            elif nb_max_lignes < 4:
-                nb_max_lignes += 1
-            elif max_services < 15:
-                max_services += 1
-            else:
-                break
+def optimiser_services(voyages_list, services_data, max_solutions=5, pause_min=15,
+                       parallele=True, max_workers=None):
+    """
+    Appelée par MainWindow.optimiser_services()
+    Retourne une liste de solutions au format attendu par l'interface.
+    Chaque solution indique la relaxation qui l'a produite (clé "relaxation").
+    """
+    if not voyages_list:
+        return []
+
+    table = VoyageTable.depuis_voyages(voyages_list)
+    relaxation = RelaxationAdaptative(voyages_list, pause_min, table)
+    retenues = relaxation.solutions(max_solutions, parallele, max_workers)
+    initiaux = relaxation.paliers[0]
+
+    propositions_trouvees = []
+    for num, (propo, params, fenetre, params_depart) in enumerate(retenues, start=1):
+        propositions_trouvees.append((propo.avec_num(num), params, fenetre, params_depart))
 
     # ── Convertir au format attendu par l'interface ───────────────────────────
     solutions = []
-    for propo in propositions_trouvees:
+    for propo, params, fenetre, params_depart in propositions_trouvees:
         services_dict = {}
-        nb_non_assignes = len([v for v in voyages_list if not getattr(v, 'assigned', False)])
+        nb_non_assignes = len(propo.non_assignes(voyages_list))
 
         for service_idx, s in enumerate(propo.service):
             if not s.get_voyages():
@@ -206,10 +464,7 @@ def optimiser_services(voyages_list, services_data, max_solutions=5, pause_min=1
 
             voyages_in_service = []
             for voy in s.get_voyages():
-                try:
-                    voy_idx = voyages_list.index(voy)
-                except ValueError:
-                    voy_idx = -1
+                voy_idx = table.index_de(voy)
                 voyages_in_service.append({
                     "voyage_obj": voy,
                     "fixe": False,
@@ -218,10 +473,12 @@ def optimiser_services(voyages_list, services_data, max_solutions=5, pause_min=1
             services_dict[service_idx] = voyages_in_service
 
         solutions.append({
-            "strategie": f"Proposition {propo.num_proposition}",
+            "strategie": f"Proposition {propo.num_proposition} ({decrire_relaxation(params, initiaux, fenetre)})",
             "nb_non_assignes": nb_non_assignes,
             "services": services_dict,
-            "_propo": propo  # référence brute si besoin
+            "relaxation": dict(zip(("min_pause", "max_pause", "nb_max_lignes", "max_services"), params),
+                               min_duree=fenetre[0], max_duree=fenetre[1], depart_a_chaud=params_depart),
+            "_propo": propo  # instantané (proposition_figee), .vers_proposition() pour une copie modifiable
         })
 
     return solutions
\ No newline at end of file
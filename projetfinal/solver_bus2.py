@@ -133,7 +133,7 @@ def generer_solution_gloutonne(voyages_list, services_list, tri_func, nom_strate
             if voyages_avant:
                 dernier = max(voyages_avant, key=lambda v: v['voyage_obj'].hfin)
                 try:
-                    if dernier['voyage_obj'].arret_fin_id() == voy.arret_debut_id():
+                    if dernier['voyage_obj'].continuite_geo(voy):
                         score += 100  # Bonus continuité
                 except:
                     pass
@@ -151,7 +151,7 @@ def generer_solution_gloutonne(voyages_list, services_list, tri_func, nom_strate
             if voyages_apres:
                 prochain = min(voyages_apres, key=lambda v: v['voyage_obj'].hdebut)
                 try:
-                    if voy.arret_fin_id() == prochain['voyage_obj'].arret_debut_id():
+                    if voy.continuite_geo(prochain['voyage_obj']):
                         score += 100  # Bonus continuité
                 except:
                     pass
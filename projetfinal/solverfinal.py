@@ -1,9 +1,903 @@
+"""
+Solver CP-SAT : affectation des voyages aux services
+Fichier: solverfinal.py
+
+resoudre_cpsat(voyages, services, options) construit le modèle à l'appel et
+retourne les solutions au format des dialogues PyQt (comme solver_bus).
+
+Un service est une chaîne de voyages : y[v, w] = 1 si w suit directement v
+dans un même service. Les arcs y sont ceux du graphe de succession (pause et
+continuité géo respectées) entre deux voyages qu'un même service peut
+recevoir : pas de variable par triplet (v, w, service). Chaque tranche de
+travail d'un service (toute sa plage, ou avant et après la coupure d'un
+service coupé) a au plus un début de chaîne, donc ses voyages se suivent sans
+chevauchement ; aucune chaîne ne traverse une coupure.
+Les arcs ne vont pas au-delà de l'attente maximum : attente_max si elle est
+donnée, sinon la plus longue tranche de travail des services (deux voyages
+d'une même tranche ne sont jamais plus éloignés). Aucune succession possible
+n'est perdue et les arcs restent bornés par les plages des services ; une
+attente_max plus courte (180 minutes par exemple) réduit encore le modèle.
+
+Formulation 'intervalles' : chaque couple (voyage, service) possible a un
+intervalle optionnel [début, fin + pause_min), avec un AddNoOverlap par
+service. Les plages horaires sont dans le domaine des variables (pas de x[v, s]
+hors plage), sans contrainte de plus. Les chaînes ne restent que pour ce que
+NoOverlap ne voit pas : continuité géo et attente maximum. Le modèle n'est
+donc plus petit que sans geo et sans attente_max.
+comparer_formulations() résout la même instance avec les deux modèles.
+
+Services interchangeables (mêmes voyages possibles, aucun voyage
+pré-assigné) : échanger leurs voyages donne le même plan. Avec 'symetries',
+les services d'une même classe sont ordonnés par l'index de leur premier
+voyage (les services vides en dernier) : une seule numérotation par plan,
+soit jusqu'à k! fois moins de branches pour une classe de k services.
+
+Résolution : limite de temps, un worker par cœur et, avec 'indices', la
+solution gloutonne comme point de départ (AddHint). Le mode 'diverses'
+enchaîne les résolutions en interdisant chaque plan trouvé (coupe no-good)
+au lieu d'énumérer toutes les solutions, ce qui désactiverait le presolve
+et le parallélisme.
+
+RechercheContinue résout dans un thread et dépose chaque affectation trouvée
+(un vecteur d'entiers) dans une file que l'interface lit pendant la
+recherche ; les dictionnaires de solution sont construits à l'affichage.
+
+Avec taille_bloc, le problème est découpé en composantes résolues en
+parallèle, puis en blocs de temps successifs dont chacun prolonge les
+chaînes du précédent : voir decomposition.py.
+
+Exécuté directement (python solverfinal.py) : exemple et affichage Tkinter.
+"""
+
+import os
+import queue
+import threading
+import time
+from bisect import bisect_right
+
+import numpy as np
 from ortools.sat.python import cp_model
-from objet import service_agent, voyage, proposition
 
-# ==================== DONNÉES ====================
+from communs.couverture_chemins import couverture_minimale
+from communs.empreintes import NON_ASSIGNE, canoniser, classes_services, empreinte
+from communs.graphe_succession import GEO, TEMPS, GrapheSuccession
+from objet import service_agent, voyage
+from table_voyages import VoyageTable
+
+OPTIONS_DEFAUT = {
+    'pause_min': 5,          # Minutes de pause minimum entre deux voyages
+    'geo': True,             # Continuité géographique entre deux voyages consécutifs
+    'attente_max': None,     # Attente maximum entre deux voyages consécutifs (minutes ; None : plus longue tranche de service)
+    'tous_assignes': False,  # True : chaque voyage doit être assigné (sinon le plus possible)
+    'max_solutions': 5,      # Solutions distinctes retournées (les meilleures)
+    'temps_max': 10.0,       # Limite de temps du solver (secondes, toutes résolutions comprises)
+    'nb_workers': 0,         # Workers CP-SAT en parallèle (0 : un par cœur)
+    'indices': True,         # Partir de la solution gloutonne (AddHint)
+    'mode': 'meilleures',    # 'meilleures' (une résolution) ou 'diverses' (coupes entre résolutions)
+    'ecart_min': 1,          # Mode 'diverses' : couples (voyage, service) qui changent d'une solution à l'autre
+    'formulation': 'chaines',  # 'chaines' (arcs de succession) ou 'intervalles' (NoOverlap)
+    'symetries': True,       # Ordonner les services interchangeables par leur premier voyage
+    'taille_bloc': None,     # Décomposer en blocs de ce nombre de voyages (None : un seul modèle)
+    'tampon': 60,            # Décomposition : minutes de départs suivants vues par chaque bloc
+    'solveur_bloc': 'cpsat',  # Décomposition : 'cpsat' ou 'glouton' pour chaque bloc
+    'parallele': True,       # Décomposition : composantes résolues dans plusieurs processus
+    'max_workers': None,     # Décomposition : nombre de processus (None : un par cœur)
+}
+
+FORMULATIONS = ('chaines', 'intervalles')
+MODES = ('meilleures', 'diverses')
+
+POIDS_ASSIGNATION = 1000  # Un voyage assigné de plus vaut plus que tous les services économisés
+
+
+def coupure_service(service):
+    """(début, fin) de la coupure d'un service coupé (comme masque_compatible), None sinon"""
+    if getattr(service, 'type_service', None) != "coupé":
+        return None
+    debut, fin = service.heure_debut_coupure, service.heure_fin_coupure
+    return None if debut is None or fin is None else (debut, fin)
+
+
+# ==================== INSTANCE ====================
+
+class InstanceServices:
+    """
+    Voyages (VoyageTable) et services de l'interface, sans modèle CP-SAT :
+    voyages possibles par service, classes de services interchangeables,
+    glouton et mise en forme des solutions. compatibles et coupures : matrice
+    et coupures déjà calculées (sous-problème d'une décomposition), la matrice
+    est copiée avant restriction.
+    """
+
+    def __init__(self, table, services, options, compatibles=None, coupures=None):
+        self.table = table
+        self.services = services
+        self.options = options
+        self.nb_voyages = len(table)
+        self.nb_services = len(services)
+
+        self.coupures = [coupure_service(service) for service, _ in services] if coupures is None else coupures
+        self.nb_tranches = [1 if coupure is None else 2 for coupure in self.coupures]
+        self.compatibles = self._compatibilites() if compatibles is None else compatibles.copy()
+        self.classes = self._classes_equivalence()
+        if options['symetries']:
+            self._restreindre_par_rang()
+
+        # Listes Python pour les tests d'enchaînement du glouton
+        self._debuts = table.hdebut.tolist()
+        self._fins = table.hfin.tolist()
+        self._groupes_debut = table.groupe_debut.tolist()
+        self._groupes_fin = table.groupe_fin.tolist()
+
+    def _compatibilites(self):
+        """Matrice voyages x services : plage horaire, pauses et voyages pré-assignés"""
+        compatibles = np.zeros((self.nb_voyages, self.nb_services), dtype=bool)
+        for s, (service, indices_assignes) in enumerate(self.services):
+            if service.heure_debut is not None and service.heure_fin is not None:
+                colonne = self.table.masque_fenetre(service.heure_debut, service.heure_fin)
+            else:
+                colonne = np.ones(self.nb_voyages, dtype=bool)
+            if hasattr(service, 'masque_compatible'):
+                colonne &= service.masque_compatible(self.table.hdebut, self.table.hfin)
+            compatibles[:, s] = colonne
+
+        # Un voyage pré-assigné ne peut aller que dans son service
+        for s, (_, indices_assignes) in enumerate(self.services):
+            compatibles[indices_assignes, :] = False
+            compatibles[indices_assignes, s] = True
+        return compatibles
+
+    def _classes_equivalence(self):
+        """Même classe : mêmes voyages possibles, même coupure et aucun voyage pré-assigné"""
+        return classes_services(
+            (self.compatibles[:, s].tobytes(), self.coupures[s], tuple(indices_assignes))
+            for s, (_, indices_assignes) in enumerate(self.services)
+        )
+
+    def tranche(self, v, s):
+        """Tranche de travail du service s qui contient le voyage v : 0, ou 1 après la coupure"""
+        coupure = self.coupures[s]
+        return int(coupure is not None and self._debuts[v] >= coupure[1])
+
+    def _membres_classes(self):
+        """Services de chaque classe de plus d'un service, dans l'ordre des services"""
+        membres = {}
+        for s, classe in enumerate(self.classes.tolist()):
+            membres.setdefault(classe, []).append(s)
+        return [services for services in membres.values() if len(services) > 1]
+
+    def _restreindre_par_rang(self):
+        """
+        Le k-ième service d'une classe (k = 0, 1...) commence au plus tôt par le
+        k-ième voyage possible : les voyages de rang r < k n'y ont pas de variable.
+        """
+        for services in self._membres_classes():
+            possibles = np.flatnonzero(self.compatibles[:, services[0]])
+            for k, s in enumerate(services):
+                self.compatibles[possibles[:k], s] = False
+
+    # ---------- Glouton ----------
+
+    def peut_enchainer(self, i, j):
+        """Vrai si j peut suivre directement i dans une tranche de service (arc du graphe de succession)"""
+        if self._fins[i] + self.options['pause_min'] > self._debuts[j]:
+            return False
+        if self.options['geo'] and self._groupes_fin[i] != self._groupes_debut[j]:
+            return False
+        attente_max = self.options['attente_max']
+        return attente_max is None or self._debuts[j] <= self._fins[i] + attente_max
+
+    def suit_dans_service(self, i, j, s):
+        """j après i dans le service s : arc dans une même tranche, rien à vérifier de part et d'autre de la coupure"""
+        return self.tranche(i, s) != self.tranche(j, s) or self.peut_enchainer(i, j)
+
+    def affectation_gloutonne(self):
+        """
+        Voyages par heure de début, chacun dans le premier service qui l'accepte
+        entre ses voisins (les services déjà utilisés d'abord).
+        """
+        affectation = np.full(self.nb_voyages, NON_ASSIGNE, dtype=np.int32)
+        for s, (_, indices_assignes) in enumerate(self.services):
+            affectation[list(indices_assignes)] = s
+        affectation = self.completer(affectation)
+        return self.numerotation_canonique(affectation) if self.options['symetries'] else affectation
+
+    def completer(self, affectation):
+        """Ajoute les voyages non assignés, par heure de début, sans déplacer les autres"""
+        affectation = affectation.copy()
+        hdebut = self._debuts
+        chaines = [sorted(np.flatnonzero(affectation == s).tolist(), key=lambda i: hdebut[i])
+                   for s in range(self.nb_services)]
+        debuts = [[hdebut[i] for i in chaine] for chaine in chaines]
+
+        for v in np.argsort(self.table.hdebut, kind='stable').tolist():
+            if affectation[v] != NON_ASSIGNE:
+                continue
+            candidats = sorted(np.flatnonzero(self.compatibles[v]).tolist(), key=lambda s: not chaines[s])
+            for s in candidats:
+                chaine = chaines[s]
+                position = bisect_right(debuts[s], hdebut[v])
+                if position > 0 and not self.suit_dans_service(chaine[position - 1], v, s):
+                    continue
+                if position < len(chaine) and not self.suit_dans_service(v, chaine[position], s):
+                    continue
+                chaine.insert(position, v)
+                debuts[s].insert(position, hdebut[v])
+                affectation[v] = s
+                break
+        return affectation
+
+    def numerotation_canonique(self, affectation):
+        """Renumérote les services de chaque classe dans l'ordre de leur premier voyage"""
+        return canoniser(affectation, self.classes)
+
+    # ---------- Solution ----------
+
+    def solution(self, affectation, strategie):
+        """Solution au format des dialogues PyQt : services[s] = [{voyage_obj, fixe, index}]"""
+        services_dict = {}
+        for s, (_, indices_assignes) in enumerate(self.services):
+            indices = np.flatnonzero(affectation == s).tolist()
+            if not indices:
+                continue
+            fixes = set(indices_assignes)
+            indices.sort(key=lambda i: self.table.hdebut[i])
+            services_dict[s] = [{"voyage_obj": self.table.objet(i), "fixe": i in fixes, "index": i}
+                                for i in indices]
+
+        return {
+            "strategie": strategie,
+            "nb_non_assignes": int((affectation < 0).sum()),
+            "nb_services_utilises": len(services_dict),
+            "services": services_dict,
+        }
+
+    def objectif(self, affectation):
+        """Objectif du modèle CP-SAT pour une affectation (glouton compris)"""
+        assignes = affectation[affectation != NON_ASSIGNE]
+        return POIDS_ASSIGNATION * len(assignes) - len(np.unique(assignes))
+
+
+# ==================== MODÈLE CP-SAT ====================
+
+class ModeleServices(InstanceServices):
+    """
+    Modèle d'affectation construit depuis une VoyageTable et les services de l'interface.
+
+    x[v, s]     : voyage v dans le service s (seulement si s peut le recevoir)
+    y[v, w]     : w suit directement v dans le même service (arcs du graphe)
+    debuts[v, s]: v est le premier voyage d'une tranche de travail du service s
+    numero[v]   : s + 1 si v est dans le service s, 0 s'il n'est pas assigné
+    index_numero : position des numero dans la solution du solver (CpSolverResponse)
+    intervalles[v, s] : [début, fin + pause_min) présent si x[v, s] (formulation 'intervalles')
+    deja[v, s]  : le service s a un voyage d'index <= v (services suivis d'un autre de leur classe)
+    """
+
+    def __init__(self, table, services, options, compatibles=None, coupures=None):
+        self.verifier_options(options)
+        super().__init__(table, services, options, compatibles, coupures)
+        self._construire()
+
+    @classmethod
+    def depuis_instance(cls, instance):
+        """Modèle d'une InstanceServices déjà construite (matrice, classes et restriction reprises)"""
+        cls.verifier_options(instance.options)
+        modele = cls.__new__(cls)
+        modele.__dict__.update(instance.__dict__)
+        modele._construire()
+        return modele
+
+    @staticmethod
+    def verifier_options(options):
+        if options['formulation'] not in FORMULATIONS:
+            raise ValueError(f"Formulation inconnue : {options['formulation']} (attendu : {', '.join(FORMULATIONS)})")
+        if options['mode'] not in MODES:
+            raise ValueError(f"Mode inconnu : {options['mode']} (attendu : {', '.join(MODES)})")
+
+    @staticmethod
+    def a_chaines(options):
+        """Successions y nécessaires : formulation 'chaines', continuité géo ou attente bornée"""
+        return options['formulation'] == 'chaines' or options['geo'] or options['attente_max'] is not None
+
+    # ---------- Construction ----------
+
+    def _construire(self):
+        options = self.options
+        chaines = self.a_chaines(options)
+        self.model = cp_model.CpModel()
+        # Sans chaînes, le graphe ne sert qu'à la borne (balayage, sans arcs)
+        self.graphe = GrapheSuccession.depuis_table(self.table, options['pause_min'],
+                                                    self.attente_arcs() if chaines else None)
+
+        self.x = {}
+        self.y = {}
+        self.debuts = {}
+        self.intervalles = {}
+        self.deja = {}
+        self.precede = []
+        self.numero = []
+        self.assigne = []
+
+        self._variables_affectation()
+        if options['formulation'] == 'intervalles':
+            self._sans_chevauchement()
+        if chaines:
+            self._arcs_succession()
+            self._chaines()
+        else:
+            self._services_utilises()
+        if options['symetries']:
+            self._briser_symetries()
+        self._objectif()
+
+    def attente_arcs(self):
+        """
+        Borne des arcs de succession : attente_max, sinon la plus longue tranche
+        de travail (plage du service, ou chaque côté de sa coupure)
+        """
+        if self.options['attente_max'] is not None:
+            return self.options['attente_max']
+        if not self.nb_voyages:
+            return 0
+        premier, dernier = int(self.table.hdebut.min()), int(self.table.hfin.max())
+        longueurs = [0]
+        for (service, _), coupure in zip(self.services, self.coupures):
+            debut = premier if getattr(service, 'heure_debut', None) is None else service.heure_debut
+            fin = dernier if getattr(service, 'heure_fin', None) is None else service.heure_fin
+            if coupure is None:
+                longueurs.append(fin - debut)
+            else:
+                longueurs += [coupure[0] - debut, fin - coupure[1]]
+        return max(0, min(max(longueurs), dernier - premier))
+
+    def _variables_affectation(self):
+        model = self.model
+        fixes = {v: s for s, (_, indices) in enumerate(self.services) for v in indices}
+
+        for v in range(self.nb_voyages):
+            termes = []
+            for s in np.flatnonzero(self.compatibles[v]).tolist():
+                self.x[v, s] = model.NewBoolVar(f"x_{v}_{s}")
+                termes.append((s, self.x[v, s]))
+
+            assigne = model.NewBoolVar(f"assigne_{v}")
+            model.Add(assigne == sum(var for _, var in termes))
+            if v in fixes:
+                model.Add(self.x[v, fixes[v]] == 1)
+            if self.options['tous_assignes']:
+                model.Add(assigne == 1)
+            self.assigne.append(assigne)
+
+            numero = model.NewIntVar(0, self.nb_services, f"numero_{v}")
+            model.Add(numero == sum((s + 1) * var for s, var in termes))
+            self.numero.append(numero)
+
+        # Position des numero dans le vecteur solution du solver (affectation_reponse)
+        self.index_numero = [n.Index() for n in self.numero]
+
+    def _arcs_succession(self):
+        """
+        Arcs y du graphe de succession entre deux voyages d'un même service
+        possible. Un arc qui franchit la coupure d'un service coupé n'est pas
+        une succession de ce service : y[v, w] => non x[v, s].
+        """
+        drapeau = TEMPS | GEO if self.options['geo'] else TEMPS
+        sources, cibles = self.graphe.arcs(drapeau)
+        communs = self.compatibles[sources] & self.compatibles[cibles]
+        franchit = np.zeros_like(communs)
+        for s, coupure in enumerate(self.coupures):
+            if coupure is not None:
+                franchit[:, s] = communs[:, s] & (self.table.hdebut[cibles] >= coupure[1]) \
+                    & (self.table.hdebut[sources] < coupure[1])
+        utiles = (communs & ~franchit).any(axis=1)
+
+        model = self.model
+        for k in np.flatnonzero(utiles).tolist():
+            v, w = int(sources[k]), int(cibles[k])
+            arc = model.NewBoolVar(f"y_{v}_{w}")
+            model.Add(self.numero[v] == self.numero[w]).OnlyEnforceIf(arc)
+            model.AddImplication(arc, self.assigne[v])
+            for s in np.flatnonzero(franchit[k]).tolist():
+                model.AddImplication(arc, self.x[v, s].Not())
+            self.y[v, w] = arc
+
+    def _chaines(self):
+        """
+        Au plus un successeur et un prédécesseur par voyage, un début de chaîne
+        par tranche de travail (deux pour un service coupé)
+        """
+        model = self.model
+        successeurs = [[] for _ in range(self.nb_voyages)]
+        predecesseurs = [[] for _ in range(self.nb_voyages)]
+        for (v, w), arc in self.y.items():
+            successeurs[v].append(arc)
+            predecesseurs[w].append(arc)
+
+        for v in range(self.nb_voyages):
+            if len(successeurs[v]) > 1:
+                model.AddAtMostOne(successeurs[v])
+            precede = model.NewBoolVar(f"precede_{v}")
+            model.Add(precede == sum(predecesseurs[v]))
+            self.precede.append(precede)
+
+        # Un voyage sans prédécesseur commence la chaîne de sa tranche
+        par_tranche = [[[] for _ in range(nb)] for nb in self.nb_tranches]
+        for (v, s), var in self.x.items():
+            debut = model.NewBoolVar(f"debut_{v}_{s}")
+            model.AddImplication(debut, var)
+            model.AddBoolOr([debut, var.Not(), self.precede[v]])
+            self.debuts[v, s] = debut
+            par_tranche[s][self.tranche(v, s)].append(debut)
+
+        self.utilise = []
+        for s, tranches in enumerate(par_tranche):
+            for debuts in tranches:
+                if debuts:
+                    model.AddAtMostOne(debuts)
+            debuts = [debut for tranche in tranches for debut in tranche]
+            if len(tranches) == 1 or not debuts:
+                self.utilise.append(sum(debuts))
+            else:
+                utilise = model.NewBoolVar(f"utilise_{s}")
+                model.AddMaxEquality(utilise, debuts)
+                self.utilise.append(utilise)
+
+    def _sans_chevauchement(self):
+        """Un intervalle optionnel par x[v, s], prolongé de la pause ; un NoOverlap par service"""
+        model = self.model
+        pause = self.options['pause_min']
+        hdebut = self.table.hdebut.tolist()
+        durees = (self.table.hfin - self.table.hdebut + pause).tolist()
+
+        par_service = [[] for _ in range(self.nb_services)]
+        for (v, s), var in self.x.items():
+            intervalle = model.NewOptionalFixedSizeIntervalVar(hdebut[v], durees[v], var, f"intervalle_{v}_{s}")
+            self.intervalles[v, s] = intervalle
+            par_service[s].append(intervalle)
+
+        for intervalles in par_service:
+            if len(intervalles) > 1:
+                model.AddNoOverlap(intervalles)
+
+    def _services_utilises(self):
+        """Sans chaînes : un service est utilisé dès qu'il reçoit un voyage"""
+        par_service = [[] for _ in range(self.nb_services)]
+        for (v, s), var in self.x.items():
+            par_service[s].append(var)
+
+        self.utilise = []
+        for s, variables in enumerate(par_service):
+            utilise = self.model.NewBoolVar(f"utilise_{s}")
+            for var in variables:
+                self.model.AddImplication(var, utilise)
+            self.utilise.append(utilise)
+
+    def _briser_symetries(self):
+        """
+        Deux services consécutifs a, b d'une même classe : x[v, b] => deja[v', a],
+        v' le voyage possible précédent v. Le premier voyage de a précède celui
+        de b, et b ne sert que si a sert.
+        """
+        model = self.model
+        for services in self._membres_classes():
+            possibles = np.flatnonzero(self.compatibles[:, services[0]]).tolist()
+            for a, b in zip(services, services[1:]):
+                precedent = None
+                for v in possibles:
+                    if (v, b) in self.x and precedent is not None:
+                        model.AddImplication(self.x[v, b], precedent)
+                    if (v, a) not in self.x:
+                        continue
+                    deja = model.NewBoolVar(f"deja_{v}_{a}")
+                    # deja[v, a] = deja[précédent, a] ou x[v, a]
+                    termes = [self.x[v, a]] if precedent is None else [self.x[v, a], precedent]
+                    model.AddBoolOr([deja.Not()] + termes)
+                    for terme in termes:
+                        model.AddImplication(terme, deja)
+                    self.deja[v, a] = deja
+                    precedent = deja
+
+    def _objectif(self):
+        """Le plus de voyages assignés, puis le moins de services utilisés"""
+        self.nb_minimum, self.chaines_minimum = couverture_minimale(self.graphe, self.options['geo'])
+        if self.options['tous_assignes']:
+            # Borne de la couverture par chemins : coupe valide quand tout est assigné
+            # (un service coupé porte une chaîne par tranche)
+            self.model.Add(sum(nb * utilise for nb, utilise in zip(self.nb_tranches, self.utilise)) >= self.nb_minimum)
+        self.model.Maximize(POIDS_ASSIGNATION * sum(self.assigne) - sum(self.utilise))
+
+    # ---------- Affectations de départ ----------
+
+    def affectation_chaines(self):
+        """
+        Glouton amorcé par la couverture minimale par chemins : chaque chaîne,
+        coupée aux voyages pré-assignés, est découpée en segments ; un segment
+        va dans un service sans voyage pré-assigné qui en prend le plus long
+        début possible. Les voyages restants sont ajoutés par completer.
+        """
+        affectation = np.full(self.nb_voyages, NON_ASSIGNE, dtype=np.int32)
+        for s, (_, indices_assignes) in enumerate(self.services):
+            affectation[list(indices_assignes)] = s
+        libres = [s for s, (_, indices_assignes) in enumerate(self.services) if not len(indices_assignes)]
+
+        for chaine in self.chaines_minimum:
+            # Morceaux de voyages consécutifs libres : chaque succession reste un arc du graphe
+            morceaux = [[]]
+            for v in chaine:
+                if affectation[v] == NON_ASSIGNE:
+                    morceaux[-1].append(v)
+                elif morceaux[-1]:
+                    morceaux.append([])
+            for morceau in morceaux:
+                k = 0
+                while k < len(morceau) and libres:
+                    possibles = self.compatibles[np.ix_(morceau[k:], libres)]
+                    longueurs = np.where(possibles.all(axis=0), len(possibles), (~possibles).argmax(axis=0))
+                    meilleur = int(longueurs.argmax())
+                    if longueurs[meilleur] == 0:
+                        k += 1
+                        continue
+                    affectation[morceau[k:k + longueurs[meilleur]]] = libres.pop(meilleur)
+                    k += int(longueurs[meilleur])
+
+        affectation = self.completer(affectation)
+        return self.numerotation_canonique(affectation) if self.options['symetries'] else affectation
+
+    def affectation_initiale(self, gloutonne=None):
+        """Meilleure (objectif) du glouton et du glouton amorcé par les chaînes : indice du solver"""
+        if gloutonne is None:
+            gloutonne = self.affectation_gloutonne()
+        chaines = self.affectation_chaines()
+        return chaines if self.objectif(chaines) > self.objectif(gloutonne) else gloutonne
+
+    # ---------- Indices et coupes ----------
+
+    def indiquer(self, affectation):
+        """
+        Remplace les indices (AddHint) par une affectation réalisable. Toutes les
+        variables sont indiquées : CP-SAT la retient comme première solution
+        sans attendre la fin du presolve.
+        """
+        model = self.model
+        model.ClearHints()
+        for (v, s), var in self.x.items():
+            model.AddHint(var, int(affectation[v] == s))
+        for v in range(self.nb_voyages):
+            model.AddHint(self.assigne[v], int(affectation[v] != NON_ASSIGNE))
+            model.AddHint(self.numero[v], int(affectation[v]) + 1)
+
+        # Chaînes de chaque tranche de service dans l'ordre du temps
+        suivants = set()
+        premiers = set()
+        for s in range(self.nb_services):
+            chaine = np.flatnonzero(affectation == s)
+            chaine = chaine[np.argsort(self.table.hdebut[chaine], kind='stable')].tolist()
+            for precedent, v in zip([None] + chaine, chaine):
+                if precedent is None or self.tranche(precedent, s) != self.tranche(v, s):
+                    premiers.add(v)
+                else:
+                    suivants.add((precedent, v))
+        for arc, var in self.y.items():
+            model.AddHint(var, int(arc in suivants))
+        for v, var in enumerate(self.precede):
+            model.AddHint(var, int(v in premiers or affectation[v] == NON_ASSIGNE) ^ 1)
+        for (v, s), var in self.debuts.items():
+            model.AddHint(var, int(affectation[v] == s and v in premiers))
+
+        for (v, s), var in self.deja.items():
+            model.AddHint(var, int((affectation[:v + 1] == s).any()))
+        for s, utilise in enumerate(self.utilise):
+            if isinstance(utilise, cp_model.IntVar):
+                model.AddHint(utilise, int((affectation == s).any()))
+
+    def exclure(self, affectation, ecart_min=1):
+        """Coupe no-good : au moins ecart_min couples (voyage, service) changent"""
+        ecart = [1 - var if affectation[v] == s else var for (v, s), var in self.x.items()]
+        self.model.Add(sum(ecart) >= ecart_min)
+
+    # ---------- Lecture d'une solution ----------
+
+    def affectation(self, valeur):
+        """Vecteur voyage -> service (-1 si non assigné) depuis une fonction valeur(var)"""
+        return np.fromiter((valeur(n) - 1 for n in self.numero), dtype=np.int32, count=self.nb_voyages)
+
+    def affectation_reponse(self, reponse):
+        """
+        Même vecteur, lu directement dans la solution d'une CpSolverResponse
+        (response_proto du callback, sans copie) aux positions des numero.
+        """
+        solution = reponse.solution
+        return np.fromiter((solution[i] - 1 for i in self.index_numero), dtype=np.int32, count=self.nb_voyages)
+
+
+# ==================== COLLECTEUR DE SOLUTIONS ====================
 
-'''voyages_data = [
+class SolutionCollector(cp_model.CpSolverSolutionCallback):
+    """
+    Garde les affectations distinctes trouvées pendant la recherche (chaque
+    nouvelle solution est meilleure que la précédente). Deux solutions qui ne
+    diffèrent que par les successions y, ou par l'échange de services d'une
+    même classe (ModeleServices.classes), ont la même empreinte : seuls les
+    plans distincts à la numérotation près sont gardés.
+
+    Le callback ne lit que les numero, directement dans la réponse du solver
+    (sans un appel Value par variable), et ne construit aucun dictionnaire (ModeleServices.solution, à la
+    demande). Avec une file (queue.Queue), chaque nouvelle affectation y est
+    aussi déposée, (affectation, strategie), pour un autre thread ; la
+    recherche s'arrête à la première solution après arret.set().
+    """
+
+    def __init__(self, modele, file=None, arret=None):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+        self.modele = modele
+        self.file = file
+        self.arret = arret
+        self.affectations = []
+        self.objectifs = []
+        self.empreintes = set()
+        self.nb_doublons = 0
+
+    def ajouter(self, affectation, objectif, strategie):
+        """Garde (et dépose dans la file) une affectation pas encore vue ; False si doublon"""
+        cle = empreinte(affectation, self.modele.classes)
+        if cle in self.empreintes:
+            self.nb_doublons += 1
+            return False
+        self.empreintes.add(cle)
+        self.affectations.append(affectation)
+        self.objectifs.append(objectif)
+        if self.file is not None:
+            self.file.put((affectation, strategie))
+        return True
+
+    def on_solution_callback(self):
+        objectif = self.ObjectiveValue()
+        strategie = f"CP-SAT solution {len(self.affectations) + 1} (objectif {objectif:.0f})"
+        self.ajouter(self.modele.affectation_reponse(self.response_proto), objectif, strategie)
+        if self.arret is not None and self.arret.is_set():
+            self.StopSearch()
+
+
+# ==================== FONCTION PRINCIPALE ====================
+
+def resoudre_cpsat(voyages, services, options=None):
+    """
+    Affecte les voyages aux services avec CP-SAT.
+
+    voyages  : objets voyage (objet.py)
+    services : [(service_agent, indices des voyages pré-assignés)], comme l'interface
+    options  : voir OPTIONS_DEFAUT (les clés absentes gardent leur valeur par défaut)
+
+    Retourne les meilleures solutions distinctes (la meilleure d'abord) au format
+    de DialogSolutionsOptimisation ; [] si le modèle n'a pas de solution. Si
+    CP-SAT n'en trouve aucune dans le temps imparti (construction du modèle
+    comprise), retourne la solution gloutonne.
+    """
+    debut = time.perf_counter()
+    options = {**OPTIONS_DEFAUT, **(options or {})}
+    limite = debut + options['temps_max']
+    if not voyages or not services:
+        return []
+
+    if options['taille_bloc'] and len(voyages) > options['taille_bloc']:
+        from decomposition import resoudre_par_blocs
+        return resoudre_par_blocs(voyages, services, options)
+
+    table = VoyageTable.depuis_voyages(voyages)
+    modele = ModeleServices(table, services, options)
+    if options['tous_assignes'] and modele.nb_minimum > sum(modele.nb_tranches):
+        print(f"❌ {modele.nb_minimum} chaînes au minimum, {sum(modele.nb_tranches)} tranches de service disponibles")
+        return []
+
+    gloutonne = modele.affectation_initiale()
+    if options['indices']:
+        modele.indiquer(gloutonne)
+
+    if options['mode'] == 'diverses':
+        return _solutions_diverses(modele, options, limite, gloutonne)
+
+    reste = limite - time.perf_counter()
+    if reste <= 0:
+        print("⏱️ Temps écoulé pendant la construction du modèle")
+        return _repli_glouton(modele, gloutonne)
+
+    solver = creer_solver(options, reste)
+    collector = SolutionCollector(modele)
+    statut = solver.Solve(modele.model, collector)
+
+    if statut not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        print(f"❌ Pas de solution CP-SAT ({solver.StatusName(statut)})")
+        return _repli_glouton(modele, gloutonne) if statut == cp_model.UNKNOWN else []
+
+    # Les dernières solutions trouvées sont les meilleures
+    solutions = []
+    derniere = len(collector.affectations) - 1
+    for k in range(derniere, max(-1, derniere - options['max_solutions']), -1):
+        optimale = k == derniere and statut == cp_model.OPTIMAL
+        strategie = f"CP-SAT {'optimale' if optimale else f'solution {k + 1}'} (objectif {collector.objectifs[k]:.0f})"
+        solutions.append(modele.solution(collector.affectations[k], strategie))
+    return solutions
+
+
+def _repli_glouton(modele, affectation):
+    """
+    Solution gloutonne quand CP-SAT n'a rien trouvé dans le temps imparti ([]
+    si elle laisse des voyages alors que tous doivent être assignés).
+    """
+    if modele.options['tous_assignes'] and (affectation == NON_ASSIGNE).any():
+        return []
+    print("↩️ Solution gloutonne retournée")
+    return [modele.solution(affectation, f"Glouton (objectif {modele.objectif(affectation)})")]
+
+
+def creer_solver(options, temps_max=None):
+    """CpSolver avec la limite de temps et les workers des options"""
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = options['temps_max'] if temps_max is None else temps_max
+    solver.parameters.num_workers = options['nb_workers'] or os.cpu_count() or 1
+    return solver
+
+
+def _solutions_diverses(modele, options, limite, gloutonne):
+    """
+    Une résolution par solution : chaque plan trouvé est exclu (coupe no-good)
+    et sert d'indice à la suivante. Le temps restant jusqu'à limite
+    (perf_counter) est partagé entre les résolutions restantes.
+    """
+    solutions = []
+    statut = cp_model.UNKNOWN
+    for k in range(options['max_solutions']):
+        reste = limite - time.perf_counter()
+        if reste <= 0:
+            break
+        solver = creer_solver(options, reste / (options['max_solutions'] - k))
+        statut = solver.Solve(modele.model)
+        if statut not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            break
+
+        affectation = modele.affectation(solver.Value)
+        optimale = " optimale" if statut == cp_model.OPTIMAL else ""
+        solutions.append(modele.solution(
+            affectation, f"CP-SAT diverse {k + 1}{optimale} (objectif {solver.ObjectiveValue():.0f})"
+        ))
+        modele.exclure(affectation, options['ecart_min'])
+        modele.indiquer(affectation)
+
+    if not solutions:
+        print("❌ Pas de solution CP-SAT")
+        if statut == cp_model.UNKNOWN:
+            return _repli_glouton(modele, gloutonne)
+    return solutions
+
+
+def comparer_formulations(voyages, services, options=None):
+    """
+    Construit et résout la même instance avec chaque formulation.
+    Retourne {formulation: {nb_variables, nb_contraintes, temps_construction,
+    temps_resolution, statut, objectif}} pour comparer la taille des modèles.
+
+    Les intervalles ne retirent les arcs de succession que sans continuité géo
+    ni attente_max : c'est le cas par défaut ici (geo=False, attente_max=None),
+    et les deux formulations résolvent le même problème.
+    """
+    options = {**OPTIONS_DEFAUT, 'geo': False, 'attente_max': None, **(options or {})}
+    table = VoyageTable.depuis_voyages(voyages)
+    resultats = {}
+    for formulation in FORMULATIONS:
+        debut = time.perf_counter()
+        modele = ModeleServices(table, services, {**options, 'formulation': formulation})
+        construction = time.perf_counter() - debut
+
+        if options['indices']:
+            modele.indiquer(modele.affectation_initiale())
+        solver = creer_solver(options)
+        debut = time.perf_counter()
+        statut = solver.Solve(modele.model)
+        proto = modele.model.Proto()
+        resultat = {
+            'nb_variables': len(proto.variables),
+            'nb_contraintes': len(proto.constraints),
+            'temps_construction': construction,
+            'temps_resolution': time.perf_counter() - debut,
+            'statut': solver.StatusName(statut),
+            'objectif': solver.ObjectiveValue() if statut in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None,
+        }
+        resultats[formulation] = resultat
+        print(f"📊 {formulation:<11} : {resultat['nb_variables']} variables, {resultat['nb_contraintes']} contraintes, "
+              f"{resultat['statut']} en {resultat['temps_resolution']:.1f}s (objectif {resultat['objectif']})")
+    return resultats
+
+
+# ==================== RECHERCHE EN CONTINU ====================
+
+class RechercheContinue:
+    """
+    Résolution CP-SAT dans un thread, pour afficher les solutions pendant la
+    recherche. Chaque affectation distincte est déposée dans self.file
+    (queue.Queue) dès qu'elle est trouvée, sous la forme (affectation,
+    strategie) ; None marque la fin de la recherche.
+
+    Tout le calcul se fait dans le thread : la solution gloutonne est déposée
+    avant la construction du modèle, l'interface a une première solution sans
+    attendre le modèle ni le presolve. temps_max compte la construction.
+
+    Mode 'meilleures' sans taille_bloc seulement (une seule résolution).
+    """
+
+    def __init__(self, voyages, services, options=None):
+        options = {**OPTIONS_DEFAUT, **(options or {})}
+        if options['mode'] != 'meilleures' or options['taille_bloc']:
+            raise ValueError("Recherche en continu : mode 'meilleures' sans taille_bloc seulement")
+        ModeleServices.verifier_options(options)
+        self.voyages = voyages
+        self.services = services
+        self.options = options
+        self.instance = None
+        self.collector = None
+        self.solver = None
+        self.file = queue.Queue()
+        self.statut = None
+        self._arret = threading.Event()
+        self._thread = threading.Thread(target=self._resoudre, daemon=True)
+
+    def demarrer(self):
+        """Lance le glouton, la construction du modèle et le solver dans le thread"""
+        self._thread.start()
+
+    def arreter(self):
+        """Demande l'arrêt de la recherche (les solutions déjà déposées restent dans la file)"""
+        self._arret.set()
+        if self.solver is not None:
+            self.solver.StopSearch()
+
+    @property
+    def en_cours(self):
+        return self._thread.is_alive()
+
+    def solution(self, affectation, strategie):
+        """Dictionnaire au format de DialogSolutionsOptimisation, construit à la demande"""
+        return self.instance.solution(affectation, strategie)
+
+    def _resoudre(self):
+        debut = time.perf_counter()
+        try:
+            self.instance = InstanceServices(VoyageTable.depuis_voyages(self.voyages), self.services, self.options)
+            self.collector = SolutionCollector(self.instance, self.file, self._arret)
+            affectation = self.instance.affectation_gloutonne()
+            if not self.options['tous_assignes'] or (affectation != NON_ASSIGNE).all():
+                objectif = self.instance.objectif(affectation)
+                self.collector.ajouter(affectation, objectif, f"Glouton (objectif {objectif})")
+            if self._arret.is_set():
+                return
+
+            modele = ModeleServices.depuis_instance(self.instance)
+            chaines = modele.affectation_chaines()
+            if modele.objectif(chaines) > modele.objectif(affectation):
+                affectation = chaines
+                if not self.options['tous_assignes'] or (affectation != NON_ASSIGNE).all():
+                    objectif = modele.objectif(affectation)
+                    self.collector.ajouter(affectation, objectif, f"Chaînes minimales (objectif {objectif})")
+            if self.options['indices']:
+                modele.indiquer(affectation)
+            self.collector.modele = modele
+            reste = self.options['temps_max'] - (time.perf_counter() - debut)
+            if reste <= 0:
+                print("⏱️ Temps écoulé pendant la construction du modèle")
+                return
+            # Un arrêt demandé avant Solve est vu à la première solution (l'indice glouton)
+            self.solver = creer_solver(self.options, reste)
+            if self._arret.is_set():
+                return
+            self.statut = self.solver.Solve(modele.model, self.collector)
+            print(f"🏁 Recherche terminée ({self.solver.StatusName(self.statut)}) : "
+                  f"{len(self.collector.affectations)} solution(s) distincte(s)")
+        finally:
+            self.file.put(None)
+
+
+# ==================== EXEMPLE ====================
+
+voyages_data = [
     # (ligne, num_voyage, arret_debut, arret_fin, heure_debut, heure_fin)
     # Voyages pré-assignés à S1
     ("63", 1, "JUMA1", "FOMET", "06:00", "06:30"),
@@ -33,226 +927,29 @@ services_data = [
     {"id": "S5", "debut": "06:00", "fin": "12:00", "voyages_assignes": []},
     {"id": "S6", "debut": "06:00", "fin": "12:00", "voyages_assignes": []},
 ]
-'''
-pause_min = 5  # Minutes de pause minimum entre deux voyages
-
-
-# ==================== CLASSE SERVICE POUR LE SOLVER ====================
 
-class ServiceSolver:
-    """Wrapper pour service_agent adapté au solver"""
 
-    def __init__(self, id, debut, fin):
-        self.id = id
-        self.debut = self.time_to_minutes(debut)
-        self.fin = self.time_to_minutes(fin)
-        self.voyages_assignes = []  # Indices des voyages pré-assignés
+def creer_exemple():
+    """Voyages et services de l'exemple, au format de resoudre_cpsat"""
+    voyages_objets = [
+        voyage(num_ligne=ligne, num_voyage=num, arret_debut=arr_deb, arret_fin=arr_fin,
+               heure_debut=h_deb, heure_fin=h_fin)
+        for ligne, num, arr_deb, arr_fin, h_deb, h_fin in voyages_data
+    ]
+    services = []
+    for s_data in services_data:
+        service = service_agent(num_service=s_data["id"])
+        service.set_limites(voyage.time_to_minutes(s_data["debut"]), voyage.time_to_minutes(s_data["fin"]))
+        services.append((service, s_data["voyages_assignes"]))
+    return voyages_objets, services
 
-    def time_to_minutes(self, heure_str):
-        h, m = heure_str.split(':')
-        return int(h) * 60 + int(m)
-
-    def minutes_to_time(self, minutes):
-        h = minutes // 60
-        m = minutes % 60
-        return f"{h:02d}:{m:02d}"
-
-
-# ==================== COLLECTEUR DE SOLUTIONS ====================
-
-class SolutionCollector(cp_model.CpSolverSolutionCallback):
-    def __init__(self, x, voyages_objets, services_objets, max_solutions=5):
-        cp_model.CpSolverSolutionCallback.__init__(self)
-        self.x = x
-        self.voyages_objets = voyages_objets
-        self.services_objets = services_objets
-        self.solutions = []
-        self.max_solutions = max_solutions
-
-    def on_solution_callback(self):
-        if len(self.solutions) >= self.max_solutions:
-            self.StopSearch()
-            return
-
-        solution = {"services": {}}
-
-        for s in range(len(self.services_objets)):
-            serv = self.services_objets[s]
-            voyages_du_service = []
-
-            for v in range(len(self.voyages_objets)):
-                if self.Value(self.x[v, s]) == 1:
-                    voy = self.voyages_objets[v]
-                    voyages_du_service.append({
-                        "index": v,
-                        "ligne": voy.num_ligne,  # Adapté pour objet.py
-                        "num": voy.num_voyage,  # Adapté pour objet.py
-                        "depart": voy.arret_debut,  # Adapté pour objet.py
-                        "arrivee": voy.arret_fin,  # Adapté pour objet.py
-                        "heure_debut": voy.hdebut,  # Adapté pour objet.py
-                        "heure_fin": voy.hfin,  # Adapté pour objet.py
-                        "heure_debut_str": voyage.minutes_to_time(voy.hdebut),
-                        "heure_fin_str": voyage.minutes_to_time(voy.hfin),
-                        "js_srv": voy.js_srv,
-                        "fixe": v in serv.voyages_assignes
-                    })
-
-            # Trier par heure de début
-            voyages_du_service.sort(key=lambda x: x["heure_debut"])
-
-            solution["services"][serv.id] = {
-                "id": serv.id,
-                "debut": serv.minutes_to_time(serv.debut),
-                "fin": serv.minutes_to_time(serv.fin),
-                "voyages": voyages_du_service
-            }
-
-        self.solutions.append(solution)
-
-    def get_solutions(self):
-        return self.solutions
-
-
-# ==================== FONCTIONS UTILITAIRES ====================
-
-def chevauchement(v1, v2, voyages_objets):
-    """Vérifie si deux voyages se chevauchent"""
-    return (voyages_objets[v1].hfin + pause_min > voyages_objets[v2].hdebut and
-            voyages_objets[v2].hfin + pause_min > voyages_objets[v1].hdebut)
-
-
-# ==================== CRÉATION DES OBJETS ====================
-
-# Créer les objets voyage depuis objet.py
-voyages_objets = []
-for v_data in voyages_data:
-    ligne, num, arr_deb, arr_fin, h_deb, h_fin = v_data
-    voy = voyage(
-        num_ligne=ligne,
-        num_voyage=num,
-        arret_debut=arr_deb,
-        arret_fin=arr_fin,
-        heure_debut=h_deb,
-        heure_fin=h_fin
-    )
-    voyages_objets.append(voy)
-
-# Créer les objets service
-services_objets = []
-for s_data in services_data:
-    serv = ServiceSolver(s_data["id"], s_data["debut"], s_data["fin"])
-    serv.voyages_assignes = s_data["voyages_assignes"]
-    services_objets.append(serv)
-
-# ==================== MODÈLE CP-SAT ====================
-
-model = cp_model.CpModel()
-
-# Variables x[v,s] = 1 si voyage v est assigné au service s
-x = {}
-for v in range(len(voyages_objets)):
-    for s in range(len(services_objets)):
-        x[v, s] = model.NewBoolVar(f"voyage_{v}_service_{s}")
-
-# Variables de succession y[v1,v2,s] = 1 si v1 précède directement v2 sur le service s
-y = {}
-for v1 in range(len(voyages_objets)):
-    for v2 in range(len(voyages_objets)):
-        if v1 != v2:
-            # v1 peut précéder v2 si v1 termine avant que v2 commence (avec pause)
-            if voyages_objets[v1].hfin + pause_min <= voyages_objets[v2].hdebut:
-                for s in range(len(services_objets)):
-                    y[v1, v2, s] = model.NewBoolVar(f"succ_{v1}_{v2}_{s}")
-
-# Contrainte 1: Chaque voyage est assigné à exactement un service
-for v in range(len(voyages_objets)):
-    model.Add(sum(x[v, s] for s in range(len(services_objets))) == 1)
-
-# Contrainte 2: Voyages pré-assignés restent sur leur service
-for s in range(len(services_objets)):
-    for v in services_objets[s].voyages_assignes:
-        model.Add(x[v, s] == 1)
-
-# Contrainte 3: Pas de chevauchement sur le même service
-for v1 in range(len(voyages_objets)):
-    for v2 in range(v1 + 1, len(voyages_objets)):
-        if chevauchement(v1, v2, voyages_objets):
-            for s in range(len(services_objets)):
-                model.Add(x[v1, s] + x[v2, s] <= 1)
-
-# Contrainte 4: Respect des limites horaires des services
-for v in range(len(voyages_objets)):
-    for s in range(len(services_objets)):
-        voy = voyages_objets[v]
-        serv = services_objets[s]
-        if voy.hdebut < serv.debut or voy.hfin > serv.fin:
-            model.Add(x[v, s] == 0)
-
-# Contrainte 5: Lien entre succession et assignation
-for (v1, v2, s) in y:
-    model.Add(x[v1, s] == 1).OnlyEnforceIf(y[v1, v2, s])
-    model.Add(x[v2, s] == 1).OnlyEnforceIf(y[v1, v2, s])
-
-# Contrainte 6: Au plus un successeur direct par voyage
-for v1 in range(len(voyages_objets)):
-    for s in range(len(services_objets)):
-        successeurs = [y[v1, v2, s] for v2 in range(len(voyages_objets)) if (v1, v2, s) in y]
-        if successeurs:
-            model.Add(sum(successeurs) <= 1).OnlyEnforceIf(x[v1, s])
-
-# Contrainte 7: Au plus un prédécesseur direct par voyage
-for v2 in range(len(voyages_objets)):
-    for s in range(len(services_objets)):
-        predecesseurs = [y[v1, v2, s] for v1 in range(len(voyages_objets)) if (v1, v2, s) in y]
-        if predecesseurs:
-            model.Add(sum(predecesseurs) <= 1).OnlyEnforceIf(x[v2, s])
-
-# Contrainte 8: Continuité géographique (3 premiers caractères)
-for (v1, v2, s) in y:
-    # Utiliser arret_fin_id() et arret_debut_id() de objet.py
-    geo_ok = voyages_objets[v1].arret_fin_id() == voyages_objets[v2].arret_debut_id()
-    if not geo_ok:
-        model.Add(y[v1, v2, s] == 0)
-
-# Contrainte 9: Si deux voyages sont sur le même service et peuvent se suivre,
-# l'un doit être le successeur de l'autre (ou il y a un voyage entre)
-for v1 in range(len(voyages_objets)):
-    for v2 in range(len(voyages_objets)):
-        if v1 != v2 and (v1, v2, 0) in y:
-            for s in range(len(services_objets)):
-                both_on_s = model.NewBoolVar(f"both_{v1}_{v2}_{s}")
-                model.Add(x[v1, s] + x[v2, s] == 2).OnlyEnforceIf(both_on_s)
-                model.Add(x[v1, s] + x[v2, s] < 2).OnlyEnforceIf(both_on_s.Not())
-
-                intermediaires = [y[v1, vi, s] for vi in range(len(voyages_objets))
-                                  if (v1, vi, s) in y and vi != v2 and
-                                  voyages_objets[vi].hfin + pause_min <= voyages_objets[v2].hdebut]
-
-                if (v1, v2, s) in y:
-                    model.Add(y[v1, v2, s] + sum(intermediaires) >= 1).OnlyEnforceIf(both_on_s)
-
-# ==================== RÉSOLUTION ====================
-
-collector = SolutionCollector(x, voyages_objets, services_objets, max_solutions=10)
-
-solver = cp_model.CpSolver()
-solver.parameters.enumerate_all_solutions = True
-status = solver.Solve(model, collector)
-
-if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
-    print(f"\n🎉 {len(collector.solutions)} solution(s) trouvée(s) !")
-elif status == cp_model.INFEASIBLE:
-    print("❌ Pas de solution possible")
-else:
-    print(f"Status: {status}")
 
 # ==================== AFFICHAGE TKINTER ====================
 
-import tkinter as tk
-from tkinter import ttk
-
+def afficher_solutions(solutions, services):
+    import tkinter as tk
+    from tkinter import ttk
 
-def afficher_solutions(solutions):
     root = tk.Tk()
     root.title("Solutions d'attribution")
     root.geometry("900x700")
@@ -278,38 +975,44 @@ def afficher_solutions(solutions):
         idx = combo.current()
         solution = solutions[idx]
 
-        for service_id, service_data in solution["services"].items():
-            voyages_list = service_data["voyages"]
+        text_area.insert(tk.END, f"{solution['strategie']} - {solution['nb_non_assignes']} non assigné(s)\n")
+        for service_id, voyages_list in solution["services"].items():
+            service = services[service_id][0]
             text_area.insert(tk.END,
                              f"\n{'=' * 60}\n")
             text_area.insert(tk.END,
-                             f"=== Service {service_id} ({service_data['debut']} - {service_data['fin']}) ===\n")
+                             f"=== Service {service.num_service} ({voyage.minutes_to_time(service.heure_debut)}"
+                             f" - {voyage.minutes_to_time(service.heure_fin)}) ===\n")
             text_area.insert(tk.END,
                              f"    {len(voyages_list)} voyage(s)\n")
             text_area.insert(tk.END,
                              f"{'=' * 60}\n\n")
 
-            if voyages_list:
-                prev_voyage = None
-                for voy in voyages_list:
-                    tag = "🔒 FIXE  " if voy["fixe"] else "✨ AJOUTÉ"
-
-                    # Vérifier continuité géo
-                    geo_warning = ""
-                    if prev_voyage:
-                        if prev_voyage["arrivee"][:3] != voy["depart"][:3]:
-                            geo_warning = " ⚠️ RUPTURE GÉO"
-
-                    text_area.insert(tk.END,
-                                     f"  {tag} | {voy['ligne']}-{voy['num']:>2} | "
-                                     f"{voy['heure_debut_str']}-{voy['heure_fin_str']} | "
-                                     f"{voy['depart']} → {voy['arrivee']}{geo_warning}\n")
-                    prev_voyage = voy
-            else:
-                text_area.insert(tk.END, "  (aucun voyage)\n")
+            prev_voyage = None
+            for voy_data in voyages_list:
+                voy = voy_data["voyage_obj"]
+                tag = "🔒 FIXE  " if voy_data["fixe"] else "✨ AJOUTÉ"
+
+                # Vérifier continuité géo
+                geo_warning = ""
+                if prev_voyage and prev_voyage.arret_fin_id() != voy.arret_debut_id():
+                    geo_warning = " ⚠️ RUPTURE GÉO"
+
+                text_area.insert(tk.END,
+                                 f"  {tag} | {voy.num_ligne}-{voy.num_voyage:>2} | "
+                                 f"{voyage.minutes_to_time(voy.hdebut)}-{voyage.minutes_to_time(voy.hfin)} | "
+                                 f"{voy.arret_debut} → {voy.arret_fin}{geo_warning}\n")
+                prev_voyage = voy
 
     combo.bind("<<ComboboxSelected>>", afficher_solution)
     afficher_solution()
 
     root.mainloop()
 
+
+if __name__ == "__main__":
+    voyages_objets, services = creer_exemple()
+    solutions = resoudre_cpsat(voyages_objets, services, {'pause_min': 5, 'max_solutions': 10})
+    print(f"\n🎉 {len(solutions)} solution(s) trouvée(s) !")
+    if solutions:
+        afficher_solutions(solutions, services)
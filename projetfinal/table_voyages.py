@@ -0,0 +1,167 @@
+"""
+Table de voyages en colonnes (struct-of-arrays) pour les solvers
+Fichier: table_voyages.py
+"""
+
+import numpy as np
+
+from communs.registre_arrets import REGISTRE_ARRETS
+
+
+def _encoder(valeurs):
+    """Encode une liste de valeurs en codes entiers (ordre trié des valeurs)"""
+    uniques = sorted(set(valeurs), key=str)
+    codes_par_valeur = {val: code for code, val in enumerate(uniques)}
+    codes = np.fromiter((codes_par_valeur[v] for v in valeurs), dtype=np.int32, count=len(valeurs))
+    return codes, uniques
+
+
+class VoyageTable:
+    """
+    Voyages stockés en colonnes NumPy int32 :
+    hdebut, hfin (minutes), ligne, arret_debut, arret_fin (codes entiers),
+    plus groupe_debut/groupe_fin : codes de groupe du registre des arrêts
+    (REGISTRE_ARRETS), utilisés pour la continuité géographique.
+
+    La ligne i de la table correspond à objets[i] (objet voyage ou dict d'import),
+    ce qui permet de revenir aux objets d'origine pour l'interface.
+    """
+
+    def __init__(self, hdebut, hfin, ligne, arret_debut, arret_fin, lignes, arrets, objets,
+                 groupe_debut=None, groupe_fin=None):
+        self.hdebut = np.asarray(hdebut, dtype=np.int32)
+        self.hfin = np.asarray(hfin, dtype=np.int32)
+        self.ligne = np.asarray(ligne, dtype=np.int32)
+        self.arret_debut = np.asarray(arret_debut, dtype=np.int32)
+        self.arret_fin = np.asarray(arret_fin, dtype=np.int32)
+        self.lignes = lignes    # code ligne -> num_ligne
+        self.arrets = arrets    # code arrêt -> nom de l'arrêt
+        self.objets = objets    # index -> objet d'origine
+
+        if groupe_debut is None or groupe_fin is None:
+            # Groupe géographique d'un arrêt : code du registre partagé
+            codes_groupes = REGISTRE_ARRETS.codes_groupes(arrets)
+            groupe_debut = codes_groupes[self.arret_debut]
+            groupe_fin = codes_groupes[self.arret_fin]
+        self.groupe_debut = np.asarray(groupe_debut, dtype=np.int32)
+        self.groupe_fin = np.asarray(groupe_fin, dtype=np.int32)
+
+        self._index_par_id = None
+
+    # ---------- Construction ----------
+
+    @classmethod
+    def _construire(cls, objets, hdebut, hfin, lignes, arrets_debut, arrets_fin):
+        codes_lignes, lignes_uniques = _encoder(lignes)
+        codes_arrets, arrets_uniques = _encoder(list(arrets_debut) + list(arrets_fin))
+        n = len(objets)
+        return cls(
+            hdebut=hdebut,
+            hfin=hfin,
+            ligne=codes_lignes,
+            arret_debut=codes_arrets[:n],
+            arret_fin=codes_arrets[n:],
+            lignes=lignes_uniques,
+            arrets=arrets_uniques,
+            objets=list(objets)
+        )
+
+    @classmethod
+    def depuis_voyages(cls, voyages):
+        """Construit la table depuis une liste d'objets voyage (objet.py)"""
+        return cls._construire(
+            voyages,
+            [v.hdebut for v in voyages],
+            [v.hfin for v in voyages],
+            [v.num_ligne for v in voyages],
+            [v.arret_debut for v in voyages],
+            [v.arret_fin for v in voyages]
+        )
+
+    @classmethod
+    def depuis_donnees_csv(cls, donnees):
+        """
+        Construit la table depuis les dicts des importeurs CSV.
+        Accepte le format de import_csv (heure_depart décimale + duree_minutes)
+        et celui de import_csv_services (hdebut/hfin en minutes).
+        """
+        hdebut, hfin, lignes, arrets_debut, arrets_fin = [], [], [], [], []
+
+        for d in donnees:
+            if 'hdebut' in d:
+                debut = int(d['hdebut'])
+                fin = int(d['hfin'])
+            else:
+                debut = int(round(float(d.get('heure_depart', 0)) * 60))
+                fin = debut + int(d.get('duree_minutes', 60))
+
+            hdebut.append(debut)
+            hfin.append(fin)
+            lignes.append(d.get('num_ligne', d.get('numero_ligne', '')))
+            arrets_debut.append(d.get('arret_debut', d.get('arret_depart', '')))
+            arrets_fin.append(d.get('arret_fin', d.get('arret_arrivee', '')))
+
+        return cls._construire(donnees, hdebut, hfin, lignes, arrets_debut, arrets_fin)
+
+    # ---------- Accès ----------
+
+    def __len__(self):
+        return len(self.objets)
+
+    @property
+    def duree(self):
+        return self.hfin - self.hdebut
+
+    def objet(self, index):
+        """Retourne l'objet d'origine de la ligne index"""
+        return self.objets[index]
+
+    def index_de(self, objet):
+        """Retourne l'index d'un objet d'origine (O(1), -1 si absent)"""
+        if self._index_par_id is None:
+            self._index_par_id = {id(o): i for i, o in enumerate(self.objets)}
+        return self._index_par_id.get(id(objet), -1)
+
+    def nom_ligne(self, index):
+        return self.lignes[self.ligne[index]]
+
+    def nom_arret_debut(self, index):
+        return self.arrets[self.arret_debut[index]]
+
+    def nom_arret_fin(self, index):
+        return self.arrets[self.arret_fin[index]]
+
+    def sous_table(self, indices):
+        """Retourne une nouvelle table restreinte aux indices donnés"""
+        indices = np.asarray(indices, dtype=np.intp)
+        return VoyageTable(
+            hdebut=self.hdebut[indices],
+            hfin=self.hfin[indices],
+            ligne=self.ligne[indices],
+            arret_debut=self.arret_debut[indices],
+            arret_fin=self.arret_fin[indices],
+            lignes=self.lignes,
+            arrets=self.arrets,
+            objets=[self.objets[i] for i in indices],
+            groupe_debut=self.groupe_debut[indices],
+            groupe_fin=self.groupe_fin[indices]
+        )
+
+    def sans_objets(self):
+        """Même table avec objets[i] = i : légère à envoyer à un autre processus"""
+        return VoyageTable(
+            hdebut=self.hdebut,
+            hfin=self.hfin,
+            ligne=self.ligne,
+            arret_debut=self.arret_debut,
+            arret_fin=self.arret_fin,
+            lignes=self.lignes,
+            arrets=self.arrets,
+            objets=range(len(self)),
+            groupe_debut=self.groupe_debut,
+            groupe_fin=self.groupe_fin
+        )
+
+    def masque_fenetre(self, debut, fin):
+        """Masque des voyages entièrement contenus dans [debut, fin]"""
+        return (self.hdebut >= debut) & (self.hfin <= fin)
@@ -0,0 +1,102 @@
+"""
+Tests de couverture_chemins.py : le balayage et Hopcroft-Karp donnent la couverture minimale
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from communs.couverture_chemins import adjacence, couplage_maximum, couverture_minimale, couverture_sans_fenetre
+from communs.graphe_succession import GrapheSuccession
+from solverfinal import OPTIONS_DEFAUT, ModeleServices
+from table_voyages import VoyageTable
+
+PAUSE_MIN = 5
+
+
+def voyages_aleatoires(nb_voyages, graine):
+    """Voyages courts entre 3 groupes d'arrêts sur 4 h : beaucoup d'enchaînements possibles"""
+    r = random.Random(graine)
+    hdebut = [r.randrange(300, 540) for _ in range(nb_voyages)]
+    hfin = [h + r.randrange(10, 40) for h in hdebut]
+    groupe_debut = [r.randrange(3) for _ in range(nb_voyages)]
+    groupe_fin = [r.randrange(3) for _ in range(nb_voyages)]
+    return hdebut, hfin, groupe_debut, groupe_fin
+
+
+def minimum_exhaustif(successeurs):
+    """Couverture minimale par énumération des successeurs choisis (petits graphes)"""
+    n = len(successeurs)
+    pris = [False] * n
+    meilleur = [0]
+
+    def explorer(u, nb_couples):
+        if u == n:
+            meilleur[0] = max(meilleur[0], nb_couples)
+            return
+        if nb_couples + (n - u) <= meilleur[0]:
+            return
+        for v in successeurs[u]:
+            if not pris[v]:
+                pris[v] = True
+                explorer(u + 1, nb_couples + 1)
+                pris[v] = False
+        explorer(u + 1, nb_couples)
+
+    explorer(0, 0)
+    return n - meilleur[0]
+
+
+def verifier_chaines(chaines, graphe, geo):
+    assert sorted(v for chaine in chaines for v in chaine) == list(range(len(graphe)))
+    for chaine in chaines:
+        for a, b in zip(chaine, chaine[1:]):
+            assert graphe.peut_suivre(a, b)
+            assert not geo or graphe.continuite_geo(a, b)
+
+
+@pytest.mark.parametrize("geo", [True, False])
+@pytest.mark.parametrize("graine", range(8))
+def test_balayage_egal_hopcroft_karp_et_exhaustif(geo, graine):
+    hdebut, hfin, groupe_debut, groupe_fin = voyages_aleatoires(9, graine)
+    # Fenêtre plus longue que la journée : tous les arcs, pour Hopcroft-Karp
+    graphe = GrapheSuccession(hdebut, hfin, groupe_debut, groupe_fin, PAUSE_MIN, attente_max=24 * 60)
+    successeurs = adjacence(graphe, geo)
+
+    nb_balayage, chaines = couverture_sans_fenetre(hdebut, hfin, groupe_debut, groupe_fin, PAUSE_MIN, geo)
+    suivant, _ = couplage_maximum(successeurs)
+    nb_hopcroft_karp = len(graphe) - sum(1 for v in suivant if v >= 0)
+
+    assert nb_balayage == nb_hopcroft_karp == minimum_exhaustif(successeurs)
+    assert len(chaines) == nb_balayage
+    verifier_chaines(chaines, graphe, geo)
+
+
+@pytest.mark.parametrize("graine", range(4))
+def test_fenetre_attente(graine):
+    hdebut, hfin, groupe_debut, groupe_fin = voyages_aleatoires(9, graine)
+    graphe = GrapheSuccession(hdebut, hfin, groupe_debut, groupe_fin, PAUSE_MIN, attente_max=30)
+    sans_fenetre, _ = couverture_minimale(GrapheSuccession(hdebut, hfin, groupe_debut, groupe_fin, PAUSE_MIN))
+
+    nb_minimum, chaines = couverture_minimale(graphe)
+    assert nb_minimum == minimum_exhaustif(adjacence(graphe)) >= sans_fenetre
+    assert len(chaines) == nb_minimum
+    verifier_chaines(chaines, graphe, geo=True)
+
+
+@pytest.mark.parametrize("geo", [True, False])
+def test_borne_et_amorce_des_chaines(geo, instance_aleatoire):
+    voyages, services = instance_aleatoire(200, 16, graine=3)
+    modele = ModeleServices(VoyageTable.depuis_voyages(voyages), services, {**OPTIONS_DEFAUT, 'geo': geo})
+
+    gloutonne = modele.affectation_gloutonne()
+    chaines = modele.affectation_chaines()
+    assert modele.nb_minimum <= len(np.unique(gloutonne[gloutonne >= 0])) + int((gloutonne < 0).sum())
+    for affectation in (chaines, modele.affectation_initiale()):
+        for s in np.unique(affectation[affectation >= 0]):
+            sequence = sorted(np.flatnonzero(affectation == s).tolist(), key=lambda i: voyages[i].hdebut)
+            assert modele.compatibles[sequence, s].all()
+            for a, b in zip(sequence, sequence[1:]):
+                assert modele.peut_enchainer(a, b)
+    assert modele.objectif(modele.affectation_initiale()) >= modele.objectif(gloutonne)
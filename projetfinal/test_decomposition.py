@@ -0,0 +1,89 @@
+"""
+Tests de decomposition.py : plans valides et au moins aussi bons que le glouton global
+"""
+
+import numpy as np
+import pytest
+
+from decomposition import composantes
+from solverfinal import OPTIONS_DEFAUT, InstanceServices, resoudre_cpsat
+from table_voyages import VoyageTable
+
+PAUSE_MIN = 5
+
+
+def fixer_segments(voyages, services, options):
+    """Pré-assigne trois voyages consécutifs d'un service sur trois (plan glouton : réalisable)"""
+    instance = InstanceServices(VoyageTable.depuis_voyages(voyages), services, {**options, 'symetries': False})
+    affectation = instance.affectation_gloutonne()
+    for s in range(0, len(services), 3):
+        chaine = sorted(np.flatnonzero(affectation == s).tolist(), key=lambda i: voyages[i].hdebut)
+        services[s] = (services[s][0], chaine[3:6])
+
+
+def verifier_plan(solution, voyages, services, geo):
+    for s, liste in solution['services'].items():
+        service, fixes = services[s]
+        assert set(fixes) <= {d['index'] for d in liste}
+        for d in liste:
+            assert service.heure_debut <= d['voyage_obj'].hdebut and d['voyage_obj'].hfin <= service.heure_fin
+        for a, b in zip(liste, liste[1:]):
+            a, b = a['voyage_obj'], b['voyage_obj']
+            assert a.hfin + PAUSE_MIN <= b.hdebut
+            assert not geo or a.continuite_geo(b)
+    nb_assignes = sum(len(liste) for liste in solution['services'].values())
+    assert nb_assignes + solution['nb_non_assignes'] == len(voyages)
+
+
+def nb_assignes_glouton(voyages, services, options):
+    instance = InstanceServices(VoyageTable.depuis_voyages(voyages), services, {**options, 'symetries': False})
+    return int((instance.affectation_gloutonne() >= 0).sum())
+
+
+@pytest.mark.parametrize("solveur", ['glouton', 'cpsat'])
+@pytest.mark.parametrize("geo", [True, False])
+@pytest.mark.parametrize("fixes", [False, True])
+def test_blocs_valides_et_pas_pires_que_le_glouton(solveur, geo, fixes, instance_aleatoire):
+    voyages, services = instance_aleatoire(300, 24, graine=7)
+    options = {**OPTIONS_DEFAUT, 'pause_min': PAUSE_MIN, 'geo': geo, 'taille_bloc': 60,
+               'solveur_bloc': solveur, 'temps_max': 5, 'parallele': False}
+    if fixes:
+        fixer_segments(voyages, services, options)
+
+    solution, = resoudre_cpsat(voyages, services, options)
+    verifier_plan(solution, voyages, services, geo)
+    assert len(voyages) - solution['nb_non_assignes'] >= nb_assignes_glouton(voyages, services, options)
+    if solveur == 'glouton':
+        # Blocs gloutons : le raccord ne perd rien, pas de repli sur le glouton global
+        assert solution['strategie'].startswith("Décomposition")
+
+
+def test_horizon_glissant_relie_les_blocs_d_une_composante(instance_aleatoire):
+    # Une seule composante : ses blocs se suivent et chaque bloc prolonge les chaînes du précédent
+    voyages, services = instance_aleatoire(200, 12, graine=5)
+    for service, _ in services:
+        service.set_limites(300, 1400)
+    taille_bloc = 40
+    options = {**OPTIONS_DEFAUT, 'pause_min': PAUSE_MIN, 'taille_bloc': taille_bloc,
+               'solveur_bloc': 'glouton', 'temps_max': 5, 'parallele': False}
+    assert len(composantes(InstanceServices(VoyageTable.depuis_voyages(voyages), services,
+                                            {**options, 'symetries': False}).compatibles)) == 1
+
+    solution, = resoudre_cpsat(voyages, services, options)
+    verifier_plan(solution, voyages, services, geo=True)
+    assert solution['strategie'].startswith("Décomposition 1 composante")
+    # Bloc de chaque voyage : rang par heure de début // taille_bloc
+    rang = {i: k for k, i in enumerate(sorted(range(len(voyages)), key=lambda i: voyages[i].hdebut))}
+    blocs = [{rang[d['index']] // taille_bloc for d in liste} for liste in solution['services'].values()]
+    assert max(len(b) for b in blocs) >= 3
+
+
+def test_composantes_separent_les_services_sans_voyage_commun():
+    compatibles = np.array([
+        [True, False, False],
+        [True, True, False],
+        [False, False, True],
+        [False, False, False],
+    ])
+    resultat = [(s.tolist(), v.tolist()) for s, v in composantes(compatibles)]
+    assert resultat == [([0, 1], [0, 1]), ([2], [2])]
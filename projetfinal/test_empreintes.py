@@ -0,0 +1,53 @@
+"""
+Tests de empreintes.py : numérotation canonique des services interchangeables
+"""
+
+import random
+
+import numpy as np
+
+from communs.empreintes import NON_ASSIGNE, canoniser, classes_services, empreinte, empreinte_services, vecteur_affectation
+
+
+def test_vecteur_affectation():
+    affectation = vecteur_affectation([[2, 0], [], [3]], 5)
+    assert affectation.tolist() == [0, NON_ASSIGNE, 0, 2, NON_ASSIGNE]
+
+
+def test_canoniser_numeros_de_la_classe():
+    # Services 0, 2 et 3 interchangeables (classe 0), service 1 seul (classe 1)
+    classes = classes_services(['a', 'b', 'a', 'a'])
+    affectation = np.array([3, 1, 0, NON_ASSIGNE, 3], dtype=np.int32)
+
+    canonique = canoniser(affectation, classes)
+    # 3 est le premier utilisé de sa classe : il devient 0 ; 0 devient 2 ; 1 ne change pas
+    assert canonique.tolist() == [0, 1, 2, NON_ASSIGNE, 0]
+    assert affectation.tolist() == [3, 1, 0, NON_ASSIGNE, 3]
+    assert canoniser(canonique, classes).tolist() == canonique.tolist()
+
+
+def test_echange_de_services_interchangeables():
+    r = random.Random(4)
+    classes = classes_services([s % 3 for s in range(9)])
+    for _ in range(50):
+        affectation = np.array([r.randrange(-1, 9) for _ in range(30)], dtype=np.int32)
+        # Permutation des services à l'intérieur de chaque classe
+        permutation = np.arange(9)
+        for classe in range(3):
+            membres = np.flatnonzero(classes == classe)
+            permutation[membres] = r.sample(membres.tolist(), len(membres))
+        echangee = np.where(affectation >= 0, permutation[affectation], NON_ASSIGNE)
+
+        canonique = canoniser(affectation, classes)
+        assert canoniser(echangee, classes).tolist() == canonique.tolist()
+        assert empreinte(echangee, classes) == empreinte(affectation, classes)
+        # Mêmes voyages par service, services de la même classe
+        for s in np.unique(affectation[affectation >= 0]):
+            cibles = np.unique(canonique[affectation == s])
+            assert len(cibles) == 1 and classes[cibles[0]] == classes[s]
+
+
+def test_empreinte_sans_classes():
+    assert empreinte_services([[0], [1]], 2) == empreinte_services([[0], [1]], 2)
+    assert empreinte_services([[0], [1]], 2) != empreinte_services([[1], [0]], 2)
+    assert empreinte_services([[0], [1]], 2, classes=[0, 0]) == empreinte_services([[1], [0]], 2, classes=[0, 0])
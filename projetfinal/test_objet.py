@@ -0,0 +1,38 @@
+"""
+Tests de objet.py : voyages_tries reste triée et ses voisins suivent la convention de bisect
+"""
+
+from bisect import bisect_right
+
+import pytest
+
+from objet import voyage, voyages_tries
+
+
+def voyages_service():
+    return [voyage.depuis_minutes('1', i, 'A', 'B', debut, debut + 20) for i, debut in enumerate((420, 480, 540))]
+
+
+def test_predecesseur_et_successeur_au_point_d_insertion():
+    premier, deuxieme, troisieme = voyages_service()
+    voyages = voyages_tries([troisieme, premier, deuxieme])
+    assert list(voyages) == [premier, deuxieme, troisieme]
+
+    # Créneau 500-520 : entre le deuxième et le troisième voyage
+    position = bisect_right([v.hdebut for v in voyages], 500)
+    assert voyages.predecesseur(position) is deuxieme
+    assert voyages.successeur(position) is troisieme
+    assert voyages.predecesseur(0) is None and voyages.successeur(0) is premier
+    assert voyages.predecesseur(len(voyages)) is troisieme and voyages.successeur(len(voyages)) is None
+
+
+def test_insert_a_une_place_chronologique():
+    premier, deuxieme, troisieme = voyages_service()
+    voyages = voyages_tries([premier, troisieme])
+    assert voyages.insert(1, deuxieme) == 1
+    assert list(voyages) == [premier, deuxieme, troisieme]
+    assert voyages.fin == troisieme.hfin and voyages.nb_lignes == 1
+
+    with pytest.raises(ValueError):
+        voyages.insert(0, voyage.depuis_minutes('1', 9, 'B', 'A', 600, 620))
+    assert len(voyages) == 3
@@ -0,0 +1,79 @@
+"""
+Tests de recherche_locale.py : les services améliorés restent réalisables
+"""
+
+import pytest
+
+from communs.recherche_locale import MODES, RechercheLocale
+
+PAUSE_MIN = 5
+
+
+def autorise_services(hdebut, hfin, services):
+    def autorise(s, i):
+        debut, fin, (pause_debut, pause_fin) = services[s]
+        if hdebut[i] < debut or hfin[i] > fin:
+            return False
+        return hfin[i] <= pause_debut or hdebut[i] >= pause_fin
+    return autorise
+
+
+def glouton(hdebut, hfin, groupe_debut, groupe_fin, autorise, nb_services):
+    """Premier service où le voyage suit la fin de chaîne (continuité géo comprise)"""
+    sequences = [[] for _ in range(nb_services)]
+    for i in sorted(range(len(hdebut)), key=hdebut.__getitem__):
+        for s, seq in enumerate(sequences):
+            if not autorise(s, i):
+                continue
+            if seq and (hfin[seq[-1]] + PAUSE_MIN > hdebut[i] or groupe_fin[seq[-1]] != groupe_debut[i]):
+                continue
+            seq.append(i)
+            break
+    return sequences
+
+
+def verifier(services, libres, hdebut, hfin, groupe_debut, groupe_fin, autorise, fixes_par_service):
+    vus = [i for seq in services for i in seq] + list(libres)
+    assert sorted(vus) == list(range(len(hdebut)))
+    for s, seq in enumerate(services):
+        assert fixes_par_service.get(s, set()) <= set(seq)
+        for i in seq:
+            assert autorise(s, i)
+        for a, b in zip(seq, seq[1:]):
+            assert hfin[a] + PAUSE_MIN <= hdebut[b]
+            assert groupe_fin[a] == groupe_debut[b]
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("graine", [1, 2, 3])
+def test_amelioration_realisable(mode, graine, colonnes_aleatoires):
+    hdebut, hfin, groupe_debut, groupe_fin, services = colonnes_aleatoires(150, 12, graine)
+    autorise = autorise_services(hdebut, hfin, services)
+    initial = glouton(hdebut, hfin, groupe_debut, groupe_fin, autorise, len(services))
+    fixes_par_service = {s: set(initial[s][:2]) for s in range(0, len(services), 4)}
+    fixes = set().union(*fixes_par_service.values())
+
+    recherche = RechercheLocale(hdebut, hfin, groupe_debut, groupe_fin, autorise, PAUSE_MIN, fixes,
+                                geo_stricte=True)
+    resultat, libres = recherche.ameliorer(initial, temps_max=None, mode=mode)
+
+    verifier(resultat, libres, hdebut, hfin, groupe_debut, groupe_fin, autorise, fixes_par_service)
+    assert recherche.stats['score_final'] >= recherche.stats['score_initial']
+    assert sum(map(len, resultat)) >= sum(map(len, initial))
+
+
+def test_continuite_passee_en_parametre():
+    # Deux voyages dont les groupes diffèrent : enchaînables seulement si la règle le permet
+    hdebut, hfin, groupe_debut, groupe_fin = [0, 20], [10, 30], [0, 2], [1, 3]
+
+    def autorise(s, i):
+        return True
+
+    stricte = RechercheLocale(hdebut, hfin, groupe_debut, groupe_fin, autorise, PAUSE_MIN, geo_stricte=True)
+    services, libres = stricte.ameliorer([[0]], temps_max=None)
+    assert services == [[0]] and libres == [1]
+
+    souple = RechercheLocale(hdebut, hfin, groupe_debut, groupe_fin, autorise, PAUSE_MIN, geo_stricte=True,
+                             continuite=lambda a, b: True)
+    services, libres = souple.ameliorer([[0]], temps_max=None)
+    assert services == [[0, 1]] and libres == []
@@ -0,0 +1,41 @@
+"""
+Tests de registre_arrets.py : une seule règle de continuité géo, arrêts vides compris
+"""
+
+import pytest
+
+from communs.graphe_succession import GrapheSuccession
+from communs.recherche_locale import RechercheLocale
+from communs.registre_arrets import StopRegistry
+from objet import voyage
+
+
+def test_codes_et_groupes():
+    registre = StopRegistry()
+    assert registre.code(' juma1 ') == registre.code('JUMA1')
+    assert registre.groupe('JUMA1') == registre.groupe('JUMA2') != registre.groupe('GOSS')
+    assert registre.code('') == registre.code(None) == registre.groupe('  ') == StopRegistry.INCONNU
+
+
+@pytest.mark.parametrize("arrivee, depart, attendu", [
+    ('JUMA1', 'JUMA2', True),
+    ('JUMA1', 'GOSS', False),
+    ('', '', True),
+    ('', 'GOSS', False),
+    ('JUMA1', '', False),
+])
+def test_meme_regle_partout(arrivee, depart, attendu):
+    registre = StopRegistry()
+    assert registre.meme_groupe(arrivee, depart) == attendu
+
+    avant = voyage.depuis_minutes('1', 1, 'CHARL', arrivee, 300, 330)
+    apres = voyage.depuis_minutes('1', 2, depart, 'CHARL', 340, 370)
+    assert avant.continuite_geo(apres) == attendu
+
+    graphe = GrapheSuccession.depuis_voyages([avant, apres], pause_min=5, attente_max=60)
+    assert graphe.continuite_geo(0, 1) == attendu
+    assert (1 in graphe.successeurs_geo(0).tolist()) == attendu
+
+    recherche = RechercheLocale(graphe.hdebut, graphe.hfin, graphe.groupe_debut, graphe.groupe_fin,
+                                lambda s, i: True, 5)
+    assert recherche.continuite(0, 1) == attendu
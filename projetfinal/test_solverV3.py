@@ -0,0 +1,30 @@
+"""
+Tests de solverV3.py : chaque stratégie donne une permutation des voyages
+"""
+
+import numpy as np
+import pytest
+
+from solverV3 import STRATEGIES, generer_solution_gloutonne
+from table_voyages import VoyageTable
+
+
+@pytest.mark.parametrize("nom, tri_func", STRATEGIES)
+def test_strategies_retournent_une_permutation(nom, tri_func, instance_aleatoire):
+    voyages, services = instance_aleatoire(60, 6, graine=2)
+    table = VoyageTable.depuis_voyages(voyages)
+    assert sorted(np.asarray(tri_func(table)).tolist()) == list(range(len(voyages)))
+    solution = generer_solution_gloutonne(table, services, tri_func, nom, verbose=False)
+    nb_assignes = sum(len(liste) for liste in solution['services'].values())
+    assert nb_assignes + solution['nb_non_assigned'] == len(voyages)
+
+
+def test_ordre_invalide_refuse(instance_aleatoire):
+    voyages, services = instance_aleatoire(20, 2, graine=2)
+    table = VoyageTable.depuis_voyages(voyages)
+    # Ancienne forme : la fonction de tri retourne les voyages eux-mêmes
+    with pytest.raises(ValueError):
+        generer_solution_gloutonne(table, services, lambda t: sorted(voyages, key=lambda v: v.hdebut),
+                                   "Objets voyage", verbose=False)
+    with pytest.raises(ValueError):
+        generer_solution_gloutonne(table, services, lambda t: np.zeros(len(t), dtype=int), "Doublons", verbose=False)
@@ -0,0 +1,130 @@
+"""
+Tests de solverfinal.py : services coupés (une chaîne par tranche de travail)
+"""
+
+import random
+
+import pytest
+
+from objet import service_agent, voyage
+from solverfinal import FORMULATIONS, OPTIONS_DEFAUT, InstanceServices, ModeleServices, RechercheContinue, resoudre_cpsat
+from table_voyages import VoyageTable
+
+PAUSE_MIN = 5
+
+
+def service_coupe(num, debut, fin, debut_coupure, fin_coupure):
+    service = service_agent(num_service=num, type_service="coupé")
+    service.set_limites(debut, fin)
+    service.set_coupure(debut_coupure, fin_coupure)
+    return service
+
+
+def verifier_plan(solution, services, options):
+    for s, liste in solution['services'].items():
+        service, fixes = services[s]
+        assert set(fixes) <= {d['index'] for d in liste}
+        coupure = (service.heure_debut_coupure, service.heure_fin_coupure) \
+            if service.type_service == "coupé" else None
+        for d in liste:
+            v = d['voyage_obj']
+            assert service.heure_debut <= v.hdebut and v.hfin <= service.heure_fin
+            assert coupure is None or v.hfin <= coupure[0] or v.hdebut >= coupure[1]
+        for a, b in zip(liste, liste[1:]):
+            a, b = a['voyage_obj'], b['voyage_obj']
+            assert a.hfin + PAUSE_MIN <= b.hdebut
+            if coupure is not None and a.hfin <= coupure[0] and b.hdebut >= coupure[1]:
+                continue  # Deux tranches : rien ne relie les voyages de part et d'autre de la coupure
+            assert not options['geo'] or a.continuite_geo(b)
+            assert options['attente_max'] is None or b.hdebut - a.hfin <= options['attente_max']
+
+
+@pytest.mark.parametrize("formulation", FORMULATIONS)
+@pytest.mark.parametrize("geo", [True, False])
+def test_service_coupe_avec_voyages_fixes_de_part_et_d_autre(formulation, geo):
+    # 7 h 00 et 15 h 00 : l'attente franchit la coupure (plus que attente_max)
+    voyages = [
+        voyage.depuis_minutes('1', 1, 'JUMA1', 'FOMET', 420, 450),
+        voyage.depuis_minutes('1', 2, 'FOMET', 'JUMA2', 460, 500),
+        voyage.depuis_minutes('1', 3, 'GOSS1', 'CHARL', 900, 930),
+        voyage.depuis_minutes('1', 4, 'CHARL', 'GOSS2', 940, 980),
+    ]
+    services = [(service_coupe(1, 360, 1020, 540, 840), [0, 2])]
+    options = {**OPTIONS_DEFAUT, 'geo': geo, 'formulation': formulation, 'temps_max': 5.0}
+
+    solutions = resoudre_cpsat(voyages, services, options)
+    assert solutions and solutions[0]['nb_non_assignes'] == 0
+    assert [d['index'] for d in solutions[0]['services'][0]] == [0, 1, 2, 3]
+    verifier_plan(solutions[0], services, options)
+
+
+def test_recherche_continue_options_de_l_interface():
+    # Le bouton CP-SAT ne passe que pause_min : les options par défaut doivent suffire
+    voyages = [voyage.depuis_minutes('1', 1, 'JUMA1', 'FOMET', 420, 450),
+               voyage.depuis_minutes('1', 2, 'GOSS1', 'CHARL', 900, 930)]
+    services = [(service_coupe(1, 360, 1020, 540, 840), [0, 1])]
+    recherche = RechercheContinue(voyages, services, {'pause_min': PAUSE_MIN})
+    recherche.demarrer()
+    affectations = []
+    while (element := recherche.file.get(timeout=30)) is not None:
+        affectations.append(element[0])
+    assert affectations and affectations[-1].tolist() == [0, 0]
+    assert recherche.statut is not None and recherche.solver.StatusName(recherche.statut) == 'OPTIMAL'
+
+
+def test_attente_bornee_par_la_plus_longue_tranche():
+    # 7 h 00 puis 12 h 00 dans un service continu de 8 h : attente de 4 h 30
+    voyages = [voyage.depuis_minutes('1', 1, 'JUMA1', 'FOMET', 420, 450),
+               voyage.depuis_minutes('1', 2, 'FOMET', 'JUMA2', 720, 750),
+               voyage.depuis_minutes('1', 3, 'GOSS1', 'CHARL', 1150, 1190)]
+    service = service_agent(num_service=1)
+    service.set_limites(360, 840)
+    coupe = service_coupe(2, 360, 1200, 600, 900)
+    services = [(service, [0, 1]), (coupe, [])]
+
+    modele = ModeleServices(VoyageTable.depuis_voyages(voyages), services, OPTIONS_DEFAUT)
+    assert modele.attente_arcs() == 480
+    assert ModeleServices(VoyageTable.depuis_voyages(voyages), services,
+                          {**OPTIONS_DEFAUT, 'attente_max': 60}).attente_arcs() == 60
+
+    solutions = resoudre_cpsat(voyages, services, {'temps_max': 5.0})
+    assert solutions and solutions[0]['nb_non_assignes'] == 0
+    verifier_plan(solutions[0], services, OPTIONS_DEFAUT)
+
+
+def test_glouton_remplit_les_deux_tranches():
+    voyages = [voyage.depuis_minutes('1', 1, 'JUMA1', 'FOMET', 420, 450),
+               voyage.depuis_minutes('1', 2, 'GOSS1', 'CHARL', 900, 930)]
+    services = [(service_coupe(1, 360, 1020, 540, 840), [])]
+    instance = InstanceServices(VoyageTable.depuis_voyages(voyages), services, OPTIONS_DEFAUT)
+    assert instance.affectation_gloutonne().tolist() == [0, 0]
+
+
+@pytest.mark.parametrize("geo", [True, False])
+def test_services_coupes_aleatoires(geo):
+    r = random.Random(11)
+    arrets = ['A', 'B', 'C']
+    voyages = []
+    for i in range(80):
+        debut = r.randrange(360, 1200)
+        depart = r.choice(arrets)
+        arrivee = r.choice([a for a in arrets if a != depart])
+        voyages.append(voyage.depuis_minutes('1', i, depart, arrivee, debut, debut + r.randrange(20, 50)))
+    services = []
+    for k in range(8):
+        if k % 2:
+            services.append((service_coupe(k, 360, 1260, 600 + 30 * k, 840 + 30 * k), []))
+        else:
+            service = service_agent(num_service=k)
+            service.set_limites(360 + 60 * k, 840 + 60 * k)
+            services.append((service, []))
+    options = {**OPTIONS_DEFAUT, 'geo': geo, 'temps_max': 5.0}
+
+    instance = InstanceServices(VoyageTable.depuis_voyages(voyages), services, options)
+    gloutonne = instance.affectation_gloutonne()
+    verifier_plan(instance.solution(gloutonne, "glouton"), services, options)
+
+    solutions = resoudre_cpsat(voyages, services, options)
+    assert solutions
+    verifier_plan(solutions[0], services, options)
+    assert len(voyages) - solutions[0]['nb_non_assignes'] >= int((gloutonne >= 0).sum())